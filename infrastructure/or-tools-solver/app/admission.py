@@ -0,0 +1,31 @@
+"""Which priority class a solve belongs to, and how long it should hold a worker.
+
+Interactive work is what a driver or dispatcher is waiting on: small routes
+with short search budgets, like a re-optimization after a skipped stop.
+Planning work (big routes, long budgets, fleets, jobs) can wait for it, and
+batch entries wait for both. The pool uses the class to pick who gets the
+next free worker and the estimate to tell rejected callers when to retry.
+"""
+
+from .models import FleetOptimizeRequest, OptimizeRequest
+from .solver import default_time_limit
+
+
+def estimated_seconds(request: OptimizeRequest | FleetOptimizeRequest) -> float:
+    """Worst-case worker time: the search budget the solve will run with.
+
+    Adaptive stopping usually ends sooner, so this errs towards longer
+    retry hints rather than shorter ones.
+    """
+    return float(
+        request.solver_time_limit_seconds or default_time_limit(len(request.distance_matrix))
+    )
+
+
+def request_priority(request: OptimizeRequest, interactive_max_seconds: float) -> str:
+    """The class the request asked for, else interactive if it is cheap enough."""
+    if request.priority is not None:
+        return request.priority
+    if estimated_seconds(request) <= interactive_max_seconds:
+        return "interactive"
+    return "planning"
@@ -0,0 +1,145 @@
+"""Content-addressed cache of solver results with in-flight coalescing.
+
+Requests are keyed by a SHA-256 of their normalized payload, so re-optimizing
+the same route within the TTL returns the stored ``OptimizeResponse``, and
+identical requests that arrive while a solve is running share that solve.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from .models import OptimizeRequest, OptimizeResponse
+from .solver import DEFAULT_SERVICE_TIME
+
+
+def request_key(request: OptimizeRequest) -> str:
+    """Hash a request after filling in the defaults the solver would apply.
+
+    Omitted and explicitly-defaulted service times / time windows produce
+    the same key, since they produce the same model. ``include_timings``
+    only affects presentation and ``priority`` only scheduling, so both are
+    left out.
+    """
+    n = len(request.distance_matrix)
+    service_times = list(request.service_times)
+    while len(service_times) < n:
+        service_times.append(0 if len(service_times) == 0 else DEFAULT_SERVICE_TIME)
+    time_windows = list(request.time_windows)
+    time_windows += [None] * (n - len(time_windows))
+
+    normalized = request.model_copy(
+        update={"service_times": service_times, "time_windows": time_windows}
+    )
+    digest = hashlib.sha256(
+        normalized.model_dump_json(
+            exclude={"distance_matrix", "time_matrix", "include_timings", "priority"}
+        ).encode()
+    )
+    # Matrices are hashed as raw integers so JSON lists and binary-transport
+    # arrays with the same values share a key.
+    for matrix in (request.distance_matrix, request.time_matrix):
+        cells = np.asarray(matrix, dtype="<i8")
+        digest.update(str(cells.shape).encode())
+        digest.update(cells.tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Bounded LRU cache with per-entry TTL. ``max_entries=0`` disables storage."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, OptimizeResponse]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        # Callers currently awaiting each in-flight key
+        self._waiters: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> OptimizeResponse | None:
+        """Return a fresh cached result, dropping it if its TTL has passed."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: OptimizeResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_solve(
+        self, key: str, solve_fn: Callable[[], Awaitable[OptimizeResponse]]
+    ) -> OptimizeResponse:
+        """Serve ``key`` from the cache, a running solve, or a new ``solve_fn()``.
+
+        The solve runs as its own task, shared by every caller waiting on
+        ``key``: one caller going away leaves it running for the others, and
+        the last one going away cancels the task. What that frees is up to
+        ``solve_fn``: a pooled call still queued is dropped, but one already
+        running keeps its worker unless ``solve_fn`` stops it on cancellation.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The result is only stored if the solve succeeds
+            task = asyncio.ensure_future(solve_fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._on_solved(key, done))
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if not task.done():
+                    # Nobody left to answer: cancel the solve (see above for what it frees)
+                    self._in_flight.pop(key, None)
+                    task.cancel()
+
+    def _on_solved(self, key: str, task: asyncio.Task) -> None:
+        # A cancelled solve may finish after a new one took over its key
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled() and task.exception() is None:
+            self.put(key, task.result())
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,126 @@
+"""Compact binary encoding for optimize requests and responses.
+
+Large requests spend most of their time in JSON parsing and per-element
+pydantic validation of the two NxN matrices. The binary form carries the
+scalar fields as a small JSON header and the matrices as raw little-endian
+int32 buffers, decoded with ``numpy.frombuffer`` (no Python object per cell).
+
+Request layout (``application/vnd.vrp.optimize-request``)::
+
+    b"VRQ1" | uint32 header_len | header JSON | int32[n*n] distance | int32[n*n] time
+
+The header holds every ``OptimizeRequest`` field except the matrices, plus
+``n``. Response layout (``application/vnd.vrp.optimize-response``)::
+
+    b"VRS1" | uint32 header_len | header JSON | int32[] visit_order
+            | int32[] estimated_arrivals | int32[] dropped_visits
+
+with the array lengths in the header.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+from .models import OptimizeRequest, OptimizeResponse
+
+REQUEST_CONTENT_TYPE = "application/vnd.vrp.optimize-request"
+RESPONSE_CONTENT_TYPE = "application/vnd.vrp.optimize-response"
+
+REQUEST_MAGIC = b"VRQ1"
+RESPONSE_MAGIC = b"VRS1"
+
+_INT32 = np.dtype("<i4")
+_PREFIX = struct.Struct("<4sI")
+_MATRIX_FIELDS = ("distance_matrix", "time_matrix")
+
+
+def _split(body: bytes, magic: bytes) -> tuple[dict, int]:
+    """Parse the magic + JSON header; return the header and the payload offset."""
+    if len(body) < _PREFIX.size:
+        raise ValueError("body too short for a binary header")
+    found, header_len = _PREFIX.unpack_from(body)
+    if found != magic:
+        raise ValueError(f"bad magic {found!r}, expected {magic!r}")
+    start = _PREFIX.size
+    end = start + header_len
+    if end > len(body):
+        raise ValueError("header length exceeds body size")
+    try:
+        header = json.loads(body[start:end])
+    except ValueError as e:
+        raise ValueError(f"header is not valid JSON: {e}") from e
+    if not isinstance(header, dict):
+        raise ValueError("header must be a JSON object")
+    return header, end
+
+
+def _join(magic: bytes, header: dict, arrays: list[np.ndarray]) -> bytes:
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    parts = [_PREFIX.pack(magic, len(header_bytes)), header_bytes]
+    parts.extend(np.ascontiguousarray(a, dtype=_INT32).tobytes() for a in arrays)
+    return b"".join(parts)
+
+
+def decode_request(body: bytes) -> OptimizeRequest:
+    """Decode a binary request. Matrices become read-only int32 ``ndarray``s."""
+    header, offset = _split(body, REQUEST_MAGIC)
+    n = header.pop("n", None)
+    if not isinstance(n, int) or n < 0:
+        raise ValueError("header must contain a non-negative integer 'n'")
+    cells = n * n
+    expected = offset + 2 * cells * _INT32.itemsize
+    if len(body) != expected:
+        raise ValueError(f"body is {len(body)} bytes, expected {expected} for n={n}")
+
+    distance = np.frombuffer(body, dtype=_INT32, count=cells, offset=offset).reshape(n, n)
+    time = np.frombuffer(
+        body, dtype=_INT32, count=cells, offset=offset + cells * _INT32.itemsize
+    ).reshape(n, n)
+
+    # Validate the scalar fields through the normal model, then attach the
+    # matrices without walking them cell by cell.
+    for field in _MATRIX_FIELDS:
+        header.pop(field, None)
+    request = OptimizeRequest.model_validate(
+        {**header, "distance_matrix": [], "time_matrix": []}
+    )
+    return request.model_copy(update={"distance_matrix": distance, "time_matrix": time})
+
+
+def encode_request(request: OptimizeRequest) -> bytes:
+    """Encode a request in the binary format (client side / tests)."""
+    header = request.model_dump(mode="json", exclude=set(_MATRIX_FIELDS))
+    header["n"] = len(request.distance_matrix)
+    return _join(REQUEST_MAGIC, header, [request.distance_matrix, request.time_matrix])
+
+
+def encode_response(response: OptimizeResponse) -> bytes:
+    """Encode a solver result in the binary response format."""
+    header = response.model_dump(
+        mode="json", exclude={"visit_order", "estimated_arrivals", "dropped_visits"}
+    )
+    header["visits"] = len(response.visit_order)
+    header["dropped"] = len(response.dropped_visits)
+    return _join(
+        RESPONSE_MAGIC,
+        header,
+        [response.visit_order, response.estimated_arrivals, response.dropped_visits],
+    )
+
+
+def decode_response(body: bytes) -> OptimizeResponse:
+    """Decode a binary response (client side / tests)."""
+    header, offset = _split(body, RESPONSE_MAGIC)
+    visits = header.pop("visits")
+    dropped = header.pop("dropped")
+    arrays = np.frombuffer(body, dtype=_INT32, offset=offset)
+    if len(arrays) != 2 * visits + dropped:
+        raise ValueError("response arrays do not match header counts")
+    return OptimizeResponse(
+        **header,
+        visit_order=arrays[:visits].tolist(),
+        estimated_arrivals=arrays[visits:2 * visits].tolist(),
+        dropped_visits=arrays[2 * visits:].tolist(),
+    )
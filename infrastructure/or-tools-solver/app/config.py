@@ -0,0 +1,94 @@
+"""Runtime settings for the solver service, read from environment variables."""
+
+import os
+from dataclasses import dataclass
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_str(name: str, default: str) -> str:
+    value = os.environ.get(name)
+    return value if value not in (None, "") else default
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Service configuration. Every field maps to an upper-case env variable."""
+
+    # Worker processes that run solves (SOLVER_WORKERS); defaults to one per core
+    solver_workers: int
+    # Largest number of routes accepted by /optimize/batch (SOLVER_MAX_BATCH_SIZE)
+    max_batch_size: int
+    # Cached OptimizeResponse entries (SOLVER_CACHE_SIZE); 0 disables caching
+    cache_size: int
+    # How long a cached result stays valid (SOLVER_CACHE_TTL_SECONDS)
+    cache_ttl_seconds: int
+    # Unfinished jobs allowed at once before POST /jobs answers 429 (SOLVER_MAX_JOBS)
+    max_jobs: int
+    # How long finished job results stay retrievable (SOLVER_JOB_TTL_SECONDS)
+    job_ttl_seconds: int
+    # OSRM-compatible base URL for /optimize/coordinates (OSRM_URL)
+    osrm_url: str
+    # Travel pairs kept in memory (SOLVER_PAIR_CACHE_SIZE); 0 disables caching
+    pair_cache_size: int
+    # How long a cached travel pair is trusted before refetching (SOLVER_PAIR_CACHE_TTL_SECONDS)
+    pair_cache_ttl_seconds: int
+    # SQLite file that keeps travel pairs across restarts (SOLVER_PAIR_CACHE_PATH); unset = memory only
+    pair_cache_path: str | None
+    # Run a small solve in every worker at startup before /ready says yes (SOLVER_WARM_WORKERS); 0 disables
+    warm_workers: bool
+    # Queued solves /ready tolerates on top of one per worker (SOLVER_READY_MAX_QUEUE)
+    ready_max_queue: int
+    # Search budgets up to this many seconds count as interactive (SOLVER_INTERACTIVE_MAX_SECONDS)
+    interactive_max_seconds: int
+    # Interactive solves waiting for a worker before 429 (SOLVER_INTERACTIVE_MAX_QUEUED)
+    interactive_max_queued: int
+    # Workers planning solves may hold at once (SOLVER_PLANNING_MAX_RUNNING); default leaves one free
+    planning_max_running: int
+    # Planning solves waiting for a worker before 429 (SOLVER_PLANNING_MAX_QUEUED)
+    planning_max_queued: int
+    # Workers batch entries may hold at once (SOLVER_BATCH_MAX_RUNNING); defaults to half
+    batch_max_running: int
+    # Batch entries waiting for a worker before they fail as busy (SOLVER_BATCH_MAX_QUEUED)
+    batch_max_queued: int
+    # Memory for registered matrices, least recently used evicted first (SOLVER_MATRIX_REGISTRY_MB)
+    matrix_registry_mb: int
+    # Open route sessions before POST /sessions answers 429 (SOLVER_MAX_SESSIONS)
+    max_sessions: int
+    # Sessions with no events for this long are closed (SOLVER_SESSION_TTL_SECONDS)
+    session_ttl_seconds: int
+    # Models up to this many nodes, depot included, are solved by exact search (SOLVER_EXACT_MAX_NODES); 0 disables
+    exact_max_nodes: int
+
+
+def load_settings() -> Settings:
+    """Build settings from the current environment."""
+    workers = max(1, _env_int("SOLVER_WORKERS", os.cpu_count() or 1))
+    return Settings(
+        solver_workers=workers,
+        max_batch_size=_env_int("SOLVER_MAX_BATCH_SIZE", 500),
+        cache_size=_env_int("SOLVER_CACHE_SIZE", 256),
+        cache_ttl_seconds=_env_int("SOLVER_CACHE_TTL_SECONDS", 60),
+        max_jobs=_env_int("SOLVER_MAX_JOBS", 100),
+        job_ttl_seconds=_env_int("SOLVER_JOB_TTL_SECONDS", 600),
+        osrm_url=_env_str("OSRM_URL", "http://localhost:5003"),
+        pair_cache_size=_env_int("SOLVER_PAIR_CACHE_SIZE", 500_000),
+        pair_cache_ttl_seconds=_env_int("SOLVER_PAIR_CACHE_TTL_SECONDS", 6 * 3600),
+        pair_cache_path=_env_str("SOLVER_PAIR_CACHE_PATH", "") or None,
+        warm_workers=_env_int("SOLVER_WARM_WORKERS", 1) > 0,
+        ready_max_queue=max(0, _env_int("SOLVER_READY_MAX_QUEUE", 0)),
+        interactive_max_seconds=_env_int("SOLVER_INTERACTIVE_MAX_SECONDS", 5),
+        interactive_max_queued=_env_int("SOLVER_INTERACTIVE_MAX_QUEUED", 50),
+        planning_max_running=max(1, _env_int("SOLVER_PLANNING_MAX_RUNNING", workers - 1)),
+        planning_max_queued=_env_int("SOLVER_PLANNING_MAX_QUEUED", 20),
+        batch_max_running=max(1, _env_int("SOLVER_BATCH_MAX_RUNNING", workers // 2)),
+        batch_max_queued=_env_int("SOLVER_BATCH_MAX_QUEUED", 1000),
+        matrix_registry_mb=_env_int("SOLVER_MATRIX_REGISTRY_MB", 128),
+        max_sessions=_env_int("SOLVER_MAX_SESSIONS", 500),
+        session_ttl_seconds=_env_int("SOLVER_SESSION_TTL_SECONDS", 12 * 3600),
+        # Exact search doubles in cost per node; 20 is as far as it is allowed to go
+        exact_max_nodes=min(20, _env_int("SOLVER_EXACT_MAX_NODES", 13)),
+    )
@@ -0,0 +1,405 @@
+"""Cluster-first, route-second decomposition for thousand-stop routes.
+
+A single routing model over 1000+ nodes barely gets past its first solution
+within our time limits. Instead:
+
+1. ``plan_clusters`` cuts an earliest-start greedy route into consecutive
+   chunks, so each cluster is compact in travel time and in time-window
+   order; without windows a small OR-Tools solve over the cluster medoids
+   re-orders them. Each cluster becomes its own sub-route request that
+   starts where the previous cluster hands over and is pulled towards the
+   stop where the next one picks up.
+2. The sub-requests are plain ``solve()`` calls, so they run in parallel
+   on the solver pool.
+3. ``stitch`` concatenates the sub-routes and recomputes ETAs over the
+   full matrices. It then repairs each cluster boundary with a 2-opt /
+   relocate pass and re-inserts dropped visits where they fit. Over
+   ``max_route_duration``, the visits that cost the route most time go.
+
+Planning and stitching are CPU-bound and run in pool workers too.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import numpy as np
+
+from .models import OptimizeRequest, OptimizeResponse, TimeWindow
+from .solver import EXACT_MAX_NODES, _build_data_model, _greedy_route, default_time_limit, solve
+
+logger = logging.getLogger(__name__)
+
+# Stops on each side of a cluster boundary that the repair pass may reorder
+BOUNDARY_WINDOW = 8
+
+# Routed stops considered as insertion neighbours for each dropped visit
+REINSERT_CANDIDATES = 10
+
+# Reassignment rounds when regrouping clusters of a route without windows
+KMEDOIDS_ROUNDS = 5
+
+# Search budget for the cluster-ordering solve
+ORDERING_TIME_LIMIT = 1
+
+# Stop reasons from sub-solves, most significant first
+_STOP_REASON_PRIORITY = ("CANCELLED", "TIME_LIMIT", "NO_IMPROVEMENT", "COMPLETED")
+
+
+@dataclass
+class ClusterPlan:
+    """Clusters in route order and the sub-request that solves each one."""
+
+    # Visit node indices per cluster, in visiting order of the clusters
+    clusters: list[list[int]]
+    # One sub-request per cluster; node 0 is the entry stop, node i is
+    # clusters[c][i - 1]
+    requests: list[OptimizeRequest]
+    # Visits no cluster could reach in time; they start dropped
+    unreachable: list[int]
+
+
+def _medoid(time_matrix: np.ndarray, members: list[int]) -> int:
+    """Member with the smallest total travel time to and from the others."""
+    sub = time_matrix[np.ix_(members, members)]
+    return members[int((sub.sum(axis=0) + sub.sum(axis=1)).argmin())]
+
+
+def _regroup(
+    time_matrix: np.ndarray, chunks: list[list[int]], medoids: list[int]
+) -> tuple[list[list[int]], list[int]]:
+    """A few k-medoids rounds: assign each visit to its nearest medoid, re-centre."""
+    visits = np.asarray([node for chunk in chunks for node in chunk])
+    for _ in range(KMEDOIDS_ROUNDS):
+        closeness = time_matrix[np.ix_(medoids, visits)] + time_matrix[np.ix_(visits, medoids)].T
+        assignment = closeness.argmin(axis=0)
+        groups = [visits[assignment == i].tolist() for i in range(len(medoids))]
+        chunks = [group for group in groups if group]
+        new_medoids = [_medoid(time_matrix, chunk) for chunk in chunks]
+        if new_medoids == medoids:
+            break
+        medoids = new_medoids
+    return chunks, medoids
+
+
+def _order_clusters(data: dict, medoids: list[int], return_to_depot: bool) -> list[int]:
+    """Order clusters with a small routing solve over their medoids.
+
+    The greedy chunk order is the warm start, and the fallback if the
+    ordering solve drops anything. Up to ``EXACT_MAX_NODES - 1`` clusters
+    the solve is exact and the warm start goes unused.
+    """
+    nodes = [data["depot"]] + medoids
+    greedy_order = list(range(1, len(nodes)))
+    ordering = solve(OptimizeRequest(
+        distance_matrix=data["distance_matrix"][np.ix_(nodes, nodes)].tolist(),
+        time_matrix=data["time_matrix"][np.ix_(nodes, nodes)].tolist(),
+        service_times=[0] * len(nodes),
+        return_to_depot=return_to_depot,
+        solver_time_limit_seconds=ORDERING_TIME_LIMIT,
+        initial_route=greedy_order,
+    ))
+    order = greedy_order if ordering.dropped_visits else ordering.visit_order
+    return [position - 1 for position in order]
+
+
+def plan_clusters(request: OptimizeRequest) -> ClusterPlan:
+    """Partition the visits and build one sub-request per cluster.
+
+    Each sub-request runs from an entry stop (the depot, or a stop of the
+    previous cluster) to a gate stop of its own where the next cluster picks
+    up: the gate is modelled as the "depot" return leg, so the sub-route is
+    pulled towards the next cluster instead of ending anywhere. With time
+    windows, the greedy route's chunks are already in time order and it
+    supplies the gates and the departure time each sub-route starts from.
+    Without windows the clusters are ordered by a small solve over their
+    medoids.
+    """
+    data = _build_data_model(request)
+    time_matrix, distance_matrix = data["time_matrix"], data["distance_matrix"]
+    depot = data["depot"]
+    num_visits = len(time_matrix) - 1
+    open_route = not request.return_to_depot
+    windowed = any(tw is not None for node, tw in enumerate(data["time_windows"]) if node != depot)
+
+    greedy = _greedy_route(data)
+    num_clusters = max(1, math.ceil(num_visits / request.cluster_size))
+    if len(greedy) < num_clusters:
+        # Too few visits reachable on time to seed the clusters (windows that
+        # have all closed, or a tight max_route_duration): route every visit
+        # as one cluster, which is the undivided request.
+        chunks = [[node for node in range(len(time_matrix)) if node != depot]]
+        gates, starts, unreachable = [], [None], []
+    else:
+        unreachable = sorted(set(range(len(time_matrix))) - set(greedy) - {depot})
+        chunks = [chunk.tolist() for chunk in np.array_split(greedy, num_clusters) if len(chunk)]
+        medoids = [_medoid(time_matrix, chunk) for chunk in chunks]
+
+        if windowed:
+            # Gate = last stop of each chunk on the greedy route, left at the
+            # greedy departure time. The greedy schedule meets every window
+            # it reached, so each cluster starts from a time it can work with.
+            arrivals, _, _, _ = _schedule(data, greedy, open_route)
+            departure = {
+                node: arrival + data["service_times"][node]
+                for node, arrival in zip(greedy, arrivals)
+            }
+            gates = [chunk[-1] for chunk in chunks[:-1]]
+            starts = [None] + [departure[gate] for gate in gates]
+        else:
+            # No windows to keep in order: regroup around the medoids so
+            # clusters are compact rather than stretches of one greedy path.
+            chunks, medoids = _regroup(time_matrix, chunks, medoids)
+            order = _order_clusters(data, medoids, request.return_to_depot)
+            chunks = [chunks[i] for i in order]
+            medoids = [medoids[i] for i in order]
+            gates = [
+                min(chunk, key=lambda node: time_matrix[node, target])
+                for chunk, target in zip(chunks, medoids[1:])
+            ]
+            starts = [None] * len(chunks)
+
+        # Visits the greedy pass couldn't reach on time still get a cluster:
+        # the one whose medoid is closest. The sub-solve may yet fit them in.
+        for node in unreachable:
+            nearest = int(np.argmin(time_matrix[medoids, node] + time_matrix[node, medoids]))
+            chunks[nearest].append(node)
+
+    requests = []
+    for position, members in enumerate(chunks):
+        entry = depot if position == 0 else gates[position - 1]
+        nodes = [entry] + members
+        sub_distance = distance_matrix[np.ix_(nodes, nodes)]
+        sub_time = time_matrix[np.ix_(nodes, nodes)]
+        last = position == len(chunks) - 1
+        if not last:
+            # Returning to node 0 means heading for this cluster's gate
+            sub_distance[:, 0] = distance_matrix[nodes, gates[position]]
+            sub_time[:, 0] = time_matrix[nodes, gates[position]]
+        elif not open_route:
+            sub_distance[:, 0] = distance_matrix[nodes, depot]
+            sub_time[:, 0] = time_matrix[nodes, depot]
+        sub_distance[0, 0] = sub_time[0, 0] = 0
+
+        start = starts[position]
+        entry_window = data["time_windows"][depot] if start is None else TimeWindow(
+            earliest=start, latest=start
+        )
+        initial_route = None
+        if request.initial_route:
+            local = {node: i + 1 for i, node in enumerate(members)}
+            initial_route = [local[node] for node in request.initial_route if node in local]
+        requests.append(OptimizeRequest(
+            distance_matrix=sub_distance.tolist(),
+            time_matrix=sub_time.tolist(),
+            time_windows=[entry_window] + [data["time_windows"][node] for node in members],
+            service_times=[0] + [data["service_times"][node] for node in members],
+            return_to_depot=not (last and open_route),
+            # Clusters keep the route's clock, so no part of it may run past
+            # the route's own limit; exact when there is a single cluster.
+            max_route_duration=request.max_route_duration,
+            solver_time_limit_seconds=request.solver_time_limit_seconds,
+            adaptive_stopping=request.adaptive_stopping,
+            no_improvement_seconds=request.no_improvement_seconds,
+            min_improvement_ratio=request.min_improvement_ratio,
+            neighbors=request.neighbors,
+            initial_route=initial_route or None,
+        ))
+
+    logger.info(
+        f"Decomposed {num_visits} visits into {len(chunks)} clusters "
+        f"(sizes {min(map(len, chunks))}-{max(map(len, chunks))}), "
+        f"{len(unreachable)} unreachable by the greedy pass"
+    )
+    return ClusterPlan(clusters=chunks, requests=requests, unreachable=unreachable)
+
+
+def _schedule(data: dict, order: list[int], open_route: bool) -> tuple[list[int], list[int], int, int]:
+    """Service start times along ``order`` over the full matrices.
+
+    Returns (arrivals, positions that miss their window, distance, duration),
+    with the same conventions as the routing model: arrivals wait for the
+    window to open, the route starts at the depot's earliest time, and a
+    round trip's duration includes the return leg.
+    """
+    windows, service = data["time_windows"], data["service_times"]
+    depot = data["depot"]
+    path = [depot] + order + ([] if open_route else [depot])
+    # Gather every leg at once; only the waiting needs a sequential pass
+    legs = data["time_matrix"][path[:-1], path[1:]].tolist()
+    distance = int(data["distance_matrix"][path[:-1], path[1:]].sum())
+    depot_window = windows[depot]
+    clock = depot_window.earliest if depot_window is not None else 0
+    node = depot
+    arrivals, late = [], []
+    for position, nxt in enumerate(order):
+        clock += service[node] + legs[position]
+        tw = windows[nxt]
+        if tw is not None:
+            if clock > tw.latest:
+                late.append(position)
+            clock = max(clock, tw.earliest)
+        arrivals.append(clock)
+        node = nxt
+    clock += service[node]
+    if not open_route:
+        clock += legs[-1]
+    return arrivals, late, distance, clock
+
+
+def _route_score(data: dict, order: list[int], open_route: bool) -> tuple[int, int]:
+    """(missed windows, distance) — what the repair pass minimizes."""
+    _, late, distance, _ = _schedule(data, order, open_route)
+    return len(late), distance
+
+
+def _removal_savings(data: dict, order: list[int], open_route: bool) -> np.ndarray:
+    """Route time each visit's removal saves: its service plus the detour.
+
+    Waiting for windows isn't counted, so this ranks visits rather than
+    predicting the new duration.
+    """
+    depot, time_matrix = data["depot"], data["time_matrix"]
+    nodes = np.asarray(order)
+    before = np.asarray([depot] + order[:-1])
+    savings = np.asarray(data["service_times"])[nodes] + time_matrix[before, nodes]
+    after = np.asarray(order[1:] + ([] if open_route else [depot]))
+    bridged = len(after)
+    savings[:bridged] += time_matrix[nodes[:bridged], after] - time_matrix[before[:bridged], after]
+    return savings
+
+
+def _repair_boundary(data: dict, order: list[int], boundary: int, open_route: bool) -> list[int]:
+    """First-improvement 2-opt and single-stop relocation around ``boundary``."""
+    lo = max(0, boundary - BOUNDARY_WINDOW)
+    hi = min(len(order), boundary + BOUNDARY_WINDOW)
+    best = _route_score(data, order, open_route)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(lo, hi - 1):
+            for j in range(i + 1, hi):
+                reversed_segment = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                moved = order[:i] + order[i + 1:j + 1] + [order[i]] + order[j + 1:]
+                for candidate in (reversed_segment, moved):
+                    score = _route_score(data, candidate, open_route)
+                    if score < best:
+                        order, best, improved = candidate, score, True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return order
+
+
+def _reinsert(data: dict, order: list[int], dropped: list[int], open_route: bool) -> tuple[list[int], list[int]]:
+    """Cheapest feasible insertion of dropped visits next to their nearest routed stops."""
+    time_matrix = data["time_matrix"]
+    still_dropped = []
+    for node in dropped:
+        if not order:
+            still_dropped.append(node)
+            continue
+        nearest = np.asarray(order)[np.argsort(time_matrix[order, node])[:REINSERT_CANDIDATES]]
+        where = {order.index(int(stop)) for stop in nearest}
+        positions = sorted(where | {position + 1 for position in where})
+        base = _route_score(data, order, open_route)
+        best_order, best_score = None, None
+        for position in positions:
+            candidate = order[:position] + [node] + order[position:]
+            score = _route_score(data, candidate, open_route)
+            if score[0] <= base[0] and (best_score is None or score < best_score):
+                best_order, best_score = candidate, score
+        if best_order is None:
+            still_dropped.append(node)
+        else:
+            order = best_order
+    return order, still_dropped
+
+
+def stitch(
+    request: OptimizeRequest, plan: ClusterPlan, results: list[OptimizeResponse]
+) -> OptimizeResponse:
+    """Combine per-cluster sub-routes into one route over the original nodes."""
+    data = _build_data_model(request)
+    open_route = not request.return_to_depot
+
+    order: list[int] = []
+    dropped: list[int] = []
+    boundaries: list[int] = []
+    for members, result in zip(plan.clusters, results):
+        if order:
+            boundaries.append(len(order))
+        order.extend(members[local - 1] for local in result.visit_order)
+        dropped.extend(members[local - 1] for local in result.dropped_visits)
+
+    for boundary in boundaries:
+        order = _repair_boundary(data, order, boundary, open_route)
+
+    # Sub-routes were solved against estimated start times; drop whatever
+    # the real combined schedule can't serve on time, then try to fit it
+    # (and the sub-solves' drops) back in elsewhere.
+    _, late, _, _ = _schedule(data, order, open_route)
+    while late:
+        dropped.append(order.pop(late[0]))
+        _, late, _, _ = _schedule(data, order, open_route)
+    order, dropped = _reinsert(data, order, sorted(dropped), open_route)
+
+    max_duration = data["max_route_duration"]
+    arrivals, _, distance, duration = _schedule(data, order, open_route)
+    while max_duration and duration > max_duration and order:
+        # Give up the visit that costs the route the most time, not the last one
+        position = int(_removal_savings(data, order, open_route).argmax())
+        dropped.append(order.pop(position))
+        arrivals, _, distance, duration = _schedule(data, order, open_route)
+
+    reasons = {result.stop_reason for result in results}
+    stop_reason = next((reason for reason in _STOP_REASON_PRIORITY if reason in reasons), None)
+    dropped = sorted(dropped)
+    return OptimizeResponse(
+        visit_order=order,
+        total_distance_meters=distance,
+        total_duration_seconds=duration,
+        estimated_arrivals=arrivals,
+        feasible=not dropped,
+        dropped_visits=dropped,
+        solver_status="FEASIBLE" if order else "NO_SOLUTION",
+        stop_reason=stop_reason,
+    )
+
+
+async def solve_decomposed(
+    request: OptimizeRequest, run: Callable[..., Awaitable[Any]], max_parallel: int
+) -> OptimizeResponse:
+    """Plan, solve every cluster concurrently through ``run`` and stitch.
+
+    ``run(fn, *args)`` executes ``fn`` off the event loop, e.g.
+    ``SolverPool.run``; the cluster solves are what run in parallel, at most
+    ``max_parallel`` at a time. The request's time limit covers the whole
+    call: what planning leaves of it is split evenly between the waves of
+    cluster solves. Requests that fit in a single cluster, or that the
+    exact engine can take whole, are solved directly.
+    """
+    num_nodes = len(request.distance_matrix)
+    if num_nodes - 1 <= request.cluster_size or num_nodes <= EXACT_MAX_NODES:
+        return await run(solve, request)
+    started = time.perf_counter()
+    budget = request.solver_time_limit_seconds or default_time_limit(num_nodes)
+    plan = await run(plan_clusters, request)
+    waves = math.ceil(len(plan.requests) / max(1, max_parallel))
+    remaining = budget - (time.perf_counter() - started)
+    cluster_limit = max(1, int(remaining / waves))
+    results = await asyncio.gather(*(
+        run(solve, sub.model_copy(update={"solver_time_limit_seconds": cluster_limit}))
+        for sub in plan.requests
+    ))
+    result = await run(stitch, request, plan, list(results))
+    logger.info(
+        f"Decomposed solve finished: {len(result.visit_order)} visits, "
+        f"dropped={len(result.dropped_visits)} after {time.perf_counter() - started:.3f}s"
+    )
+    return result
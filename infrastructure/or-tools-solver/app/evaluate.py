@@ -0,0 +1,121 @@
+"""Score fixed visit orders without a search: ETAs, totals and window violations.
+
+Manual reorders and what-if comparisons only need to know what a given
+order costs. Every candidate is evaluated at once on arrays: with waiting
+for windows, the arrival at position p is
+
+    arrival[p] = max(earliest[p], arrival[p-1] + leg[p])
+
+which unrolls to ``C[p] + max(start, max over j<=p of earliest[j] - C[j])``
+with ``C`` the prefix sum of legs, i.e. a cumulative sum and a running
+maximum per row. The conventions are ``solve()``'s: the same service-time
+defaults, the route leaves the depot at its earliest time, arrivals wait for
+a window to open, and a round trip's duration includes the return leg.
+"""
+
+import numpy as np
+
+from .models import EvaluateRequest, EvaluateResponse, RouteEvaluation
+from .solver import _build_data_model
+
+
+def _windows(data: dict) -> tuple[np.ndarray, np.ndarray]:
+    """(earliest, latest) per node; missing or inverted windows are unconstrained."""
+    num_nodes = len(data["time_matrix"])
+    earliest = np.zeros(num_nodes, dtype=np.int64)
+    latest = np.full(num_nodes, np.iinfo(np.int64).max, dtype=np.int64)
+    for node, tw in enumerate(data["time_windows"]):
+        # Same rule as the routing model: earliest > latest is treated as no window
+        if tw is not None and tw.earliest <= tw.latest:
+            earliest[node], latest[node] = tw.earliest, tw.latest
+    return earliest, latest
+
+
+def score_orders(data: dict, orders: list[list[int]], open_route: bool) -> dict[str, np.ndarray]:
+    """Evaluate candidate orders over a data model from ``_build_data_model``.
+
+    Orders may differ in length. Returns arrays indexed by candidate:
+    ``distance``, ``duration`` and ``lateness`` (seconds past windows, summed),
+    plus (candidates x longest order) ``arrivals`` and ``late`` and the
+    ``valid`` mask of real positions.
+    """
+    time_matrix, distance_matrix = data["time_matrix"], data["distance_matrix"]
+    service = np.asarray(data["service_times"], dtype=np.int64)
+    depot = data["depot"]
+    earliest, latest = _windows(data)
+    start = earliest[depot]
+
+    lengths = np.fromiter(map(len, orders), dtype=np.int64, count=len(orders))
+    width = max(int(lengths.max(initial=0)), 1)
+    valid = np.arange(width) < lengths[:, None]
+    nodes = np.full((len(orders), width), depot, dtype=np.int64)
+    nodes[valid] = np.fromiter(
+        (node for order in orders for node in order), dtype=np.int64, count=int(lengths.sum())
+    )
+    previous = np.empty_like(nodes)
+    previous[:, 0] = depot
+    previous[:, 1:] = nodes[:, :-1]
+
+    legs = np.where(valid, service[previous] + time_matrix[previous, nodes], 0)
+    elapsed = np.cumsum(legs, axis=1)
+    opens = np.where(valid, earliest[nodes], np.iinfo(np.int64).min // 2)
+    waited = np.maximum(np.maximum.accumulate(opens - elapsed, axis=1), start)
+    arrivals = elapsed + waited
+    late = valid & (arrivals > latest[nodes])
+    lateness = np.where(late, arrivals - latest[nodes], 0).sum(axis=1)
+
+    rows = np.arange(len(orders))
+    last_position = np.maximum(lengths - 1, 0)
+    last = nodes[rows, last_position]
+    distance = np.where(valid, distance_matrix[previous, nodes], 0).sum(axis=1)
+    duration = arrivals[rows, last_position] + service[last]
+    if not open_route:
+        distance = distance + distance_matrix[last, depot]
+        duration = duration + time_matrix[last, depot]
+    empty = lengths == 0
+    distance[empty] = duration[empty] = 0
+    return {
+        "distance": distance,
+        "duration": duration,
+        "lateness": lateness,
+        "arrivals": arrivals,
+        "late": late,
+        "valid": valid,
+    }
+
+
+def evaluate(request: EvaluateRequest) -> EvaluateResponse:
+    """Score every order in ``request.orders``."""
+    data = _build_data_model(request)
+    scores = score_orders(data, request.orders, not request.return_to_depot)
+    max_duration = request.max_route_duration
+    over_duration = (
+        scores["duration"] > max_duration if max_duration
+        else np.zeros(len(request.orders), dtype=bool)
+    )
+
+    late_orders, late_positions = np.nonzero(scores["late"])
+    late_visits: list[list[int]] = [[] for _ in request.orders]
+    for k, position in zip(late_orders.tolist(), late_positions.tolist()):
+        late_visits[k].append(request.orders[k][position])
+    arrivals = (
+        [row[:len(order)] for row, order in zip(scores["arrivals"].tolist(), request.orders)]
+        if request.include_arrivals else [None] * len(request.orders)
+    )
+
+    results = [
+        RouteEvaluation(
+            total_distance_meters=distance,
+            total_duration_seconds=duration,
+            estimated_arrivals=etas,
+            late_visits=late,
+            lateness_seconds=lateness,
+            exceeds_max_duration=over,
+            feasible=not late and not over,
+        )
+        for distance, duration, etas, late, lateness, over in zip(
+            scores["distance"].tolist(), scores["duration"].tolist(), arrivals,
+            late_visits, scores["lateness"].tolist(), over_duration.tolist(),
+        )
+    ]
+    return EvaluateResponse(results=results)
@@ -0,0 +1,170 @@
+"""Exact bitmask dynamic programming for routes with a handful of stops.
+
+Most routes have 3–12 stops. For those OR-Tools builds a full model and runs
+guided local search until it stalls, to land on a route that exhaustive
+search proves optimal in milliseconds. Here the search is Held–Karp over
+(set of visited stops, last stop), extended one stop per layer on arrays.
+
+The model is ``solve()``'s: arc cost is distance; a stop's arrival is
+``max(earliest, previous arrival + service at previous + travel)`` and must
+not pass its window's latest (both clamped to the horizon); the route ends
+at the depot (round trip) or after the last stop's service (open route),
+no later than the horizon, which is ``max_route_duration`` when set. Any
+visit may be dropped for ``DROP_PENALTY``. The depot's window bounds the
+departure, as it bounds the start cumul there, and the route leaves at its
+earliest (0 without one): every other constraint is an upper bound on
+arrival times, so leaving later never makes a route feasible that isn't
+already.
+
+Arrival times make one label per state insufficient: a longer path that
+arrives earlier can still reach a window the shorter one misses. Each state
+keeps the Pareto front of (distance, arrival) labels instead, so the result
+is optimal under windows too, not just a good heuristic.
+"""
+
+import time
+
+import numpy as np
+
+from .models import OptimizeResponse, SolverTimings
+from .solver import DROP_PENALTY, _window_bounds
+
+# search_config reported for routes this engine solved
+EXACT_SEARCH_CONFIG = "EXACT_DP"
+
+# Bitmasks and the Pareto keys (mask * nodes) stay well inside int64 up to here
+MAX_EXACT_NODES = 20
+
+
+def _bounds(data: dict) -> tuple[np.ndarray, np.ndarray]:
+    """(earliest, latest) per node as the routing model sets them, depot included."""
+    horizon = data["horizon"]
+    bounds = [
+        _window_bounds(node, tw, horizon) for node, tw in enumerate(data["time_windows"])
+    ]
+    earliest, latest = np.array(bounds, dtype=np.int64).T
+    return earliest, latest
+
+
+def _pareto(key: np.ndarray, dist: np.ndarray, arrival: np.ndarray, horizon: int) -> np.ndarray:
+    """Indices of the labels no other label with the same ``key`` dominates.
+
+    Sorted by (key, distance), a label survives when it arrives strictly
+    earlier than every label before it in its group; on an exact distance
+    tie a dominated label may survive too, which costs time, not optimality.
+    The running minimum restarts per group on its own: arrivals are offset
+    by ``-key * (horizon + 1)``, so each group sits below all earlier ones.
+    """
+    span = int(dist.max()) + 1
+    if int(key.max()) * span < 2**62:
+        # One int64 sort is an order of magnitude faster than lexsort. Stable,
+        # so equal-cost routes resolve to the earliest-built one every time.
+        order = np.argsort(key * span + dist, kind="stable")
+    else:
+        order = np.lexsort((arrival, dist, key))
+    shifted = arrival[order] - key[order] * (horizon + 1)
+    best_before = np.minimum.accumulate(shifted)
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = shifted[1:] < best_before[:-1]
+    return order[keep]
+
+
+def solve_exact(data: dict, open_route: bool) -> tuple[list[int], list[int], int, int]:
+    """Optimal (visit_order, arrivals, distance, duration) for a data model.
+
+    ``data`` comes from ``_build_data_model`` and has at most
+    ``MAX_EXACT_NODES`` nodes. Visits left out of ``visit_order`` are the
+    ones the optimum drops.
+    """
+    distance = data["distance_matrix"]
+    num_nodes = len(distance)
+    if num_nodes > MAX_EXACT_NODES:
+        raise ValueError(f"exact search is limited to {MAX_EXACT_NODES} nodes, got {num_nodes}")
+    horizon = data["horizon"]
+    service = np.asarray(data["service_times"], dtype=np.int64)
+    transit = data["time_matrix"] + service[:, None]
+    earliest, latest = _bounds(data)
+    visits = np.arange(1, num_nodes)
+    bits = np.int64(1) << (visits - 1)
+
+    # One layer per route length: label arrays plus each label's parent row
+    mask = np.zeros(1, dtype=np.int64)
+    last = np.zeros(1, dtype=np.int64)
+    dist = np.zeros(1, dtype=np.int64)
+    arrival = earliest[:1].copy()  # departure from the depot
+    layers = [(last, arrival, np.full(1, -1))]
+    best = None  # (cost, duration, layer, row, distance)
+
+    for served in range(num_nodes):
+        # Close every route of this length and keep the cheapest
+        end = arrival + service[last]
+        end_dist = dist
+        if not open_route:
+            end = end + data["time_matrix"][last, 0]
+            end_dist = dist + distance[last, 0]
+        cost = end_dist + DROP_PENALTY * (num_nodes - 1 - served)
+        closing = np.flatnonzero(end <= horizon)
+        if len(closing):
+            row = closing[np.lexsort((end[closing], cost[closing]))[0]]
+            candidate = (int(cost[row]), int(end[row]), served, int(row), int(end_dist[row]))
+            if best is None or candidate[:2] < best[:2]:
+                best = candidate
+        if served == num_nodes - 1:
+            break
+
+        # Extend every label by every unvisited stop it can reach in time
+        reach = np.maximum(earliest[visits], arrival[:, None] + transit[last][:, visits])
+        ok = ((mask[:, None] & bits) == 0) & (reach <= latest[visits])
+        parent, column = np.nonzero(ok)
+        if not len(parent):
+            break
+        nxt = visits[column]
+        mask = mask[parent] | bits[column]
+        dist = dist[parent] + distance[last[parent], nxt]
+        arrival = reach[parent, column]
+        keep = _pareto(mask * num_nodes + nxt, dist, arrival, horizon)
+        mask, last, dist, arrival = mask[keep], nxt[keep], dist[keep], arrival[keep]
+        layers.append((last, arrival, parent[keep]))
+
+    # The empty route always closes unless the depot alone overruns the horizon
+    if best is None:
+        return [], [], 0, 0
+    _, duration, layer, row, total_distance = best
+    visit_order, arrivals = [], []
+    while layer > 0:
+        nodes, times, parents = layers[layer]
+        visit_order.append(int(nodes[row]))
+        arrivals.append(int(times[row]))
+        row = int(parents[row])
+        layer -= 1
+    return visit_order[::-1], arrivals[::-1], total_distance, duration
+
+
+def exact_response(
+    data: dict, open_route: bool, started: float, data_model_seconds: float
+) -> OptimizeResponse:
+    """``solve_exact`` as a finished OptimizeResponse, status OPTIMAL."""
+    search_started = time.perf_counter()
+    visit_order, arrivals, total_distance, duration = solve_exact(data, open_route)
+    search_seconds = time.perf_counter() - search_started
+    dropped = sorted(set(range(1, len(data["distance_matrix"]))) - set(visit_order))
+    return OptimizeResponse(
+        visit_order=visit_order,
+        total_distance_meters=total_distance,
+        total_duration_seconds=duration,
+        estimated_arrivals=arrivals,
+        feasible=not dropped,
+        dropped_visits=dropped,
+        solver_status="OPTIMAL",
+        stop_reason="COMPLETED",
+        time_to_best_seconds=round(search_seconds, 3),
+        search_config=EXACT_SEARCH_CONFIG,
+        timings=SolverTimings(
+            data_model_seconds=round(data_model_seconds, 6),
+            model_build_seconds=0.0,
+            first_solution_seconds=round(search_seconds, 6),
+            search_seconds=0.0,
+            extraction_seconds=0.0,
+            total_seconds=round(time.perf_counter() - started, 6),
+        ),
+    )
@@ -0,0 +1,240 @@
+"""Fleet solve: assign visits to drivers and sequence every route in one model.
+
+Solving per driver fixes the assignment before the search sees it, so a
+visit near the border of two territories stays with whichever driver it
+was handed, however much the other could save. Here all vehicles share one
+``RoutingModel``: local search moves visits between routes as well as
+within them, with every shift, capacity and time window checked together.
+"""
+
+import logging
+import time
+
+import numpy as np
+from ortools.constraint_solver import pywrapcp
+
+from .models import (
+    FleetOptimizeRequest,
+    FleetOptimizeResponse,
+    SolverTimings,
+    Vehicle,
+    VehicleRoute,
+)
+from .solver import (
+    DEFAULT_SEARCH_CONFIG,
+    DEFAULT_SERVICE_TIME,
+    DROP_PENALTY,
+    SearchConfig,
+    _as_array,
+    _extract_route,
+    _horizon,
+    _routing_matrices,
+    _search_parameters,
+    _SearchWatch,
+    _window_bounds,
+    default_stall_seconds,
+    default_time_limit,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _build_fleet_data(request: FleetOptimizeRequest) -> dict:
+    """Data model in the shape ``_routing_matrices`` expects, plus the fleet's parts.
+
+    Start and end nodes ("terminals") default to no service time and no
+    demand; every other node is a visit.
+    """
+    distance_matrix = _as_array(request.distance_matrix)
+    time_matrix = _as_array(request.time_matrix)
+    num_nodes = len(distance_matrix)
+    vehicles = request.vehicles
+    terminals = {v.start for v in vehicles} | {v.end for v in vehicles if v.end is not None}
+    visits = [node for node in range(num_nodes) if node not in terminals]
+
+    service_times = list(request.service_times)
+    service_times += [
+        0 if node in terminals else DEFAULT_SERVICE_TIME
+        for node in range(len(service_times), num_nodes)
+    ]
+    time_windows = list(request.time_windows) + [None] * (num_nodes - len(request.time_windows))
+    demands = list(request.demands) + [1] * (num_nodes - len(request.demands))
+    # A terminal is not picked up, so it must not eat into capacity
+    for node in terminals:
+        demands[node] = 0
+
+    horizon = max(
+        [_horizon(time_matrix, service_times, time_windows)]
+        + [v.shift.latest for v in vehicles if v.shift is not None]
+        + [v.max_duration for v in vehicles if v.max_duration]
+    )
+    distance_rows = request.distance_matrix
+    return {
+        "distance_matrix": distance_matrix,
+        "distance_rows": None if isinstance(distance_rows, np.ndarray) else distance_rows,
+        "time_matrix": time_matrix,
+        "time_windows": time_windows,
+        "service_times": service_times,
+        "demands": demands,
+        "visits": visits,
+        "horizon": horizon,
+    }
+
+
+def _build_fleet_model(
+    data: dict,
+    vehicles: list[Vehicle],
+    dist_matrix: list[list[int]],
+    transit_matrix: list[list[int]],
+    end_node: int | None,
+) -> tuple[pywrapcp.RoutingIndexManager, pywrapcp.RoutingModel, pywrapcp.RoutingDimension]:
+    """Index manager, routing model and time dimension for the whole fleet.
+
+    ``end_node`` is the open-route dummy shared by every vehicle without an
+    ``end``. Start and end cumuls are bounded per vehicle, since
+    ``NodeToIndex`` can't address a node several vehicles start or end at.
+    """
+    starts = [vehicle.start for vehicle in vehicles]
+    ends = [end_node if vehicle.end is None else vehicle.end for vehicle in vehicles]
+    manager = pywrapcp.RoutingIndexManager(len(dist_matrix), len(vehicles), starts, ends)
+    routing = pywrapcp.RoutingModel(manager)
+
+    routing.SetArcCostEvaluatorOfAllVehicles(routing.RegisterTransitMatrix(dist_matrix))
+    horizon = data["horizon"]
+    time_cb_index = routing.RegisterTransitMatrix(transit_matrix)
+    routing.AddDimension(time_cb_index, horizon, horizon, False, "Time")
+    time_dimension = routing.GetDimensionOrDie("Time")
+
+    time_windows = data["time_windows"]
+    for node in data["visits"]:
+        index = manager.NodeToIndex(node)
+        time_dimension.CumulVar(index).SetRange(*_window_bounds(node, time_windows[node], horizon))
+        routing.AddDisjunction([index], DROP_PENALTY)
+
+    for v, vehicle in enumerate(vehicles):
+        departure = time_dimension.CumulVar(routing.Start(v))
+        arrival = time_dimension.CumulVar(routing.End(v))
+        departure.SetRange(*_window_bounds(vehicle.start, time_windows[vehicle.start], horizon))
+        if vehicle.end is not None:
+            arrival.SetRange(*_window_bounds(vehicle.end, time_windows[vehicle.end], horizon))
+        if vehicle.shift is not None:
+            departure.SetMin(min(vehicle.shift.earliest, horizon))
+            arrival.SetMax(min(vehicle.shift.latest, horizon))
+        if vehicle.max_duration:
+            time_dimension.SetSpanUpperBoundForVehicle(vehicle.max_duration, v)
+        # Finish as early as possible, then leave as late as that allows, so
+        # a route's duration doesn't count idling at the start
+        routing.AddVariableMinimizedByFinalizer(arrival)
+        routing.AddVariableMaximizedByFinalizer(departure)
+
+    if any(vehicle.capacity is not None for vehicle in vehicles):
+        demands = data["demands"] + [0] * (len(dist_matrix) - len(data["demands"]))
+        unlimited = sum(demands)
+        routing.AddDimensionWithVehicleCapacity(
+            routing.RegisterUnaryTransitVector(demands),
+            0,  # no slack
+            [unlimited if vehicle.capacity is None else vehicle.capacity for vehicle in vehicles],
+            True,  # loads start at zero
+            "Load",
+        )
+    return manager, routing, time_dimension
+
+
+def solve_fleet(
+    request: FleetOptimizeRequest, search_config: SearchConfig = DEFAULT_SEARCH_CONFIG
+) -> FleetOptimizeResponse:
+    """Assign and sequence every visit across ``request.vehicles`` in one search."""
+    started = time.perf_counter()
+    data = _build_fleet_data(request)
+    data_model_seconds = time.perf_counter() - started
+    num_nodes = len(data["distance_matrix"])
+    vehicles = request.vehicles
+
+    build_started = time.perf_counter()
+    open_route = any(vehicle.end is None for vehicle in vehicles)
+    dist_matrix, transit_matrix, dummy = _routing_matrices(data, open_route)
+    manager, routing, time_dimension = _build_fleet_model(
+        data, vehicles, dist_matrix, transit_matrix, dummy
+    )
+    time_limit = request.solver_time_limit_seconds or default_time_limit(num_nodes)
+    stall_seconds = None
+    if request.adaptive_stopping:
+        stall_seconds = request.no_improvement_seconds or default_stall_seconds(num_nodes)
+    search_params = _search_parameters(time_limit, search_config)
+    watch = _SearchWatch(
+        routing, manager, time_dimension, dist_matrix, num_nodes, None, None, stall_seconds, 0.0
+    )
+    routing.CloseModelWithParameters(search_params)
+    model_build_seconds = time.perf_counter() - build_started
+
+    logger.info(
+        f"Solving fleet: {num_nodes} nodes, {len(data['visits'])} visits, "
+        f"{len(vehicles)} vehicles, time_limit={time_limit}s, stall={stall_seconds}s"
+    )
+    watch.start()
+    solution = routing.SolveWithParameters(search_params)
+    elapsed = time.perf_counter() - watch.started
+    stop_reason = watch.stop_reason
+    if stop_reason is None:
+        stop_reason = "TIME_LIMIT" if elapsed >= time_limit * 0.99 else "COMPLETED"
+    first_solution = watch.first_at if watch.first_at is not None else elapsed
+
+    def timings(extraction_seconds: float) -> SolverTimings:
+        return SolverTimings(
+            data_model_seconds=round(data_model_seconds, 6),
+            model_build_seconds=round(model_build_seconds, 6),
+            first_solution_seconds=round(first_solution, 6) if solution else None,
+            search_seconds=round(elapsed - first_solution if solution else elapsed, 6),
+            extraction_seconds=round(extraction_seconds, 6),
+            total_seconds=round(time.perf_counter() - started, 6),
+        )
+
+    if not solution:
+        logger.warning(f"No fleet solution found. Status: {routing.status()}")
+        return FleetOptimizeResponse(
+            routes=[],
+            total_distance_meters=0,
+            dropped_visits=data["visits"],
+            feasible=False,
+            solver_status="NO_SOLUTION",
+            stop_reason=stop_reason,
+            timings=timings(0.0),
+        )
+
+    extract_started = time.perf_counter()
+    routes = []
+    for v in range(len(vehicles)):
+        visit_order, arrivals, distance, route_end = _extract_route(
+            routing, manager, time_dimension, dist_matrix, solution.Value, solution.Value, v
+        )
+        departure = solution.Value(time_dimension.CumulVar(routing.Start(v)))
+        routes.append(VehicleRoute(
+            vehicle=v,
+            visit_order=visit_order,
+            estimated_arrivals=arrivals,
+            departure_seconds=departure,
+            total_distance_meters=distance,
+            total_duration_seconds=route_end - departure,
+            load=sum(data["demands"][node] for node in visit_order),
+        ))
+    served = {node for route in routes for node in route.visit_order}
+    dropped_visits = [node for node in data["visits"] if node not in served]
+    total_distance = sum(route.total_distance_meters for route in routes)
+    # Same status mapping as solve()
+    solver_status = "OPTIMAL" if routing.status() == 1 else "FEASIBLE"
+
+    logger.info(
+        f"Fleet solution: {sum(1 for route in routes if route.visit_order)} routes used, "
+        f"distance={total_distance}m, dropped={len(dropped_visits)}, status={solver_status}, "
+        f"stop={stop_reason} after {elapsed:.3f}s (best at {watch.best_at:.3f}s)"
+    )
+    return FleetOptimizeResponse(
+        routes=routes,
+        total_distance_meters=total_distance,
+        dropped_visits=dropped_visits,
+        feasible=not dropped_visits,
+        solver_status=solver_status,
+        stop_reason=stop_reason,
+        time_to_best_seconds=round(watch.best_at, 3),
+        timings=timings(time.perf_counter() - extract_started),
+    )
@@ -0,0 +1,96 @@
+"""Cheapest insertion of new visits into existing routes, for live dispatch.
+
+A new order only needs to know where it fits into each candidate driver's
+current route and what that costs, not a fresh search. Every position for
+every pending visit is scored in one ``score_orders`` call; the cheapest
+feasible one is taken and the rest re-scored against the updated route,
+until every visit is placed or none fits.
+"""
+
+import numpy as np
+
+from .evaluate import score_orders
+from .models import (
+    InsertionRequest,
+    InsertionResponse,
+    RouteInsertionRequest,
+    RouteInsertionResult,
+    VisitInsertion,
+)
+from .solver import _build_data_model
+
+
+def insert_into_route(request: RouteInsertionRequest) -> RouteInsertionResult:
+    """Insert ``request.new_visits`` into ``request.visit_order`` one by one.
+
+    An insertion is feasible when it adds no late visit or lateness on top
+    of what the current route already has, and keeps the route within
+    ``max_route_duration`` (unless it was already over). Among feasible
+    ones the smallest distance increase wins, then the smallest duration
+    increase.
+    """
+    data = _build_data_model(request)
+    open_route = not request.return_to_depot
+    max_duration = request.max_route_duration
+
+    def score(orders: list[list[int]]) -> tuple[np.ndarray, ...]:
+        scores = score_orders(data, orders, open_route)
+        return (
+            scores["distance"], scores["duration"], scores["late"].sum(axis=1),
+            scores["lateness"], scores["arrivals"],
+        )
+
+    order = list(request.visit_order)
+    base = score([order])
+    start_distance, start_duration = int(base[0][0]), int(base[1][0])
+    pending = list(request.new_visits)
+    insertions: list[VisitInsertion] = []
+    while pending:
+        candidates = [
+            (visit, position)
+            for visit in pending
+            for position in range(len(order) + 1)
+        ]
+        scored = score(
+            [order[:position] + [visit] + order[position:] for visit, position in candidates]
+        )
+        distance, duration, late, lateness, _ = scored
+        feasible = (late <= base[2][0]) & (lateness <= base[3][0])
+        if max_duration and base[1][0] <= max_duration:
+            feasible &= duration <= max_duration
+        if not feasible.any():
+            break
+        best = int(np.lexsort((duration, distance, ~feasible))[0])
+        visit, position = candidates[best]
+        insertions.append(VisitInsertion(
+            visit=visit,
+            position=position,
+            distance_delta=int(distance[best] - base[0][0]),
+            duration_delta=int(duration[best] - base[1][0]),
+        ))
+        order.insert(position, visit)
+        pending.remove(visit)
+        base = tuple(values[best:best + 1] for values in scored)
+
+    distance, duration = int(base[0][0]), int(base[1][0])
+    return RouteInsertionResult(
+        visit_order=order,
+        insertions=insertions,
+        unplaced_visits=pending,
+        distance_delta=distance - start_distance,
+        duration_delta=duration - start_duration,
+        total_distance_meters=distance,
+        total_duration_seconds=duration,
+        estimated_arrivals=base[4][0, :len(order)].tolist() if order else [],
+        feasible=not pending,
+    )
+
+
+def insert_visits(request: InsertionRequest) -> InsertionResponse:
+    """Insert into every route and name the cheapest one that takes all its new visits."""
+    results = [insert_into_route(route) for route in request.routes]
+    placed = [k for k, result in enumerate(results) if result.feasible]
+    best_route = min(
+        placed, key=lambda k: (results[k].distance_delta, results[k].duration_delta), default=None
+    )
+    return InsertionResponse(results=results, best_route=best_route)
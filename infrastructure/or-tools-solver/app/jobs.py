@@ -0,0 +1,160 @@
+"""Asynchronous solve jobs: submit now, poll for the result, or cancel.
+
+Long solves (30–60 s limits) don't fit in one HTTP request behind proxies
+with short timeouts. A job runs on the shared solver pool; its result is kept
+in memory for ``ttl_seconds`` after it finishes and then forgotten.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import CancelledError, Future
+from typing import Callable
+
+from .models import JobStatus, OptimizeRequest, OptimizeResponse
+from .pool import PoolSaturated, SolverPool
+from .progress import solve_with_progress
+
+logger = logging.getLogger(__name__)
+
+
+class JobLimitExceeded(Exception):
+    """Raised when too many jobs are already queued or running."""
+
+
+class Job:
+    """One submitted solve and its lifecycle."""
+
+    def __init__(self, request: OptimizeRequest, cancel):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.cancel_event = cancel
+        self.future: Future | None = None
+        self.submitted_at = time.time()
+        self.finished_at: float | None = None
+        self.cancel_requested = False
+        self.result: OptimizeResponse | None = None
+        self.error: str | None = None
+        self.failed = False
+
+    @property
+    def status(self) -> str:
+        if self.finished_at is None:
+            if self.cancel_requested:
+                # Cancelled in the queue, it never took a worker to wait for
+                return "cancelled" if self.future.cancelled() else "cancelling"
+            return "running" if self.future is not None and self.future.running() else "queued"
+        if self.cancel_requested:
+            return "cancelled"
+        return "failed" if self.failed else "succeeded"
+
+    def to_status(self) -> JobStatus:
+        return JobStatus(
+            job_id=self.id,
+            status=self.status,
+            submitted_at=self.submitted_at,
+            finished_at=self.finished_at,
+            result=self.result,
+            error=self.error,
+        )
+
+
+class JobStore:
+    """In-memory job registry on top of the solver pool.
+
+    ``on_result(request, result)`` is called in the event loop for every job
+    that produces a result (e.g. to record metrics).
+    """
+
+    def __init__(
+        self,
+        pool: SolverPool,
+        max_active: int,
+        ttl_seconds: float,
+        on_result: Callable[[OptimizeRequest, OptimizeResponse], None] | None = None,
+    ):
+        self.pool = pool
+        self.max_active = max_active
+        self.ttl_seconds = ttl_seconds
+        self.on_result = on_result
+        self._jobs: dict[str, Job] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(
+        self, request: OptimizeRequest, priority: str = "planning", cost_seconds: float = 1.0
+    ) -> Job:
+        """Start a job, or raise JobLimitExceeded if too many are unfinished.
+
+        PoolSaturated from the pool propagates when the class's queue is full.
+        """
+        self._prune()
+        active = sum(1 for job in self._jobs.values() if job.finished_at is None)
+        if active >= self.max_active:
+            raise JobLimitExceeded(f"{active} jobs are already queued or running")
+
+        job = Job(request, self.pool.manager().Event())
+        try:
+            job.future = self.pool.submit(
+                solve_with_progress, request, None, job.cancel_event,
+                priority=priority, cost_seconds=cost_seconds,
+            )
+        except PoolSaturated:
+            self.pool.release(job.cancel_event)
+            raise
+        self._jobs[job.id] = job
+        task = asyncio.ensure_future(self._watch(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"Job {job.id} submitted: {len(request.distance_matrix)} nodes")
+        return job
+
+    async def _watch(self, job: Job) -> None:
+        try:
+            job.result = await asyncio.wrap_future(job.future)
+            if job.result is not None:
+                if self.on_result is not None:
+                    self.on_result(job.request, job.result)
+                if not job.request.include_timings:
+                    job.result = job.result.model_copy(update={"timings": None})
+        except (CancelledError, asyncio.CancelledError):
+            pass  # cancelled before a worker picked it up
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            job.failed = True
+            job.error = f"Solver error: {str(e)}"
+        finally:
+            job.finished_at = time.time()
+            logger.info(f"Job {job.id} finished: {job.status}")
+
+    def get(self, job_id: str) -> Job | None:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Stop a job. A running search keeps the best route found so far as
+        the job's result; the job is ``cancelling`` until its worker returns
+        and ``cancelled`` after."""
+        job = self.get(job_id)
+        if job is None or job.finished_at is not None:
+            return job
+        job.cancel_requested = True
+        job.cancel_event.set()
+        job.future.cancel()  # only succeeds while still queued
+        return job
+
+    def _prune(self) -> None:
+        """Forget finished jobs whose results have outlived the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        counts: dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"max_active": self.max_active, "ttl_seconds": self.ttl_seconds, **counts}
@@ -1,37 +1,201 @@
 """OR-Tools VRP Solver — FastAPI application."""
 
+import asyncio
+import json
 import logging
-from fastapi import FastAPI, HTTPException
-from .models import OptimizeRequest, OptimizeResponse
-from .solver import solve
+import queue
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import ValidationError
+from .admission import estimated_seconds, request_priority
+from .cache import ResultCache, request_key
+from .codec import REQUEST_CONTENT_TYPE, RESPONSE_CONTENT_TYPE, decode_request, encode_response
+from .config import load_settings
+from .decompose import solve_decomposed
+from .evaluate import evaluate
+from .exact import EXACT_SEARCH_CONFIG
+from .fleet import solve_fleet
+from .insertion import insert_visits
+from .jobs import JobLimitExceeded, JobStore
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import SolverMetrics
+from .models import (
+    BatchItemResult,
+    BatchOptimizeRequest,
+    CoordinateOptimizeRequest,
+    EvaluateRequest,
+    EvaluateResponse,
+    FleetOptimizeRequest,
+    FleetOptimizeResponse,
+    HandleOptimizeRequest,
+    InsertionRequest,
+    InsertionResponse,
+    JobStatus,
+    MatrixHandle,
+    MatrixUploadRequest,
+    OptimizeRequest,
+    OptimizeResponse,
+    RouteOptions,
+    RouteSessionRequest,
+    RouteSessionState,
+    SessionUpdate,
+    SolutionEvent,
+)
+from .osrm import MatrixBuilder, OsrmClient, OsrmError, PairCache
+from .pool import ClassLimits, PoolSaturated, SolverPool
+from .portfolio import SEARCH_PORTFOLIO, solve_portfolio
+from .progress import solve_with_progress
+from .registry import MatrixRegistry, UnknownMatrix
+from .sessions import SessionLimitExceeded, SessionStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Reference point for the startup time /ready reports
+_imported_at = time.perf_counter()
+
+settings = load_settings()
+pool = SolverPool(settings.solver_workers, {
+    "interactive": ClassLimits(settings.solver_workers, settings.interactive_max_queued),
+    "planning": ClassLimits(settings.planning_max_running, settings.planning_max_queued),
+    "batch": ClassLimits(settings.batch_max_running, settings.batch_max_queued),
+})
+cache = ResultCache(settings.cache_size, settings.cache_ttl_seconds)
+metrics = SolverMetrics()
+osrm = OsrmClient(settings.osrm_url)
+pair_cache = PairCache(
+    settings.pair_cache_size, settings.pair_cache_ttl_seconds, settings.pair_cache_path
+)
+matrices = MatrixBuilder(osrm, pair_cache)
+registry = MatrixRegistry(settings.matrix_registry_mb * 1024 * 1024)
+jobs = JobStore(
+    pool, settings.max_jobs, settings.job_ttl_seconds,
+    on_result=lambda request, result: metrics.observe_solve(request, result),
+)
+sessions = SessionStore(
+    pool, settings.max_sessions, settings.session_ttl_seconds,
+    on_result=lambda request, result: metrics.observe_solve(request, result),
+)
+
+
+async def _warm_pool() -> None:
+    """Warm every worker, then record how long the service took to become ready."""
+    try:
+        await pool.warm()
+    except Exception:
+        # A cold pool still serves; the first requests just pay the start-up cost
+        logger.exception("Solver pool warm-up failed")
+    app.state.startup_seconds = round(time.perf_counter() - _imported_at, 3)
+    logger.info(f"Solver ready after {app.state.startup_seconds}s")
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    pool.start()
+    # Warm in the background so /health answers while /ready still says 503
+    warming = asyncio.create_task(_warm_pool()) if settings.warm_workers else None
+    if warming is None:
+        app.state.startup_seconds = round(time.perf_counter() - _imported_at, 3)
+    try:
+        yield
+    finally:
+        if warming is not None:
+            warming.cancel()
+        pool.shutdown()
+        pair_cache.close()
+
+
 app = FastAPI(
     title="OR-Tools VRP Solver",
     description="Single-vehicle route optimization with time windows using Google OR-Tools",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
+@app.middleware("http")
+async def time_requests(http_request: Request, call_next):
+    """Record time to response start per route, body parsing included."""
+    started = time.perf_counter()
+    response = await call_next(http_request)
+    route = getattr(http_request.scope.get("route"), "path", "unmatched")
+    metrics.observe_request(route, time.perf_counter() - started)
+    return response
+
+
 @app.get("/health")
 async def health():
-    """Health check endpoint for Docker."""
-    return {"status": "ok"}
+    """Health check endpoint for Docker. Also reports pool, cache, job and OSRM counters."""
+    return {"status": "ok", **_gauges()}
 
 
-@app.post("/optimize", response_model=OptimizeResponse)
-async def optimize(request: OptimizeRequest):
-    """Optimize a single-vehicle route given distance/time matrices and constraints.
-
-    The matrices are NxN where:
-    - Index 0 = depot (driver start position)
-    - Indices 1..N-1 = visits to optimize
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 while workers warm up or when the pool is full.
 
-    Returns the optimal visit order, ETAs, and feasibility status.
+    ``/health`` only says the process is alive; this says whether a solve
+    sent now would start without waiting behind others (give or take
+    ``SOLVER_READY_MAX_QUEUE``). Free capacity is reported either way.
     """
-    # Validate matrix dimensions
+    stats = pool.stats()
+    in_flight = stats["busy_workers"] + stats["queue_depth"]
+    capacity = stats["workers"] + settings.ready_max_queue
+    if stats["warm_state"] == "warming":
+        status = "warming"
+    elif in_flight >= capacity:
+        status = "busy"
+    else:
+        status = "ready"
+    body = {
+        "status": status,
+        "free_workers": stats["workers"] - stats["busy_workers"],
+        "free_slots": max(0, capacity - in_flight),
+        "queue_depth": stats["queue_depth"],
+        "warm_state": stats["warm_state"],
+        "startup_seconds": _startup_seconds(),
+    }
+    return JSONResponse(body, status_code=200 if status == "ready" else 503)
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: per-phase solve timings, outcomes and pool/cache gauges."""
+    body = metrics.render(_gauges())
+    return Response(content=body, media_type=METRICS_CONTENT_TYPE)
+
+
+def _startup_seconds() -> float | None:
+    """Seconds from import to ready for traffic; None until then."""
+    return getattr(app.state, "startup_seconds", None)
+
+
+def _gauges() -> dict[str, dict]:
+    return {
+        "startup": {"seconds": _startup_seconds()},
+        "pool": pool.stats(),
+        "cache": cache.stats(),
+        "jobs": jobs.stats(),
+        "sessions": sessions.stats(),
+        "pair_cache": pair_cache.stats(),
+        "osrm": osrm.stats(),
+        "matrix_registry": registry.stats(),
+    }
+
+
+def _row_widths(matrix) -> np.ndarray:
+    """Column count of every row; binary-transport arrays are square by shape."""
+    if isinstance(matrix, np.ndarray):
+        return np.full(len(matrix), matrix.shape[1] if matrix.ndim == 2 else 0)
+    return np.fromiter(map(len, matrix), dtype=np.int64, count=len(matrix))
+
+
+def _validate_matrices(request: OptimizeRequest | FleetOptimizeRequest) -> None:
+    """Check matrix and per-node list dimensions, raising 400 on mismatch."""
     n = len(request.distance_matrix)
     if n == 0:
         raise HTTPException(status_code=400, detail="distance_matrix cannot be empty")
@@ -42,18 +206,14 @@ async def optimize(request: OptimizeRequest):
             detail=f"time_matrix size ({len(request.time_matrix)}) must match distance_matrix size ({n})",
         )
 
-    for i, row in enumerate(request.distance_matrix):
-        if len(row) != n:
-            raise HTTPException(
-                status_code=400,
-                detail=f"distance_matrix row {i} has {len(row)} columns, expected {n}",
-            )
-
-    for i, row in enumerate(request.time_matrix):
-        if len(row) != n:
+    for name in ("distance_matrix", "time_matrix"):
+        widths = _row_widths(getattr(request, name))
+        ragged = np.flatnonzero(widths != n)
+        if ragged.size:
+            i = int(ragged[0])
             raise HTTPException(
                 status_code=400,
-                detail=f"time_matrix row {i} has {len(row)} columns, expected {n}",
+                detail=f"{name} row {i} has {widths[i]} columns, expected {n}",
             )
 
     if request.time_windows and len(request.time_windows) > n:
@@ -68,12 +228,552 @@ async def optimize(request: OptimizeRequest):
             detail=f"service_times length ({len(request.service_times)}) exceeds matrix size ({n})",
         )
 
+
+def _validate_request(request: OptimizeRequest) -> None:
+    """Matrix dimensions plus the single-route options, raising 400 when invalid."""
+    _validate_matrices(request)
+    n = len(request.distance_matrix)
+    if request.initial_route:
+        if any(node < 1 or node >= n for node in request.initial_route):
+            raise HTTPException(
+                status_code=400,
+                detail=f"initial_route nodes must be visit indices between 1 and {n - 1}",
+            )
+        if len(set(request.initial_route)) != len(request.initial_route):
+            raise HTTPException(
+                status_code=400, detail="initial_route contains duplicate nodes"
+            )
+
+    if request.portfolio and request.portfolio > len(SEARCH_PORTFOLIO):
+        raise HTTPException(
+            status_code=400,
+            detail=f"portfolio can race at most {len(SEARCH_PORTFOLIO)} configurations",
+        )
+    if request.portfolio and request.cluster_size:
+        raise HTTPException(
+            status_code=400, detail="portfolio and cluster_size can't be combined"
+        )
+
+
+@app.post("/optimize", response_model=OptimizeResponse)
+async def optimize(request: OptimizeRequest):
+    """Optimize a single-vehicle route given distance/time matrices and constraints.
+
+    The matrices are NxN where:
+    - Index 0 = depot (driver start position)
+    - Indices 1..N-1 = visits to optimize
+
+    Returns the optimal visit order, ETAs, and feasibility status.
+    """
+    validation_seconds = _timed_validation(request)
+    n = len(request.distance_matrix)
     logger.info(f"Optimizing route: {n} nodes ({n - 1} visits)")
 
     try:
-        result = solve(request)
+        priority = request_priority(request, settings.interactive_max_seconds)
+        result = await _solve_cached(request, priority)
+    except PoolSaturated as e:
+        raise _too_busy(e)
     except Exception as e:
         logger.exception("Solver failed")
         raise HTTPException(status_code=500, detail=f"Solver error: {str(e)}")
 
+    if result.timings is not None:
+        timings = result.timings.model_copy(update={"validation_seconds": validation_seconds})
+        result = result.model_copy(update={"timings": timings})
+    return result
+
+
+@app.post("/optimize/fleet", response_model=FleetOptimizeResponse)
+async def optimize_fleet(request: FleetOptimizeRequest):
+    """Assign visits to several drivers and sequence every route in one solve.
+
+    All drivers share one matrix. Each vehicle gives its start node, an
+    optional end node (none = the route ends at its last stop), a shift,
+    a maximum duration and a capacity. Nodes that are no vehicle's start or
+    end are the visits. Returns one route per vehicle, in request order.
+    """
+    started = time.perf_counter()
+    _validate_matrices(request)
+    _validate_fleet(request)
+    validation_seconds = round(time.perf_counter() - started, 6)
+    metrics.observe_phase("validation", validation_seconds)
+    n = len(request.distance_matrix)
+    logger.info(f"Optimizing fleet: {n} nodes, {len(request.vehicles)} vehicles")
+
+    try:
+        result = await pool.run(
+            solve_fleet, request, priority="planning", cost_seconds=estimated_seconds(request)
+        )
+    except PoolSaturated as e:
+        raise _too_busy(e)
+    except Exception as e:
+        logger.exception("Fleet solver failed")
+        raise HTTPException(status_code=500, detail=f"Solver error: {str(e)}")
+    metrics.observe_solve(request, result)
+
+    if not request.include_timings:
+        return result.model_copy(update={"timings": None})
+    timings = result.timings.model_copy(update={"validation_seconds": validation_seconds})
+    return result.model_copy(update={"timings": timings})
+
+
+def _validate_fleet(request: FleetOptimizeRequest) -> None:
+    """Vehicle nodes and demands must fit the matrix."""
+    n = len(request.distance_matrix)
+    for v, vehicle in enumerate(request.vehicles):
+        for name in ("start", "end"):
+            node = getattr(vehicle, name)
+            if node is not None and not 0 <= node < n:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"vehicle {v} {name} ({node}) must be a node between 0 and {n - 1}",
+                )
+    if len(request.demands) > n:
+        raise HTTPException(
+            status_code=400,
+            detail=f"demands length ({len(request.demands)}) exceeds matrix size ({n})",
+        )
+
+
+@app.post("/optimize/coordinates", response_model=OptimizeResponse)
+async def optimize_coordinates(request: CoordinateOptimizeRequest):
+    """Same as /optimize, with stop coordinates instead of matrices.
+
+    Travel times and distances come from the pairwise cache keyed by snapped
+    coordinates; only the pairs it lacks are fetched from OSRM's ``/table``,
+    as the rows and columns of the new stops. Answers 502 if OSRM fails.
+    """
+    try:
+        distance_matrix, time_matrix = await matrices.build(request.locations)
+    except OsrmError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=502, detail=str(e))
+    # Fields are already validated; only the matrices are new
+    options = {name: getattr(request, name) for name in RouteOptions.model_fields}
+    return await optimize(OptimizeRequest.model_construct(
+        **options, distance_matrix=distance_matrix, time_matrix=time_matrix
+    ))
+
+
+@app.post("/matrices", response_model=MatrixHandle, status_code=201)
+async def register_matrices(request: MatrixUploadRequest):
+    """Keep a distance/time matrix pair server-side for /optimize/handle.
+
+    Re-uploading the same matrices returns the same handle. Handles stay
+    valid until evicted to make room (least recently used first); callers
+    re-register on 404.
+    """
+    try:
+        handle = registry.register(request.distance_matrix, request.time_matrix)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return MatrixHandle(**registry.describe(handle))
+
+
+@app.get("/matrices/{handle}", response_model=MatrixHandle)
+async def get_matrices(handle: str):
+    try:
+        return MatrixHandle(**registry.describe(handle))
+    except UnknownMatrix:
+        raise HTTPException(status_code=404, detail="Matrix handle not found")
+
+
+@app.delete("/matrices/{handle}", status_code=204)
+async def delete_matrices(handle: str):
+    try:
+        registry.delete(handle)
+    except UnknownMatrix:
+        raise HTTPException(status_code=404, detail="Matrix handle not found")
+    return Response(status_code=204)
+
+
+@app.post("/optimize/handle", response_model=OptimizeResponse)
+async def optimize_handle(request: HandleOptimizeRequest, response: Response):
+    """Same as /optimize, over a registered matrix pair instead of inline matrices.
+
+    The request carries the handle, the nodes to route over and, for stops
+    not in the registered matrix, just their rows and columns. Answers 404
+    for an unknown or evicted handle.
+    """
+    handle = request.matrix_handle
+    try:
+        if request.extension is not None:
+            handle = registry.extend(handle, **dict(request.extension))
+            response.headers["X-Matrix-Handle"] = handle
+        distance_matrix, time_matrix = registry.subset(handle, request.nodes)
+    except UnknownMatrix:
+        raise HTTPException(status_code=404, detail="Matrix handle not found; register it again")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    options = {name: getattr(request, name) for name in RouteOptions.model_fields}
+    return await optimize(OptimizeRequest.model_construct(
+        **options, distance_matrix=distance_matrix, time_matrix=time_matrix
+    ))
+
+
+@app.post("/evaluate", response_model=EvaluateResponse)
+async def evaluate_orders(request: EvaluateRequest):
+    """Score fixed visit orders: ETAs, totals and time-window violations, no search.
+
+    For manual reorders and what-if comparisons. All candidates are
+    evaluated together with array arithmetic, with the same service-time
+    defaults and open/round-trip semantics as /optimize.
+    """
+    _validate_request(request)
+    _validate_orders(request.orders, len(request.distance_matrix))
+    return await asyncio.to_thread(evaluate, request)
+
+
+@app.post("/insert", response_model=InsertionResponse)
+async def insert(request: InsertionRequest):
+    """Cheapest feasible insertion of new visits into existing routes, no search.
+
+    For live dispatch: send each candidate driver's current route with the
+    new order's node(s) and get back where they fit, the added distance and
+    duration, the updated ETAs, and which route takes them most cheaply.
+    """
+    for route in request.routes:
+        _validate_request(route)
+        _validate_orders([route.visit_order + route.new_visits], len(route.distance_matrix))
+    return await asyncio.to_thread(insert_visits, request)
+
+
+def _validate_orders(orders: list[list[int]], n: int) -> None:
+    """Every order holds distinct visit indices in 1..n-1."""
+    nodes = np.fromiter(
+        (node for order in orders for node in order), dtype=np.int64,
+        count=sum(map(len, orders)),
+    )
+    if nodes.size and (nodes.min() < 1 or nodes.max() >= n):
+        raise HTTPException(
+            status_code=400,
+            detail=f"order nodes must be visit indices between 1 and {n - 1}",
+        )
+    for k, order in enumerate(orders):
+        if len(set(order)) != len(order):
+            raise HTTPException(status_code=400, detail=f"order {k} contains duplicate nodes")
+
+
+@app.post(
+    "/optimize/binary",
+    response_model=OptimizeResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {REQUEST_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def optimize_binary(http_request: Request):
+    """Same as /optimize, with the compact binary encoding from ``app.codec``.
+
+    The matrices are sent as raw int32 buffers and decoded without building
+    per-cell Python objects. The response uses the matching binary format
+    unless the client asks for JSON via ``Accept: application/json``.
+    """
+    body = await http_request.body()
+    try:
+        request = decode_request(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid binary request: {e}")
+
+    result = await optimize(request)
+
+    accept = http_request.headers.get("accept", "")
+    if "application/json" in accept and RESPONSE_CONTENT_TYPE not in accept:
+        return result
+    return Response(content=encode_response(result), media_type=RESPONSE_CONTENT_TYPE)
+
+
+@app.post("/optimize/stream")
+async def optimize_stream(request: OptimizeRequest):
+    """Anytime variant of /optimize: stream every improving solution as NDJSON.
+
+    Each ``SolutionEvent`` line carries the intermediate visit order, ETAs,
+    cost and elapsed time; the last line is the ``final`` result. Closing the
+    connection cancels the search and frees the worker, within about 0.1 s
+    once the first route is built.
+    """
+    _timed_validation(request)
+    _reject_fan_out(request, "/optimize/stream")
+    n = len(request.distance_matrix)
+    logger.info(f"Streaming optimization: {n} nodes ({n - 1} visits)")
+
+    manager = pool.manager()
+    events = manager.Queue()
+    cancel = manager.Event()
+    started = time.perf_counter()
+    try:
+        solving = asyncio.wrap_future(pool.submit(
+            solve_with_progress, request, events, cancel,
+            priority=request_priority(request, settings.interactive_max_seconds),
+            cost_seconds=estimated_seconds(request),
+        ))
+    except PoolSaturated as e:
+        raise _too_busy(e)
+
+    async def stream():
+        try:
+            while not solving.done():
+                try:
+                    event = await asyncio.to_thread(events.get, True, 0.2)
+                except queue.Empty:
+                    continue
+                yield json.dumps(event, separators=(",", ":")) + "\n"
+            # The worker has returned, so everything it queued is already there
+            while not events.empty():
+                yield json.dumps(events.get_nowait(), separators=(",", ":")) + "\n"
+
+            elapsed = round(time.perf_counter() - started, 3)
+            try:
+                result = solving.result()
+                if result is not None:
+                    metrics.observe_solve(request, result)
+                    result = _present(request, result)
+                final = SolutionEvent(event="final", elapsed_seconds=elapsed, result=result)
+            except Exception as e:
+                logger.exception("Streaming solver failed")
+                final = SolutionEvent(
+                    event="error", elapsed_seconds=elapsed, error=f"Solver error: {str(e)}"
+                )
+            yield final.model_dump_json() + "\n"
+        finally:
+            # Client disconnect (or normal end): stop the search if still running
+            cancel.set()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(request: OptimizeRequest):
+    """Submit a long-running optimization and return immediately with a job id.
+
+    Poll ``GET /jobs/{job_id}`` for the result; ``DELETE`` cancels it.
+    """
+    _timed_validation(request)
+    _reject_fan_out(request, "/jobs")
+    try:
+        job = jobs.submit(
+            request, request.priority or "planning", estimated_seconds(request)
+        )
+    except JobLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except PoolSaturated as e:
+        raise _too_busy(e)
+    return job.to_status()
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """Current status of a job, including the result once it has finished."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return job.to_status()
+
+
+@app.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """Cancel a job. A running search stops and frees its worker.
+
+    The search checks for the cancel about every 0.1 s once its first route
+    is built, so the job reads ``cancelling`` until its worker returns and
+    ``cancelled`` from then on; poll ``GET /jobs/{job_id}`` for that.
+    """
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return job.to_status()
+
+
+@app.post("/sessions", response_model=RouteSessionState, status_code=201)
+async def open_session(request: RouteSessionRequest):
+    """Keep a driver's route server-side for event-driven re-optimization.
+
+    Solves the route first unless ``visit_order`` gives the planned one.
+    Then post events to ``/sessions/{session_id}/events`` as the day goes on.
+    """
+    _timed_validation(request)
+    _reject_fan_out(request, "/sessions")
+    try:
+        session = await sessions.open(request)
+    except SessionLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except PoolSaturated as e:
+        raise _too_busy(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Session solver failed")
+        raise HTTPException(status_code=500, detail=f"Solver error: {str(e)}")
+    return session.to_state()
+
+
+@app.post("/sessions/{session_id}/events", response_model=RouteSessionState)
+async def update_session(session_id: str, update: SessionUpdate):
+    """Apply visit completed/added/removed, delay and position events.
+
+    Answers with ETAs for the current order, re-scored in milliseconds; with
+    ``reoptimize`` the remaining route is also re-solved in the background,
+    and ``GET /sessions/{session_id}`` shows the result once applied.
+    """
+    try:
+        session = await sessions.update(session_id, update.events, update.reoptimize)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session.to_state()
+
+
+@app.get("/sessions/{session_id}", response_model=RouteSessionState)
+async def get_session(session_id: str):
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session.to_state()
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def close_session(session_id: str):
+    if sessions.close(session_id) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return Response(status_code=204)
+
+
+def _reject_fan_out(request: OptimizeRequest, endpoint: str) -> None:
+    """Decomposed and portfolio solves fan out over the pool, which a single
+    worker task can't do."""
+    for option in ("cluster_size", "portfolio"):
+        if getattr(request, option):
+            raise HTTPException(
+                status_code=400,
+                detail=f"{option} is not supported on {endpoint}; use /optimize or /optimize/batch",
+            )
+
+
+def _timed_validation(request: OptimizeRequest) -> float:
+    """Run ``_validate_request``, recording how long it took."""
+    started = time.perf_counter()
+    _validate_request(request)
+    seconds = round(time.perf_counter() - started, 6)
+    metrics.observe_phase("validation", seconds)
+    return seconds
+
+
+def _present(request: OptimizeRequest, result: OptimizeResponse) -> OptimizeResponse:
+    """Drop the timing breakdown unless the client asked for it."""
+    if request.include_timings or result.timings is None:
+        return result
+    return result.model_copy(update={"timings": None})
+
+
+def _too_busy(e: PoolSaturated) -> HTTPException:
+    """429 with a Retry-After hint from the queued work's estimated run time."""
+    logger.warning(str(e))
+    return HTTPException(
+        status_code=429,
+        detail=f"Solver busy: {e}",
+        headers={"Retry-After": str(e.retry_after_seconds)},
+    )
+
+
+async def _solve_recorded(request: OptimizeRequest, priority: str) -> OptimizeResponse:
+    cost_seconds = estimated_seconds(request)
+    run = partial(pool.run, priority=priority, cost_seconds=cost_seconds)
+    if request.cluster_size:
+        result = await solve_decomposed(request, run, pool.limits[priority].max_running)
+    elif request.portfolio:
+        # Race only as many configurations as the class may run at once
+        result = await solve_portfolio(request, run, pool.limits[priority].max_running)
+        if result.search_config != EXACT_SEARCH_CONFIG:  # small models don't race
+            metrics.portfolio_wins.inc(result.search_config)
+    else:
+        # Stoppable, so a solve nobody waits for any more gives its worker back
+        cancel = pool.manager().Event()
+        try:
+            future = pool.submit(
+                solve_with_progress, request, None, cancel,
+                priority=priority, cost_seconds=cost_seconds,
+            )
+        except PoolSaturated:
+            pool.release(cancel)
+            raise
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            cancel.set()
+            raise
+        if result.timings is not None:
+            timings = result.timings.model_copy(
+                update={"queue_wait_seconds": round(future.queue_wait_seconds, 6)}
+            )
+            result = result.model_copy(update={"timings": timings})
+    metrics.observe_solve(request, result)
     return result
+
+
+async def _solve_cached(request: OptimizeRequest, priority: str) -> OptimizeResponse:
+    """Solve through the result cache, sharing identical in-flight solves.
+
+    Cached entries keep their timings, so a later request with
+    ``include_timings`` can still be answered from the cache.
+    """
+    result = await cache.get_or_solve(
+        request_key(request), lambda: _solve_recorded(request, priority)
+    )
+    return _present(request, result)
+
+
+async def _solve_batch_item(index: int, payload: dict) -> BatchItemResult:
+    """Validate and solve one batch entry, turning any failure into an item status."""
+    try:
+        request = OptimizeRequest.model_validate(payload)
+        _timed_validation(request)
+    except ValidationError as e:
+        return BatchItemResult(index=index, status="invalid", error=str(e))
+    except HTTPException as e:
+        return BatchItemResult(index=index, status="invalid", error=e.detail)
+
+    try:
+        result = await _solve_cached(request, "batch")
+    except PoolSaturated as e:
+        return BatchItemResult(index=index, status="error", error=f"Solver busy: {e}")
+    except Exception as e:
+        logger.exception(f"Solver failed for batch item {index}")
+        return BatchItemResult(index=index, status="error", error=f"Solver error: {str(e)}")
+    return BatchItemResult(index=index, status="ok", result=result)
+
+
+@app.post("/optimize/batch")
+async def optimize_batch(batch: BatchOptimizeRequest):
+    """Optimize many independent routes in one call.
+
+    Every entry is validated and solved on its own, spread across the solver
+    pool. The response is NDJSON: one ``BatchItemResult`` line per entry, in
+    completion order, tagged with the entry's position in ``requests``. A
+    failing entry gets its own error line and doesn't affect the others.
+    """
+    if len(batch.requests) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"batch has {len(batch.requests)} requests, limit is {settings.max_batch_size}",
+        )
+    logger.info(f"Optimizing batch of {len(batch.requests)} routes")
+
+    async def stream():
+        tasks = [
+            asyncio.ensure_future(_solve_batch_item(index, payload))
+            for index, payload in enumerate(batch.requests)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                yield item.model_dump_json() + "\n"
+        finally:
+            # Client went away: don't leave queued solves behind
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -0,0 +1,261 @@
+"""Prometheus-format metrics for the solver service.
+
+Solves run in pool worker processes, so each solve's phase timings travel
+back in ``OptimizeResponse.timings`` and are recorded here, in the API
+process, which serves them on ``GET /metrics``. The text exposition format is
+small enough that no client library is needed.
+"""
+
+import math
+
+from .models import FleetOptimizeRequest, FleetOptimizeResponse, OptimizeRequest, OptimizeResponse
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: sub-millisecond model phases up to minute-long searches
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Matrix size (depot + visits)
+NODE_BUCKETS = (2, 10, 25, 50, 100, 200, 500, 1000, 2000, 5000)
+
+SOLVER_PHASES = (
+    "queue_wait", "data_model", "model_build", "first_solution", "search", "extraction",
+)
+
+# Stats dicts exported as solver_<prefix>_<key>: key -> (type, help). Counters
+# get the conventional _total suffix; keys not listed here are gauges.
+STATS_METRICS: dict[str, dict[str, tuple[str, str]]] = {
+    "startup": {"seconds": ("gauge", "Seconds from import until ready for traffic")},
+    "pool": {
+        "workers": ("gauge", "Solver worker processes"),
+        "busy_workers": ("gauge", "Workers running a solve"),
+        "queue_depth": ("gauge", "Solves waiting for a worker"),
+        "completed": ("counter", "Pooled solves that returned"),
+        "failed": ("counter", "Pooled solves that raised or were cancelled while running"),
+        "warm_workers": ("gauge", "Workers that have run the warm-up solve"),
+        "warm_up_seconds": ("gauge", "Time the warm-up took"),
+    },
+    "cache": {
+        "size": ("gauge", "Cached results"),
+        "max_entries": ("gauge", "Result cache capacity"),
+        "ttl_seconds": ("gauge", "Result cache entry lifetime"),
+        "in_flight": ("gauge", "Distinct solves that requests are waiting on"),
+        "hits": ("counter", "Requests answered from the result cache"),
+        "misses": ("counter", "Requests that started a solve"),
+        "coalesced": ("counter", "Requests that joined an identical solve in flight"),
+        "evictions": ("counter", "Results evicted to make room"),
+        "expirations": ("counter", "Results dropped after their TTL"),
+    },
+    "jobs": {
+        "max_active": ("gauge", "Limit on queued plus running jobs"),
+        "ttl_seconds": ("gauge", "How long finished jobs are kept"),
+        **{
+            status: ("gauge", f"Jobs currently {status}")
+            for status in ("queued", "running", "cancelling", "succeeded", "failed", "cancelled")
+        },
+    },
+    "sessions": {
+        "open": ("gauge", "Open route sessions"),
+        "max_sessions": ("gauge", "Limit on open route sessions"),
+        "ttl_seconds": ("gauge", "Idle lifetime of a route session"),
+        "resolving": ("gauge", "Sessions with a re-solve running"),
+        "events": ("counter", "Session events applied"),
+        "resolves_applied": ("counter", "Session re-solves whose route was applied"),
+        "resolves_superseded": ("counter", "Session re-solves discarded for a newer version"),
+    },
+    "pair_cache": {
+        "size": ("gauge", "Cached OSRM stop pairs"),
+        "max_pairs": ("gauge", "OSRM pair cache capacity"),
+        "ttl_seconds": ("gauge", "OSRM pair lifetime"),
+        "hits": ("counter", "Stop pairs served from the cache"),
+        "misses": ("counter", "Stop pairs fetched from OSRM"),
+        "evictions": ("counter", "Stop pairs evicted to make room"),
+        "expirations": ("counter", "Stop pairs dropped after their TTL"),
+    },
+    "osrm": {
+        "calls": ("counter", "OSRM table requests"),
+        "cells": ("counter", "Matrix cells requested from OSRM"),
+        "bytes_received": ("counter", "Response bytes received from OSRM"),
+    },
+    "matrix_registry": {
+        "size": ("gauge", "Registered matrix pairs"),
+        "bytes": ("gauge", "Memory held by registered matrices"),
+        "max_bytes": ("gauge", "Matrix registry capacity"),
+        "hits": ("counter", "Lookups of a registered matrix handle"),
+        "misses": ("counter", "Lookups of an unknown or evicted matrix handle"),
+        "evictions": ("counter", "Matrix pairs evicted to make room"),
+    },
+}
+
+# Pool stats repeated per priority class, as <class>_<stat>
+POOL_CLASS_METRICS: dict[str, tuple[str, str]] = {
+    "running": ("gauge", "Solves running"),
+    "queued": ("gauge", "Solves waiting for a worker"),
+    "rejected": ("counter", "Solves turned away with a full queue"),
+}
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: dict[str, str]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs.items()) + "}"
+
+
+def _stats_metric(prefix: str, key: str) -> tuple[str, str, str]:
+    """(name, type, help) under which a ``stats()`` value is exported."""
+    kind, help_text = STATS_METRICS.get(prefix, {}).get(key, ("gauge", ""))
+    if not help_text and prefix == "pool" and "_" in key:
+        priority, stat = key.rsplit("_", 1)
+        if stat in POOL_CLASS_METRICS:
+            kind, help_text = POOL_CLASS_METRICS[stat]
+            help_text = f"{help_text} in the {priority} class"
+    name = f"solver_{prefix}_{key}"
+    if kind == "counter":
+        name += "_total"
+    return name, kind, help_text or f"{key} from the {prefix} stats"
+
+
+class Counter:
+    """Monotonic counter, optionally split by one label."""
+
+    def __init__(self, name: str, help_text: str, label: str | None = None):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values: dict[str | None, float] = {}
+
+    def inc(self, label_value: str | None = None, amount: float = 1) -> None:
+        self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value: str | None = None) -> float:
+        return self._values.get(label_value, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        if not self._values and self.label is None:
+            lines.append(f"{self.name} 0")
+        for label_value, value in sorted(self._values.items(), key=lambda item: str(item[0])):
+            labels = {self.label: label_value} if self.label else {}
+            lines.append(f"{self.name}{_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by one label."""
+
+    def __init__(
+        self, name: str, help_text: str, buckets: tuple[float, ...], label: str | None = None
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.label = label
+        # label value -> (per-bucket counts, sum, count)
+        self._series: dict[str | None, tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, label_value: str | None = None) -> None:
+        counts, total, count = self._series.get(label_value, ([0] * len(self.buckets), 0.0, 0))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        self._series[label_value] = (counts, total + value, count + 1)
+
+    def count(self, label_value: str | None = None) -> int:
+        series = self._series.get(label_value)
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, total, count) in sorted(
+            self._series.items(), key=lambda item: str(item[0])
+        ):
+            base = {self.label: label_value} if self.label else {}
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _labels({**base, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            lines.append(f"{self.name}_sum{_labels(base)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_labels(base)} {count}")
+        return lines
+
+
+class SolverMetrics:
+    """All metrics the service exports, plus helpers to record a solve."""
+
+    def __init__(self):
+        self.http_seconds = Histogram(
+            "solver_http_request_seconds",
+            "Time from request arrival to response start, including body parsing",
+            SECONDS_BUCKETS,
+            label="route",
+        )
+        self.phase_seconds = Histogram(
+            "solver_phase_seconds", "Time spent per solve phase", SECONDS_BUCKETS, label="phase"
+        )
+        self.solve_seconds = Histogram(
+            "solver_solve_seconds", "Total solve() time in the worker", SECONDS_BUCKETS
+        )
+        self.nodes = Histogram("solver_nodes", "Matrix size of solved requests", NODE_BUCKETS)
+        self.solves = Counter("solver_solves_total", "Completed solves by solver status", "status")
+        self.stop_reasons = Counter(
+            "solver_stop_reasons_total", "Completed solves by why the search ended", "reason"
+        )
+        self.dropped_visits = Counter(
+            "solver_dropped_visits_total", "Visits left out of returned routes"
+        )
+        self.portfolio_wins = Counter(
+            "solver_portfolio_wins_total", "Portfolio races won per search configuration", "config"
+        )
+
+    def observe_request(self, route: str, seconds: float) -> None:
+        self.http_seconds.observe(seconds, route)
+
+    def observe_phase(self, phase: str, seconds: float) -> None:
+        self.phase_seconds.observe(seconds, phase)
+
+    def observe_solve(
+        self,
+        request: OptimizeRequest | FleetOptimizeRequest,
+        result: OptimizeResponse | FleetOptimizeResponse,
+    ) -> None:
+        """Record one finished solve (not cache hits — those didn't run the solver)."""
+        self.nodes.observe(len(request.distance_matrix))
+        self.solves.inc(result.solver_status)
+        if result.stop_reason:
+            self.stop_reasons.inc(result.stop_reason)
+        self.dropped_visits.inc(amount=len(result.dropped_visits))
+        timings = result.timings
+        if timings is None:
+            return
+        self.solve_seconds.observe(timings.total_seconds)
+        for phase in SOLVER_PHASES:
+            seconds = getattr(timings, f"{phase}_seconds")
+            if seconds is not None:
+                self.observe_phase(phase, seconds)
+
+    def render(self, gauges: dict[str, dict] | None = None) -> str:
+        """Exposition text. ``gauges`` maps a prefix to a stats dict (pool, cache, ...),
+        typed and described by ``STATS_METRICS``."""
+        lines: list[str] = []
+        for metric in (
+            self.http_seconds, self.phase_seconds, self.solve_seconds, self.nodes,
+            self.solves, self.stop_reasons, self.dropped_visits, self.portfolio_wins,
+        ):
+            lines.extend(metric.render())
+        for prefix, stats in (gauges or {}).items():
+            for key, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name, kind, help_text = _stats_metric(prefix, key)
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
@@ -1,5 +1,7 @@
 """Pydantic models for the OR-Tools VRP solver API."""
 
+from typing import Annotated, Any, Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -14,19 +16,20 @@ class TimeWindow(BaseModel):
     )
 
 
-class OptimizeRequest(BaseModel):
-    """Request payload for route optimization.
+class Location(BaseModel):
+    """A stop's coordinates in WGS84 degrees."""
 
-    The matrices are NxN where N = 1 (depot) + number of visits.
-    Index 0 is always the depot (driver's current/start position).
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+
+class RouteOptions(BaseModel):
+    """Everything about a route optimization except where the travel data comes from.
+
+    Per-node lists are indexed like the matrices (or locations): index 0 is
+    the depot, 1..N-1 the visits.
     """
 
-    distance_matrix: list[list[int]] = Field(
-        ..., description="NxN distance matrix in meters (from OSRM)"
-    )
-    time_matrix: list[list[int]] = Field(
-        ..., description="NxN duration matrix in seconds (from OSRM)"
-    )
     time_windows: list[TimeWindow | None] = Field(
         default=[],
         description=(
@@ -43,7 +46,8 @@ class OptimizeRequest(BaseModel):
     )
     depot: int = Field(default=0, description="Index of the depot node (always 0)")
     num_vehicles: int = Field(
-        default=1, description="Number of vehicles (always 1 for single-driver routes)"
+        default=1,
+        description="Number of vehicles (always 1; several drivers go to /optimize/fleet)",
     )
     max_route_duration: int | None = Field(
         default=None,
@@ -56,9 +60,202 @@ class OptimizeRequest(BaseModel):
             "False: the route ends at the last stop (open route)."
         ),
     )
-    solver_time_limit_seconds: int = Field(
-        default=5, description="Maximum time for the solver to run"
+    solver_time_limit_seconds: int | None = Field(
+        default=None,
+        description=(
+            "Maximum time for the solver to run. Defaults to a budget scaled "
+            "by node count (1 s up to 12 nodes, 30 s above 500)."
+        ),
+    )
+    adaptive_stopping: bool = Field(
+        default=True,
+        description=(
+            "Stop before the time limit once the solution has stopped "
+            "improving for no_improvement_seconds"
+        ),
+    )
+    no_improvement_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description=(
+            "Stall window for adaptive stopping. Defaults to 20 ms per node, "
+            "clamped to 0.1–5 s."
+        ),
+    )
+    min_improvement_ratio: float = Field(
+        default=0.0,
+        ge=0,
+        lt=1,
+        description=(
+            "Improvements smaller than this fraction of the cost don't reset "
+            "the stall window (e.g. 0.001 = 0.1%)"
+        ),
+    )
+    initial_route: list[int] | None = Field(
+        default=None,
+        description=(
+            "Optional warm start: a previous visit_order (node indices, depot "
+            "excluded). Local search starts from this route instead of building "
+            "a first solution; visits missing from it are inserted by the search."
+        ),
+    )
+    neighbors: int | None = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Sparse mode for large routes: each stop may only be followed by its "
+            "k nearest stops by travel time, plus depot, time-window-adjacent and "
+            "initial_route arcs. Unset keeps all N² arcs."
+        ),
+    )
+    cluster_size: int | None = Field(
+        default=None,
+        ge=10,
+        description=(
+            "Decomposition mode for 1000+ stop routes: split the visits into "
+            "time-window-aware clusters of about this many stops, solve them in "
+            "parallel and stitch the results. Unset solves one model."
+        ),
+    )
+    portfolio: int | None = Field(
+        default=None,
+        ge=2,
+        description=(
+            "Race this many search configurations (first-solution strategy + "
+            "metaheuristic) on separate workers under the same time limit and "
+            "return the best route. Capped at the number of solver workers."
+        ),
+    )
+    priority: Literal["interactive", "planning", "batch"] | None = Field(
+        default=None,
+        description=(
+            "Scheduling class. Unset: interactive when the search budget is at "
+            "most SOLVER_INTERACTIVE_MAX_SECONDS, else planning. Jobs default "
+            "to planning; /optimize/batch entries are always batch."
+        ),
+    )
+    include_timings: bool = Field(
+        default=False,
+        description="Return a per-phase timing breakdown in OptimizeResponse.timings",
+    )
+
+
+class OptimizeRequest(RouteOptions):
+    """Request payload for route optimization.
+
+    The matrices are NxN where N = 1 (depot) + number of visits.
+    Index 0 is always the depot (driver's current/start position).
+    """
+
+    distance_matrix: list[list[int]] = Field(
+        ..., description="NxN distance matrix in meters (from OSRM)"
+    )
+    time_matrix: list[list[int]] = Field(
+        ..., description="NxN duration matrix in seconds (from OSRM)"
+    )
+
+
+class CoordinateOptimizeRequest(RouteOptions):
+    """Route optimization from coordinates; the service builds the matrices.
+
+    Travel times and distances come from the pairwise OSRM cache, and only
+    pairs it doesn't hold (or holds past their TTL) are fetched.
+    """
+
+    locations: list[Location] = Field(
+        ..., min_length=1, description="Depot first, then the visits"
+    )
+
+
+class MatrixUploadRequest(BaseModel):
+    """Travel matrices to keep server-side and reference by handle."""
+
+    distance_matrix: list[list[int]] = Field(
+        ..., min_length=1, description="NxN distance matrix in meters"
+    )
+    time_matrix: list[list[int]] = Field(
+        ..., min_length=1, description="NxN duration matrix in seconds"
+    )
+
+
+class MatrixHandle(BaseModel):
+    """A registered matrix pair."""
+
+    handle: str = Field(..., description="Reference for /optimize/handle and extensions")
+    nodes: int = Field(..., description="N, the matrices' size")
+    bytes: int = Field(..., description="Memory the pair takes in the registry")
+
+
+class MatrixExtension(BaseModel):
+    """Travel data for k stops appended to a registered matrix (indices n..n+k-1).
+
+    Only the new stops' rows and columns are sent: 2k(n+k) cells per
+    matrix instead of (n+k)².
+    """
+
+    distance_from: list[list[int]] = Field(
+        ...,
+        min_length=1,
+        description="Per new stop: meters to every node, the n registered ones then the new ones",
+    )
+    distance_to: list[list[int]] = Field(
+        ..., min_length=1, description="Per new stop: meters from each of the n registered nodes"
+    )
+    time_from: list[list[int]] = Field(
+        ..., min_length=1, description="Per new stop: seconds to every node, as distance_from"
+    )
+    time_to: list[list[int]] = Field(
+        ..., min_length=1, description="Per new stop: seconds from each registered node"
+    )
+
+
+class HandleOptimizeRequest(RouteOptions):
+    """Route optimization over a registered matrix pair.
+
+    ``nodes`` picks the route's nodes from the registered (and extended)
+    matrix, depot first. Everything else is indexed by position in
+    ``nodes``, as if the sub-matrix had been sent to /optimize: index 0 is
+    the depot, and the response's visit_order uses the same positions.
+    """
+
+    matrix_handle: str = Field(..., description="Handle returned by POST /matrices")
+    nodes: list[int] | None = Field(
+        default=None,
+        description=(
+            "Registered node indices to route over, depot first. "
+            "Unset uses every node, including extended ones."
+        ),
+    )
+    extension: MatrixExtension | None = Field(
+        default=None,
+        description=(
+            "New stops to append before picking nodes. The extended matrix is "
+            "registered too; its handle comes back in the X-Matrix-Handle header."
+        ),
+    )
+
+
+class SolverTimings(BaseModel):
+    """Wall-clock seconds spent in each phase of one solve."""
+
+    validation_seconds: float | None = Field(
+        default=None, description="Request dimension checks in the API process"
+    )
+    queue_wait_seconds: float | None = Field(
+        default=None, description="Time spent waiting for a free worker, before solve() started"
     )
+    data_model_seconds: float = Field(..., description="Padding defaults and computing the horizon")
+    model_build_seconds: float = Field(
+        ..., description="Index manager, routing model, dimensions and closing the model"
+    )
+    first_solution_seconds: float | None = Field(
+        default=None, description="Search start until the first accepted solution"
+    )
+    search_seconds: float = Field(
+        ..., description="Remaining search time after the first solution (local search)"
+    )
+    extraction_seconds: float = Field(..., description="Reading the route and ETAs back out")
+    total_seconds: float = Field(..., description="Whole solve() call, excluding validation")
 
 
 class OptimizeResponse(BaseModel):
@@ -92,3 +289,407 @@ class OptimizeResponse(BaseModel):
         ...,
         description="Solver status: OPTIMAL, FEASIBLE, NO_SOLUTION, or TIMEOUT",
     )
+    stop_reason: str | None = Field(
+        default=None,
+        description=(
+            "Why the search ended: NO_IMPROVEMENT (adaptive stop), TIME_LIMIT, "
+            "CANCELLED, or COMPLETED (nothing left to explore)"
+        ),
+    )
+    time_to_best_seconds: float | None = Field(
+        default=None, description="Seconds into the search when the returned solution was found"
+    )
+    search_config: str | None = Field(
+        default=None,
+        description="First-solution strategy/metaheuristic that produced this route",
+    )
+    timings: SolverTimings | None = Field(
+        default=None, description="Per-phase breakdown, when the request set include_timings"
+    )
+
+
+class EvaluateRequest(OptimizeRequest):
+    """Fixed visit orders to score over the given matrices and constraints.
+
+    Uses the same matrices, time windows, service-time defaults and
+    return_to_depot semantics as /optimize; the search options are ignored.
+    """
+
+    orders: list[list[int]] = Field(
+        ...,
+        min_length=1,
+        description=(
+            "Candidate visit orders (node indices, depot excluded). An order "
+            "may leave visits out; each visit appears at most once."
+        ),
+    )
+    include_arrivals: bool = Field(
+        default=True,
+        description="Return per-stop ETAs; turn off when scoring many candidates",
+    )
+
+
+class RouteEvaluation(BaseModel):
+    """What one fixed visit order costs."""
+
+    total_distance_meters: int = Field(..., description="Total route distance in meters")
+    total_duration_seconds: int = Field(
+        ..., description="Total route duration in seconds (including service and waiting)"
+    )
+    estimated_arrivals: list[int] | None = Field(
+        default=None,
+        description="Service start per stop in the given order, after waiting for windows",
+    )
+    late_visits: list[int] = Field(
+        default=[], description="Visits reached after their window closes"
+    )
+    lateness_seconds: int = Field(..., description="Seconds past closed windows, summed")
+    exceeds_max_duration: bool = Field(
+        ..., description="Whether the route is longer than max_route_duration"
+    )
+    feasible: bool = Field(..., description="No late visits and within max_route_duration")
+
+
+class EvaluateResponse(BaseModel):
+    """One evaluation per candidate, in request order."""
+
+    results: list[RouteEvaluation]
+
+
+class RouteInsertionRequest(OptimizeRequest):
+    """One driver's current route and the new visits to fit into it.
+
+    The matrices cover the route's visits and the new ones; the search
+    options are ignored.
+    """
+
+    visit_order: list[int] = Field(
+        ..., description="The route as it stands (node indices, depot excluded)"
+    )
+    new_visits: list[int] = Field(
+        ..., min_length=1, description="Node indices to insert, none already in visit_order"
+    )
+
+
+class InsertionRequest(BaseModel):
+    """New visits to place into one or more candidate routes."""
+
+    routes: list[RouteInsertionRequest] = Field(
+        ..., min_length=1, description="Candidate routes, e.g. one per available driver"
+    )
+
+
+class VisitInsertion(BaseModel):
+    """Where one new visit went and what it cost."""
+
+    visit: int = Field(..., description="The inserted node")
+    position: int = Field(
+        ...,
+        description=(
+            "Index in visit_order where it was inserted, in the route as it "
+            "stood then (insertions apply in the listed order)"
+        ),
+    )
+    distance_delta: int = Field(..., description="Added meters")
+    duration_delta: int = Field(..., description="Added seconds, waiting included")
+
+
+class RouteInsertionResult(BaseModel):
+    """The updated route after cheapest insertion."""
+
+    visit_order: list[int] = Field(..., description="Route with the new visits inserted")
+    insertions: list[VisitInsertion] = Field(..., description="In the order they were made")
+    unplaced_visits: list[int] = Field(
+        default=[], description="New visits with no position that keeps the route feasible"
+    )
+    distance_delta: int = Field(..., description="Total added meters")
+    duration_delta: int = Field(..., description="Total added seconds")
+    total_distance_meters: int = Field(..., description="Updated route distance")
+    total_duration_seconds: int = Field(..., description="Updated route duration")
+    estimated_arrivals: list[int] = Field(..., description="Updated ETAs per stop in visit_order")
+    feasible: bool = Field(..., description="Whether every new visit was placed")
+
+
+class InsertionResponse(BaseModel):
+    """One result per candidate route, in request order."""
+
+    results: list[RouteInsertionResult]
+    best_route: int | None = Field(
+        default=None,
+        description="Index of the route that places all its new visits for the fewest added meters",
+    )
+
+
+class Vehicle(BaseModel):
+    """One driver of a fleet solve: where the route starts and ends, and its limits."""
+
+    start: int = Field(default=0, description="Matrix node the route starts from")
+    end: int | None = Field(
+        default=None,
+        description=(
+            "Matrix node the route must end at (e.g. the start again for a round "
+            "trip). null: the route ends at its last stop."
+        ),
+    )
+    shift: TimeWindow | None = Field(
+        default=None,
+        description="Earliest departure and latest route end, in seconds on the matrix clock",
+    )
+    max_duration: int | None = Field(
+        default=None, gt=0, description="Longest allowed route, departure to end, in seconds"
+    )
+    capacity: int | None = Field(
+        default=None,
+        ge=0,
+        description="Largest total demand this vehicle can carry. null: unlimited",
+    )
+
+
+class FleetOptimizeRequest(BaseModel):
+    """Assign visits to several drivers and sequence each route, over one shared matrix.
+
+    Every node that is no vehicle's start or end is a visit; each visit is
+    served by exactly one vehicle, or dropped if none can fit it.
+    """
+
+    distance_matrix: list[list[int]] = Field(..., description="NxN distance matrix in meters")
+    time_matrix: list[list[int]] = Field(..., description="NxN duration matrix in seconds")
+    vehicles: list[Vehicle] = Field(..., min_length=1, description="One entry per driver")
+    time_windows: list[TimeWindow | None] = Field(
+        default=[],
+        description=(
+            "Per-node time windows. A window on a start or end node bounds the "
+            "departure or arrival of every vehicle using it."
+        ),
+    )
+    service_times: list[int] = Field(
+        default=[],
+        description="Seconds spent at each node. Defaults to 600s per visit, 0 at starts and ends",
+    )
+    demands: list[int] = Field(
+        default=[],
+        description=(
+            "Load each visit takes from a vehicle's capacity. Defaults to 1 per "
+            "visit, so capacity caps the number of stops."
+        ),
+    )
+    solver_time_limit_seconds: int | None = Field(
+        default=None, description="Maximum search time; defaults as for /optimize"
+    )
+    adaptive_stopping: bool = Field(
+        default=True, description="Stop early once the total stops improving, as for /optimize"
+    )
+    no_improvement_seconds: float | None = Field(
+        default=None, gt=0, description="Stall window for adaptive stopping"
+    )
+    include_timings: bool = Field(default=False, description="Return the per-phase timing breakdown")
+
+
+class VehicleRoute(BaseModel):
+    """The visits one vehicle was given, in driving order."""
+
+    vehicle: int = Field(..., description="Index into FleetOptimizeRequest.vehicles")
+    visit_order: list[int] = Field(..., description="Visit nodes in sequence; empty if unused")
+    estimated_arrivals: list[int] = Field(..., description="Service start per stop, matrix clock")
+    departure_seconds: int = Field(..., description="When the vehicle leaves its start")
+    total_distance_meters: int = Field(..., description="Route distance, including the leg to its end")
+    total_duration_seconds: int = Field(
+        ..., description="Departure to route end, including service and waiting"
+    )
+    load: int = Field(..., description="Total demand of the assigned visits")
+
+
+class FleetOptimizeResponse(BaseModel):
+    """Every vehicle's route, in request order, plus what could not be served."""
+
+    routes: list[VehicleRoute]
+    total_distance_meters: int = Field(..., description="Summed over all routes")
+    dropped_visits: list[int] = Field(
+        default=[], description="Visits no vehicle could fit within windows, shifts and capacities"
+    )
+    feasible: bool = Field(..., description="Whether every visit was assigned")
+    solver_status: str = Field(..., description="OPTIMAL, FEASIBLE or NO_SOLUTION")
+    stop_reason: str | None = Field(
+        default=None, description="NO_IMPROVEMENT, TIME_LIMIT or COMPLETED"
+    )
+    time_to_best_seconds: float | None = Field(default=None)
+    timings: SolverTimings | None = Field(
+        default=None, description="Per-phase breakdown, when the request set include_timings"
+    )
+
+
+class BatchOptimizeRequest(BaseModel):
+    """Many independent route optimizations submitted together."""
+
+    requests: list[dict[str, Any]] = Field(
+        ...,
+        description=(
+            "OptimizeRequest payloads. Each one is validated separately so a "
+            "malformed entry only fails its own result line."
+        ),
+    )
+
+
+class BatchItemResult(BaseModel):
+    """One NDJSON line of a batch response."""
+
+    index: int = Field(..., description="Position of the entry in BatchOptimizeRequest.requests")
+    status: Literal["ok", "invalid", "error"] = Field(
+        ...,
+        description="ok: solved; invalid: rejected by validation; error: the solver failed",
+    )
+    result: OptimizeResponse | None = Field(default=None, description="Set when status is ok")
+    error: str | None = Field(default=None, description="Failure detail otherwise")
+
+
+class SolutionEvent(BaseModel):
+    """One NDJSON line of a streamed (anytime) optimization."""
+
+    event: Literal["solution", "final", "error"] = Field(
+        ...,
+        description=(
+            "solution: an improving intermediate route; final: the search "
+            "finished and result is the answer /optimize would return; "
+            "error: the solver failed"
+        ),
+    )
+    elapsed_seconds: float = Field(..., description="Seconds since the search started")
+    objective: int | None = Field(
+        default=None, description="Solver objective (distance plus drop penalties)"
+    )
+    result: OptimizeResponse | None = Field(default=None)
+    error: str | None = Field(default=None)
+
+
+class JobStatus(BaseModel):
+    """State of an asynchronous solve job."""
+
+    job_id: str = Field(..., description="Handle returned by POST /jobs")
+    status: Literal["queued", "running", "cancelling", "succeeded", "failed", "cancelled"] = Field(
+        ...,
+        description=(
+            "cancelling while a cancelled search still holds its worker, "
+            "cancelled once the worker is free"
+        ),
+    )
+    submitted_at: float = Field(..., description="Unix timestamp of submission")
+    finished_at: float | None = Field(
+        default=None, description="Unix timestamp when the job reached a final state"
+    )
+    result: OptimizeResponse | None = Field(
+        default=None,
+        description=(
+            "The optimized route once succeeded; for a job cancelled mid-search, "
+            "the best route found before it stopped"
+        ),
+    )
+    error: str | None = Field(default=None, description="Set when status is failed")
+
+
+class RouteSessionRequest(OptimizeRequest):
+    """A driver's route to keep server-side and update as the day goes on.
+
+    Node indices are the matrices' for the session's lifetime; added stops
+    are appended after them. Times are seconds from route start, as in
+    /optimize. cluster_size and portfolio are not supported.
+    """
+
+    departure_seconds: int = Field(
+        default=0, ge=0, description="When the driver leaves the depot"
+    )
+    visit_order: list[int] | None = Field(
+        default=None,
+        description="The route as already planned (depot excluded); unset solves one now",
+    )
+
+
+class VisitCompleted(BaseModel):
+    """The driver finished a visit and is leaving it."""
+
+    type: Literal["completed"]
+    visit: int = Field(..., description="Node index of the visit")
+    at_seconds: int = Field(..., ge=0, description="When service there finished")
+
+
+class VisitAdded(BaseModel):
+    """New stops for the route; they get the next node indices in order."""
+
+    type: Literal["added"]
+    travel: MatrixExtension = Field(
+        ..., description="The new stops' rows and columns against every session node"
+    )
+    time_windows: list[TimeWindow | None] = Field(
+        default=[], description="Per new stop; missing entries mean no window"
+    )
+    service_times: list[int] = Field(
+        default=[], description="Per new stop; missing entries default to 600 s"
+    )
+
+
+class VisitRemoved(BaseModel):
+    """A pending visit was cancelled."""
+
+    type: Literal["removed"]
+    visit: int = Field(..., description="Node index of the visit")
+
+
+class Delay(BaseModel):
+    """The driver is held up where they are (traffic, a long stop)."""
+
+    type: Literal["delay"]
+    seconds: int = Field(..., ge=0)
+
+
+class PositionUpdate(BaseModel):
+    """The driver's position between stops, as travel from there to every node."""
+
+    type: Literal["position"]
+    at_seconds: int = Field(..., ge=0, description="When the driver was there")
+    distance_from: list[int] = Field(..., description="Meters to each session node")
+    time_from: list[int] = Field(..., description="Seconds to each session node")
+
+
+SessionEvent = Annotated[
+    VisitCompleted | VisitAdded | VisitRemoved | Delay | PositionUpdate,
+    Field(discriminator="type"),
+]
+
+
+class SessionUpdate(BaseModel):
+    """Events to apply to a route session, in order."""
+
+    events: list[SessionEvent] = Field(..., min_length=1)
+    reoptimize: bool = Field(
+        default=True,
+        description=(
+            "Re-solve the remaining route in the background, starting from the "
+            "current order. The response carries ETAs for the current order either way."
+        ),
+    )
+
+
+class RouteSessionState(BaseModel):
+    """Where a route session stands: what's done, what's next, and when."""
+
+    session_id: str
+    version: int = Field(..., description="Bumped by every update and applied re-solve")
+    clock_seconds: int = Field(..., description="Time of the latest event")
+    location: int | None = Field(
+        ..., description="Node the driver is at; null between stops after a position update"
+    )
+    completed_visits: list[int] = Field(..., description="In the order they were completed")
+    visit_order: list[int] = Field(..., description="Remaining visits in planned order")
+    estimated_arrivals: list[int] = Field(
+        ..., description="Service start per remaining visit, seconds from route start"
+    )
+    finish_seconds: int = Field(..., description="When the route ends, at the depot or last stop")
+    remaining_distance_meters: int
+    late_visits: list[int] = Field(default=[], description="Remaining visits past their window")
+    dropped_visits: list[int] = Field(
+        default=[], description="Pending visits the current plan can't fit"
+    )
+    feasible: bool = Field(..., description="No late or dropped visits")
+    reoptimizing: bool = Field(..., description="A background re-solve is queued or running")
+    solver_status: str | None = Field(
+        default=None, description="Status of the last applied solve"
+    )
@@ -0,0 +1,309 @@
+"""Travel matrices from an OSRM-compatible ``/table`` service, cached per pair.
+
+Routes are mostly recurring customers and depots, so consecutive
+optimizations share most of their stop pairs. ``PairCache`` keeps the travel
+time and distance of every ordered pair of snapped coordinates it has seen,
+and ``MatrixBuilder`` asks OSRM only for the rows and columns that hold
+missing pairs: one new stop on a known route costs a 1xN and an Nx1 table
+rather than the full NxN.
+"""
+
+import asyncio
+import http.client
+import json
+import logging
+import sqlite3
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+import numpy as np
+
+from .models import Location
+
+logger = logging.getLogger(__name__)
+
+# 5 decimals is ~1 m: GPS jitter on a recurring stop still maps to one key
+SNAP_DECIMALS = 5
+_SCALE = 10**SNAP_DECIMALS
+_LON_SLOTS = 360 * _SCALE + 1
+
+Pair = tuple[int, int]
+# lookup() placeholder for a pair the cache doesn't hold: stored at -inf, so stale
+_ABSENT = (-np.inf, 0, 0)
+
+
+class OsrmError(RuntimeError):
+    """OSRM could not be reached or returned no usable table."""
+
+
+def snap(location: Location) -> int:
+    """Integer key of a location rounded to ``SNAP_DECIMALS``."""
+    lat = round(location.lat * _SCALE) + 90 * _SCALE
+    lon = round(location.lon * _SCALE) + 180 * _SCALE
+    return lat * _LON_SLOTS + lon
+
+
+def _coordinate(key: int) -> str:
+    """``lon,lat`` of a snapped key, as OSRM wants it in the URL."""
+    lat, lon = divmod(key, _LON_SLOTS)
+    return f"{lon / _SCALE - 180:.{SNAP_DECIMALS}f},{lat / _SCALE - 90:.{SNAP_DECIMALS}f}"
+
+
+class OsrmClient:
+    """Blocking client for ``GET /table/v1/{profile}/{coordinates}``."""
+
+    def __init__(self, base_url: str, profile: str = "driving", timeout_seconds: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.profile = profile
+        self.timeout_seconds = timeout_seconds
+        self.calls = 0
+        self.cells = 0
+        self.bytes_received = 0
+
+    def table(
+        self, keys: list[int], sources: list[int] | None = None,
+        destinations: list[int] | None = None,
+    ) -> tuple[list[list[int]], list[list[int]]]:
+        """(distances, durations) from ``sources`` to ``destinations``, rounded.
+
+        Indices refer to ``keys``; None means all of them.
+        """
+        url = (
+            f"{self.base_url}/table/v1/{self.profile}/"
+            + ";".join(_coordinate(key) for key in keys)
+            + "?annotations=distance,duration"
+        )
+        if sources is not None:
+            url += "&sources=" + ";".join(map(str, sources))
+        if destinations is not None:
+            url += "&destinations=" + ";".join(map(str, destinations))
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout_seconds) as response:
+                body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            raise OsrmError(f"OSRM table request failed: {e}") from e
+
+        self.calls += 1
+        self.bytes_received += len(body)
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise OsrmError(f"OSRM returned invalid JSON: {e}") from e
+        if data.get("code") != "Ok":
+            raise OsrmError(f"OSRM error: {data.get('code')}: {data.get('message', '')}")
+        distances, durations = data["distances"], data["durations"]
+        self.cells += sum(map(len, durations))
+        for i, row in enumerate(durations):
+            if None in row:
+                source = keys[sources[i] if sources is not None else i]
+                j = row.index(None)
+                destination = keys[destinations[j] if destinations is not None else j]
+                raise OsrmError(
+                    f"OSRM has no route from {_coordinate(source)} to {_coordinate(destination)}"
+                )
+        return (
+            [[round(value) for value in row] for row in distances],
+            [[round(value) for value in row] for row in durations],
+        )
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "cells": self.cells, "bytes_received": self.bytes_received}
+
+
+class PairCache:
+    """Bounded map of (distance, duration) per ordered pair, with a TTL.
+
+    Entries older than ``ttl_seconds`` are refetched, so traffic-dependent
+    durations don't go stale. When full, the oldest-stored pairs go first;
+    with a TTL those are the ones closest to expiring anyway, and it spares
+    a reordering on every hit. With a ``path``, pairs are also written to a
+    SQLite file and the freshest ones are loaded back on start, so a restart
+    doesn't begin cold. Only the event loop touches the in-memory map; the
+    file is written from a worker thread under a lock.
+    """
+
+    def __init__(self, max_pairs: int, ttl_seconds: float, path: str | None = None):
+        self.max_pairs = max_pairs
+        self.ttl_seconds = ttl_seconds
+        self._pairs: OrderedDict[Pair, tuple[float, int, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pairs (source INTEGER, destination INTEGER, "
+                "distance INTEGER, duration INTEGER, stored_at REAL, "
+                "PRIMARY KEY (source, destination)) WITHOUT ROWID"
+            )
+            self._load()
+
+    def _load(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self._db.execute("DELETE FROM pairs WHERE stored_at < ?", (cutoff,))
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT source, destination, distance, duration, stored_at FROM pairs "
+                "ORDER BY stored_at DESC LIMIT ?", (self.max_pairs,)
+            ).fetchall()
+        for source, destination, distance, duration, stored_at in reversed(rows):
+            self._pairs[(source, destination)] = (stored_at, distance, duration)
+        logger.info(f"Loaded {len(rows)} travel pairs from disk")
+
+    def lookup(self, keys: list[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(distance, duration, missing) matrices over ``keys``.
+
+        Cells of a missing pair are 0. A key paired with itself is 0/0 and
+        never missing.
+        """
+        n = len(keys)
+        get = self._pairs.get
+        cells = np.array(
+            [[get((source, destination), _ABSENT) for destination in keys] for source in keys],
+            dtype=np.float64,
+        ).reshape(n, n, 3)
+        stale_before = time.time() - self.ttl_seconds
+        missing = cells[:, :, 0] < stale_before
+        np.fill_diagonal(missing, False)
+        for i, j in zip(*np.nonzero(missing & np.isfinite(cells[:, :, 0]))):
+            del self._pairs[(keys[i], keys[j])]
+            self.expirations += 1
+        cells[missing] = 0
+        misses = int(missing.sum())
+        self.hits += n * (n - 1) - misses
+        self.misses += misses
+        return cells[:, :, 1].astype(np.int64), cells[:, :, 2].astype(np.int64), missing
+
+    def put(self, pairs: list[tuple[int, int, int, int]]) -> None:
+        """Store ``(source, destination, distance, duration)`` entries in memory."""
+        if self.max_pairs <= 0:
+            return
+        now = time.time()
+        for source, destination, distance, duration in pairs:
+            self._pairs[(source, destination)] = (now, distance, duration)
+            self._pairs.move_to_end((source, destination))  # refetched: newest again
+        while len(self._pairs) > self.max_pairs:
+            self._pairs.popitem(last=False)
+            self.evictions += 1
+
+    def persist(self, pairs: list[tuple[int, int, int, int]]) -> None:
+        """Write entries to the disk store, if there is one. Blocking."""
+        if self._db is None or not pairs:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO pairs VALUES (?, ?, ?, ?, ?)",
+                [(*pair, now) for pair in pairs],
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._pairs),
+            "max_pairs": self.max_pairs,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self._db is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def _plan(missing: np.ndarray) -> list[tuple[list[int] | None, list[int] | None]]:
+    """The ``(sources, destinations)`` tables to fetch so every missing pair is covered.
+
+    Stops new to the cache miss a whole row and column, which are cheapest
+    fetched as such; scattered pairs between known stops are cheapest as one
+    rectangle. Stops are taken into the row/column set greedily by missing
+    pairs, and the prefix that minimizes cells (including the rectangle over
+    the rest) wins; one full table is the fallback.
+    """
+    n = len(missing)
+    missing = missing.copy()
+    row_count = missing.sum(axis=1)
+    col_count = missing.sum(axis=0)
+    cover: list[int] = []
+    best_cells = n * n
+    best: tuple[int, list[int], list[int]] | None = None
+    while True:
+        rows = np.flatnonzero(row_count).tolist()
+        cols = np.flatnonzero(col_count).tolist()
+        h = len(cover)
+        cells = h * n + (n - h) * h + len(rows) * len(cols)
+        if cells < best_cells:
+            best_cells, best = cells, (h, rows, cols)
+        if not rows or h >= n // 2:
+            break
+        node = int((row_count + col_count).argmax())
+        cover.append(node)
+        row_count -= missing[:, node]
+        col_count -= missing[node, :]
+        row_count[node] = col_count[node] = 0
+        missing[node, :] = missing[:, node] = False
+
+    if best is None:
+        return [(None, None)]
+    h, rows, cols = best
+    covered = set(cover[:h])
+    rest = [i for i in range(n) if i not in covered]
+    plan = []
+    if h:
+        plan += [(cover[:h], None)] + ([(rest, cover[:h])] if rest else [])
+    if rows:
+        plan.append((rows, cols))
+    return plan
+
+
+class MatrixBuilder:
+    """Distance and time matrices over locations: cache first, then OSRM."""
+
+    def __init__(self, client: OsrmClient, cache: PairCache):
+        self.client = client
+        self.cache = cache
+
+    async def build(self, locations: list[Location]) -> tuple[list[list[int]], list[list[int]]]:
+        """(distance_matrix, time_matrix) in the order of ``locations``."""
+        node_keys = [snap(location) for location in locations]
+        keys = list(dict.fromkeys(node_keys))
+        distance, duration, missing = self.cache.lookup(keys)
+
+        if missing.any():
+            requests = _plan(missing)
+            tables = await asyncio.gather(*(
+                asyncio.to_thread(self.client.table, keys, sources, destinations)
+                for sources, destinations in requests
+            ))
+            fetched = []
+            for (sources, destinations), (distances, durations) in zip(requests, tables):
+                rows = sources if sources is not None else range(len(keys))
+                columns = destinations if destinations is not None else range(len(keys))
+                for i, distance_row, duration_row in zip(rows, distances, durations):
+                    for j, meters, seconds in zip(columns, distance_row, duration_row):
+                        if i != j:
+                            distance[i, j], duration[i, j] = meters, seconds
+                            fetched.append((keys[i], keys[j], meters, seconds))
+            self.cache.put(fetched)
+            await asyncio.to_thread(self.cache.persist, fetched)
+            logger.info(
+                f"Travel matrix for {len(keys)} locations: {int(missing.sum())} pairs "
+                f"missing, fetched {len(fetched)} in {len(requests)} OSRM call(s)"
+            )
+
+        position = {key: i for i, key in enumerate(keys)}
+        index = [position[key] for key in node_keys]
+        grid = np.ix_(index, index)
+        return distance[grid].tolist(), duration[grid].tolist()
@@ -0,0 +1,331 @@
+"""Process pool that keeps CPU-bound solves off the asyncio event loop.
+
+OR-Tools holds the GIL for the whole search, so running ``solve()`` in a
+thread would still freeze the loop. Each worker is a separate process that
+imports OR-Tools once at startup and then serves solves until shutdown.
+
+``ProcessPoolExecutor`` only spawns a process when a job needs one, so on its
+own the first requests after a deploy pay for process start, imports and
+the first routing model. ``warm()`` spawns every worker up-front and runs a
+tiny solve on each.
+
+Work is admitted by priority class rather than straight into the executor's
+FIFO queue: each class has its own queue, a free worker goes to the most
+urgent class with room under its running limit, and a submission to a full
+queue is rejected at once instead of timing out later.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing.managers import SyncManager
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds this worker spent importing the solver stack, reported by _warm_up
+_import_seconds = 0.0
+
+# How long a warm-up job waits for the other workers before giving up
+WARM_UP_TIMEOUT_SECONDS = 60
+
+
+def _init_worker() -> None:
+    """Import the solver stack up-front so the first request doesn't pay for it."""
+    global _import_seconds
+    started = time.perf_counter()
+    # Spawned workers don't run main.py, so they need their own log handler.
+    logging.basicConfig(level=logging.INFO)
+    from . import solver  # noqa: F401
+    _import_seconds = time.perf_counter() - started
+
+
+def _warm_up(barrier) -> dict:
+    """Build and solve a three-node OR-Tools model once in this worker.
+
+    The barrier holds every warm-up job until all workers have one, so no
+    worker takes two while another is still unspawned.
+    """
+    from .models import OptimizeRequest
+    from .solver import solve
+
+    try:
+        barrier.wait(WARM_UP_TIMEOUT_SECONDS)
+    except threading.BrokenBarrierError:
+        logger.warning("Warm-up barrier broke; this worker may warm up twice")
+    started = time.perf_counter()
+    solve(OptimizeRequest(
+        distance_matrix=[[0, 1, 1], [1, 0, 1], [1, 1, 0]],
+        time_matrix=[[0, 1, 1], [1, 0, 1], [1, 1, 0]],
+        solver_time_limit_seconds=1,
+    ), exact_max_nodes=0)
+    return {
+        "pid": os.getpid(),
+        "import_seconds": _import_seconds,
+        "first_solve_seconds": time.perf_counter() - started,
+    }
+
+
+# Request classes in dispatch order: a free worker goes to the first class
+# with work waiting and room under its running limit
+PRIORITIES = ("interactive", "planning", "batch")
+
+
+@dataclass(frozen=True)
+class ClassLimits:
+    """How much of the pool one priority class may hold."""
+
+    # Workers the class may occupy at once
+    max_running: int
+    # Submissions that may wait for a worker before new ones are rejected
+    max_queued: int
+
+
+class PoolSaturated(Exception):
+    """Raised by ``submit`` when the class's queue is full."""
+
+    def __init__(self, priority: str, retry_after_seconds: int):
+        super().__init__(f"{priority} queue is full; retry in {retry_after_seconds}s")
+        self.priority = priority
+        self.retry_after_seconds = retry_after_seconds
+
+
+class SolveFuture(Future):
+    """Future of a pooled call that also knows how long it waited for a worker."""
+
+    def __init__(self, cost_seconds: float):
+        super().__init__()
+        self.cost_seconds = cost_seconds
+        self.queued_at = time.perf_counter()
+        self.queue_wait_seconds: float | None = None
+
+
+class SolverPool:
+    """Bounded pool of solver processes with priority admission and accounting."""
+
+    def __init__(self, workers: int, limits: dict[str, ClassLimits] | None = None):
+        self.workers = workers
+        # Classes without explicit limits may use every worker and queue freely
+        self.limits = {
+            priority: ClassLimits(max_running=workers, max_queued=1_000_000)
+            for priority in PRIORITIES
+        } | (limits or {})
+        self._executor: ProcessPoolExecutor | None = None
+        self._manager: SyncManager | None = None
+        # Re-entrant: a call that finishes at once runs its callback under the lock
+        self._lock = threading.RLock()
+        self._waiting: dict[str, deque] = {priority: deque() for priority in PRIORITIES}
+        self._running = dict.fromkeys(PRIORITIES, 0)
+        self._rejected = dict.fromkeys(PRIORITIES, 0)
+        self._completed = 0
+        self._failed = 0
+        # "cold" (never warmed), "warming" or "warm"
+        self.warm_state = "cold"
+        self._warm_up_seconds = 0.0
+        self._warm_workers = 0
+
+    def start(self) -> None:
+        """Create the worker processes. Idempotent."""
+        if self._executor is not None:
+            return
+        # "spawn" keeps workers free of the parent's event loop and threads.
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+        )
+        self._manager = context.Manager()
+        logger.info(f"Solver pool started with {self.workers} worker(s)")
+
+    def shutdown(self) -> None:
+        """Stop the workers, cancelling solves that have not started yet."""
+        if self._executor is None:
+            return
+        with self._lock:
+            for waiting in self._waiting.values():
+                while waiting:
+                    waiting.popleft()[0].cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+        self.warm_state = "cold"
+        logger.info("Solver pool stopped")
+
+    async def warm(self) -> list[dict]:
+        """Spawn every worker and run one small solve in each.
+
+        Warm-up jobs bypass the completed/failed counters. Returns each
+        worker's report (pid, import and first-solve seconds).
+        """
+        if self._executor is None:
+            raise RuntimeError("Solver pool is not started")
+        self.warm_state = "warming"
+        started = time.perf_counter()
+        barrier = self.manager().Barrier(self.workers)
+        try:
+            reports = await asyncio.gather(*(
+                asyncio.wrap_future(self._executor.submit(_warm_up, barrier))
+                for _ in range(self.workers)
+            ))
+        except BaseException:
+            self.warm_state = "cold"
+            raise
+        self._warm_up_seconds = time.perf_counter() - started
+        self._warm_workers = len({report["pid"] for report in reports})
+        self.warm_state = "warm"
+        logger.info(
+            f"Solver pool warmed {self._warm_workers} worker(s) in {self._warm_up_seconds:.2f}s"
+        )
+        return reports
+
+    def manager(self) -> SyncManager:
+        """Shared manager for queues/events passed to workers.
+
+        Plain multiprocessing queues can't be sent to pool workers; manager
+        proxies can.
+        """
+        if self._manager is None:
+            raise RuntimeError("Solver pool is not started")
+        return self._manager
+
+    @staticmethod
+    def release(proxy: Any) -> None:
+        """Free a manager object now instead of when its proxy is collected.
+
+        For proxies whose call was never admitted: a traceback holding the
+        proxy would otherwise keep the object alive in the manager.
+        """
+        close = getattr(proxy, "_close", None)
+        if close is not None:
+            close()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: str = "interactive",
+        cost_seconds: float = 1.0,
+    ) -> SolveFuture:
+        """Queue ``fn(*args)`` in ``priority``'s queue and return its future.
+
+        ``cost_seconds`` is the caller's estimate of the run time, used for
+        the retry hint. Raises PoolSaturated if the call would have to wait
+        and the class's queue is already full.
+        """
+        if self._executor is None:
+            raise RuntimeError("Solver pool is not started")
+        future = SolveFuture(cost_seconds)
+        future.add_done_callback(partial(self._forget, priority))
+        with self._lock:
+            waiting = self._waiting[priority]
+            waiting.append((future, fn, args))
+            self._dispatch()
+            if len(waiting) > self.limits[priority].max_queued:
+                waiting.pop()
+                self._rejected[priority] += 1
+                raise PoolSaturated(priority, self._retry_after(priority))
+        return future
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: str = "interactive",
+        cost_seconds: float = 1.0,
+    ) -> Any:
+        """Run ``fn(*args)`` in a worker process and await its result."""
+        return await asyncio.wrap_future(
+            self.submit(fn, *args, priority=priority, cost_seconds=cost_seconds)
+        )
+
+    def _dispatch(self) -> None:
+        """Hand waiting calls to free workers, most urgent class first."""
+        with self._lock:
+            while self._executor is not None and sum(self._running.values()) < self.workers:
+                priority = next(
+                    (
+                        p for p in PRIORITIES
+                        if self._waiting[p] and self._running[p] < self.limits[p].max_running
+                    ),
+                    None,
+                )
+                if priority is None:
+                    return
+                future, fn, args = self._waiting[priority].popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue  # cancelled while it waited
+                future.queue_wait_seconds = time.perf_counter() - future.queued_at
+                self._running[priority] += 1
+                # Accounting follows the worker, not the awaiting coroutine: a
+                # caller that goes away does not stop a solve already running.
+                self._executor.submit(fn, *args).add_done_callback(
+                    partial(self._on_done, priority, future)
+                )
+
+    def _forget(self, priority: str, future: SolveFuture) -> None:
+        """Take a call cancelled while it waited out of its queue, so it stops counting."""
+        if not future.cancelled():
+            return
+        with self._lock:
+            waiting = self._waiting[priority]
+            for entry in waiting:
+                if entry[0] is future:
+                    waiting.remove(entry)
+                    break
+
+    def _on_done(self, priority: str, future: SolveFuture, done: Future) -> None:
+        with self._lock:
+            self._running[priority] -= 1
+            if done.cancelled() or done.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+        if done.cancelled():
+            future.set_exception(CancelledError())
+        elif done.exception() is not None:
+            future.set_exception(done.exception())
+        else:
+            future.set_result(done.result())
+        self._dispatch()
+
+    def _retry_after(self, priority: str) -> int:
+        """Seconds for the class's queued work to drain, by the callers' estimates."""
+        backlog = sum(future.cost_seconds for future, _, _ in self._waiting[priority])
+        return max(1, math.ceil(backlog / self.limits[priority].max_running))
+
+    def stats(self) -> dict:
+        """Snapshot of pool load, in total and per priority class."""
+        with self._lock:
+            running = dict(self._running)
+            queued = {p: len(waiting) for p, waiting in self._waiting.items()}
+            rejected = dict(self._rejected)
+            completed = self._completed
+            failed = self._failed
+        per_class = {}
+        for priority in PRIORITIES:
+            per_class[f"{priority}_running"] = running[priority]
+            per_class[f"{priority}_queued"] = queued[priority]
+            per_class[f"{priority}_rejected"] = rejected[priority]
+        return {
+            "workers": self.workers,
+            "busy_workers": sum(running.values()),
+            "queue_depth": sum(queued.values()),
+            "completed": completed,
+            "failed": failed,
+            **per_class,
+            "warm_state": self.warm_state,
+            "warm_workers": self._warm_workers,
+            "warm_up_seconds": round(self._warm_up_seconds, 3),
+        }
@@ -0,0 +1,67 @@
+"""Portfolio search: race several search configurations on separate workers.
+
+Which first-solution strategy and metaheuristic does best varies a lot
+between tight-window and unconstrained routes. Rather than searching longer
+with one setup, the portfolio runs several at once under the same time
+limit, one per pool worker, and keeps the best route.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable
+
+from .models import OptimizeRequest, OptimizeResponse
+from .solver import DEFAULT_SEARCH_CONFIG, EXACT_MAX_NODES, SearchConfig, solve
+
+logger = logging.getLogger(__name__)
+
+# Configurations in the order they join the race; the default always runs
+SEARCH_PORTFOLIO: tuple[SearchConfig, ...] = (
+    DEFAULT_SEARCH_CONFIG,
+    ("PARALLEL_CHEAPEST_INSERTION", "GUIDED_LOCAL_SEARCH"),
+    ("PATH_CHEAPEST_ARC", "SIMULATED_ANNEALING"),
+    ("LOCAL_CHEAPEST_INSERTION", "TABU_SEARCH"),
+    ("SAVINGS", "GUIDED_LOCAL_SEARCH"),
+    ("CHRISTOFIDES", "GUIDED_LOCAL_SEARCH"),
+)
+
+
+def solve_with_config(request: OptimizeRequest, search_config: SearchConfig) -> OptimizeResponse:
+    """``solve()`` with a given search configuration. Runs in a worker."""
+    return solve(request, search_config=search_config)
+
+
+def _rank(result: OptimizeResponse) -> tuple[int, int, int]:
+    """Fewest dropped visits first (they carry the drop penalty), then distance."""
+    return len(result.dropped_visits), result.total_distance_meters, result.total_duration_seconds
+
+
+async def solve_portfolio(
+    request: OptimizeRequest, run: Callable[..., Awaitable[Any]], max_parallel: int
+) -> OptimizeResponse:
+    """Run up to ``request.portfolio`` configurations concurrently and return the best.
+
+    At most ``max_parallel`` configurations run (the request's priority
+    class's running limit), so the race takes one time limit of wall-clock
+    rather than queueing behind itself.
+    The winner's ``search_config`` names the configuration that produced it.
+    Models small enough for the exact engine are solved once, without a race.
+    """
+    if len(request.distance_matrix) <= EXACT_MAX_NODES:
+        # Every configuration would return the same proven optimum
+        return await run(solve, request)
+    configs = SEARCH_PORTFOLIO[:max(1, min(request.portfolio, max_parallel))]
+    results = await asyncio.gather(
+        *(run(solve_with_config, request, config) for config in configs)
+    )
+    best = min(results, key=_rank)
+    logger.info(
+        "Portfolio results: "
+        + ", ".join(
+            f"{result.search_config}={result.total_distance_meters}m"
+            f"/{len(result.dropped_visits)} dropped"
+            for result in results
+        )
+        + f"; winner {best.search_config}"
+    )
+    return best
@@ -0,0 +1,36 @@
+"""Worker-side helpers for solves that report progress or can be cancelled.
+
+Pool workers are separate processes, so the event loop talks to a running
+search through multiprocessing manager proxies: a queue the worker pushes
+improving solutions into, and an event the loop sets to stop the search.
+"""
+
+from .models import OptimizeRequest, OptimizeResponse, SolutionEvent
+from .solver import solve
+
+
+def solve_with_progress(request: OptimizeRequest, events, cancel) -> OptimizeResponse | None:
+    """Solve ``request``, streaming improvements to ``events`` until ``cancel`` is set.
+
+    ``events`` may be None when only cancellation is needed. Returns None
+    without solving if ``cancel`` was set while the call waited for a worker.
+    Runs in a worker.
+    """
+    if cancel.is_set():
+        return None
+
+    def on_solution(result: OptimizeResponse, objective: int, elapsed: float) -> bool:
+        if events is not None:
+            events.put(SolutionEvent(
+                event="solution",
+                elapsed_seconds=round(elapsed, 3),
+                objective=objective,
+                result=result,
+            ).model_dump(mode="json"))
+        return False
+
+    return solve(
+        request,
+        on_solution=on_solution if events is not None else None,
+        should_stop=cancel.is_set,
+    )
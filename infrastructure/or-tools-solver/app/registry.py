@@ -0,0 +1,187 @@
+"""Server-side store of travel matrices, so re-optimizations don't resend them.
+
+A mid-day re-optimization of a route differs from the morning's by a visit
+or two, yet ``/optimize`` needs both full NxN matrices again: most of the
+request bytes, and most of the parse time. Here a client uploads the
+matrices once and gets a handle back; later calls send the handle, the node
+subset to route over and, for new stops, only their rows and columns.
+
+Matrices are stored as one read-only ``(2, n, n)`` int32 array (distance,
+then time), as the binary transport sends them. Entries are immutable:
+extending one registers a new handle and leaves the original in place for
+requests still using it. The store is bounded by bytes, evicting the least
+recently used matrix first. Only the event loop touches it.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+_INT32 = np.iinfo(np.int32)
+
+
+class UnknownMatrix(KeyError):
+    """The handle was never registered, or has been evicted."""
+
+
+def _as_int32(name: str, values, shape: tuple[int, ...]) -> np.ndarray:
+    """``values`` as an int32 array of ``shape``, or ValueError naming ``name``."""
+    try:
+        array = np.asarray(values, dtype=np.int64)
+    except (ValueError, OverflowError) as e:
+        raise ValueError(f"{name} must be a rectangular array of integers") from e
+    if array.shape != shape:
+        raise ValueError(f"{name} has shape {array.shape}, expected {shape}")
+    if array.size and (array.min() < _INT32.min or array.max() > _INT32.max):
+        raise ValueError(f"{name} has values outside the int32 range")
+    return array.astype(np.int32)
+
+
+def stack_matrices(distance_matrix, time_matrix) -> np.ndarray:
+    """A square distance/time pair as one ``(2, n, n)`` int32 array; ValueError if malformed."""
+    n = len(distance_matrix)
+    return np.stack([
+        _as_int32("distance_matrix", distance_matrix, (n, n)),
+        _as_int32("time_matrix", time_matrix, (n, n)),
+    ])
+
+
+def extend_matrices(
+    base: np.ndarray,
+    distance_from: list[list[int]],
+    distance_to: list[list[int]],
+    time_from: list[list[int]],
+    time_to: list[list[int]],
+) -> np.ndarray:
+    """``base`` plus k appended stops, which get indices n..n+k-1.
+
+    ``*_from`` are the k new stops' rows (to all n + k nodes, new ones
+    last); ``*_to`` are their columns, one list per new stop, from the n
+    existing nodes. Raises ValueError on a shape mismatch.
+    """
+    n = base.shape[1]
+    k = len(distance_from)
+    rows = [
+        _as_int32("distance_from", distance_from, (k, n + k)),
+        _as_int32("time_from", time_from, (k, n + k)),
+    ]
+    columns = [
+        _as_int32("distance_to", distance_to, (k, n)),
+        _as_int32("time_to", time_to, (k, n)),
+    ]
+    matrices = np.empty((2, n + k, n + k), dtype=np.int32)
+    matrices[:, :n, :n] = base
+    for m in range(2):
+        matrices[m, n:, :] = rows[m]
+        matrices[m, :n, n:] = columns[m].T
+    return matrices
+
+
+class MatrixRegistry:
+    """LRU map of handle -> stacked (distance, time) matrices, bounded by bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._matrices: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def register(self, distance_matrix, time_matrix) -> str:
+        """Store a square matrix pair and return its handle.
+
+        The handle is a hash of the contents, so uploading the same
+        matrices again returns the same handle without storing a copy.
+        """
+        matrices = stack_matrices(distance_matrix, time_matrix)
+        digest = hashlib.sha256(str(matrices.shape).encode())
+        digest.update(matrices.tobytes())
+        return self._store(digest.hexdigest()[:32], matrices)
+
+    def extend(
+        self,
+        handle: str,
+        distance_from: list[list[int]],
+        distance_to: list[list[int]],
+        time_from: list[list[int]],
+        time_to: list[list[int]],
+    ) -> str:
+        """Register ``handle``'s matrices plus appended stops (see ``extend_matrices``).
+
+        Returns the new handle; ``handle`` itself stays as it was.
+        """
+        base = self.get(handle)
+        n = base.shape[1]
+        matrices = extend_matrices(base, distance_from, distance_to, time_from, time_to)
+        # Hash the patch, not the result: same base + same stops, same handle
+        digest = hashlib.sha256(handle.encode())
+        digest.update(matrices[:, n:, :].tobytes())
+        digest.update(matrices[:, :n, n:].tobytes())
+        return self._store(digest.hexdigest()[:32], matrices)
+
+    def get(self, handle: str) -> np.ndarray:
+        """The ``(2, n, n)`` array for ``handle``; raises UnknownMatrix."""
+        matrices = self._matrices.get(handle)
+        if matrices is None:
+            self.misses += 1
+            raise UnknownMatrix(handle)
+        self.hits += 1
+        self._matrices.move_to_end(handle)
+        return matrices
+
+    def subset(self, handle: str, nodes: list[int] | None) -> tuple[np.ndarray, np.ndarray]:
+        """(distance, time) restricted to ``nodes``, in that order; None keeps all."""
+        matrices = self.get(handle)
+        if nodes is None:
+            return matrices[0], matrices[1]
+        n = matrices.shape[1]
+        if not nodes:
+            raise ValueError("nodes cannot be empty")
+        if min(nodes) < 0 or max(nodes) >= n:
+            raise ValueError(f"nodes must be indices between 0 and {n - 1}")
+        if len(set(nodes)) != len(nodes):
+            raise ValueError("nodes contains duplicates")
+        index = np.ix_(nodes, nodes)
+        return matrices[0][index], matrices[1][index]
+
+    def describe(self, handle: str) -> dict:
+        """Handle, node count and stored bytes, without counting as a hit."""
+        matrices = self._matrices.get(handle)
+        if matrices is None:
+            raise UnknownMatrix(handle)
+        return {"handle": handle, "nodes": matrices.shape[1], "bytes": matrices.nbytes}
+
+    def delete(self, handle: str) -> None:
+        matrices = self._matrices.pop(handle, None)
+        if matrices is None:
+            raise UnknownMatrix(handle)
+        self._bytes -= matrices.nbytes
+
+    def _store(self, handle: str, matrices: np.ndarray) -> str:
+        if matrices.nbytes > self.max_bytes:
+            raise ValueError(
+                f"matrices need {matrices.nbytes} bytes, more than the registry's {self.max_bytes}"
+            )
+        if handle in self._matrices:
+            self._matrices.move_to_end(handle)
+            return handle
+        matrices.flags.writeable = False
+        self._matrices[handle] = matrices
+        self._bytes += matrices.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._matrices.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+        return handle
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._matrices),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
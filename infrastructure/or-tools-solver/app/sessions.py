@@ -0,0 +1,425 @@
+"""Route sessions: a driver's route kept server-side and updated by events.
+
+During the day the tracking service re-optimizes what is left of a route
+every time something happens: a visit done, an order added, a delay, a new
+GPS position. Sent to /optimize, each of those is a full solve of a request
+rebuilt from scratch, and the driver's app waits for it.
+
+A session keeps the route's matrices, the completed prefix, the incumbent
+order of the remaining visits and the clock. An event updates that state
+and re-scores the incumbent with ``score_orders`` (added stops go in by
+cheapest insertion), so fresh ETAs come back in milliseconds. The
+remaining suffix is then re-solved in the background on the pool, warm
+started from the incumbent, and the result replaces the incumbent unless a
+newer event has arrived meanwhile.
+
+The OR-Tools model itself can't be kept: a routing model can't drop nodes
+once closed, and pool workers are not tied to sessions. Each re-solve
+builds a model over the suffix only, with the driver's location as its
+start node, whose column holds the travel back to the depot, so a round
+trip still ends there.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+import uuid
+from concurrent.futures import CancelledError
+from typing import Callable
+
+import numpy as np
+
+from .admission import estimated_seconds
+from .evaluate import score_orders
+from .insertion import insert_into_route
+from .models import (
+    Delay,
+    OptimizeRequest,
+    OptimizeResponse,
+    PositionUpdate,
+    RouteInsertionRequest,
+    RouteOptions,
+    RouteSessionRequest,
+    RouteSessionState,
+    SessionEvent,
+    TimeWindow,
+    VisitAdded,
+    VisitCompleted,
+    VisitRemoved,
+)
+from .pool import SolverPool
+from .progress import solve_with_progress
+from .registry import extend_matrices, stack_matrices
+from .solver import DEFAULT_SERVICE_TIME, _build_data_model
+
+logger = logging.getLogger(__name__)
+
+
+class SessionLimitExceeded(Exception):
+    """Raised when the maximum number of open sessions is reached."""
+
+
+def _rebase(tw: TimeWindow | None, clock: int) -> TimeWindow | None:
+    """A window relative to ``clock``; one that has closed can only be missed."""
+    if tw is None:
+        return None
+    if tw.latest < clock:
+        return TimeWindow(earliest=0, latest=0)
+    return TimeWindow(earliest=max(0, tw.earliest - clock), latest=tw.latest - clock)
+
+
+class RouteSession:
+    """One driver's route: matrices, what's done, the plan for the rest, the clock."""
+
+    def __init__(self, request: RouteSessionRequest):
+        self.id = uuid.uuid4().hex
+        self.options = {name: getattr(request, name) for name in RouteOptions.model_fields}
+        self.matrices = stack_matrices(request.distance_matrix, request.time_matrix)
+        n = self.matrices.shape[1]
+        self.time_windows = list(request.time_windows) + [None] * (n - len(request.time_windows))
+        self.service_times = list(request.service_times)
+        self.service_times += [
+            0 if node == 0 else DEFAULT_SERVICE_TIME for node in range(len(self.service_times), n)
+        ]
+        self.departed_at = self.clock = request.departure_seconds
+        # A node, or None with ``position`` holding (distance, time) rows from there
+        self.location: int | None = 0
+        self.position: np.ndarray | None = None
+        self.completed: list[int] = []
+        self.order: list[int] = []
+        self.dropped: list[int] = list(range(1, n))
+        self.version = 0
+        self.updated_at = time.time()
+        self.solver_status: str | None = None
+        self.solving = None  # (future, cancel event) of the background re-solve
+        # Held while events are applied off the loop, and while a re-solve lands
+        self.lock = asyncio.Lock()
+        self._scores: dict = {}
+        if request.visit_order is not None:
+            self._check_visits(request.visit_order)
+            self.order = list(request.visit_order)
+            self.dropped = [node for node in self.dropped if node not in set(self.order)]
+        self.refresh()
+
+    @property
+    def num_nodes(self) -> int:
+        return self.matrices.shape[1]
+
+    def _check_visits(self, visits: list[int]) -> None:
+        if any(node < 1 or node >= self.num_nodes for node in visits):
+            raise ValueError(f"visits must be node indices between 1 and {self.num_nodes - 1}")
+        if len(set(visits)) != len(visits):
+            raise ValueError("visit_order contains duplicate nodes")
+
+    def _take(self, visit: int) -> None:
+        """Remove a pending visit from the plan; ValueError if it isn't pending."""
+        for pending in (self.order, self.dropped):
+            if visit in pending:
+                pending.remove(visit)
+                return
+        raise ValueError(f"visit {visit} is not pending")
+
+    def suffix_request(self) -> tuple[OptimizeRequest, list[int]]:
+        """The remaining route as an /optimize request, plus its node -> session node map.
+
+        Node 0 is the driver's location; 1.. are the incumbent order, then
+        the dropped visits. Times are relative to the clock.
+        """
+        nodes = self.order + self.dropped
+        origin = 0 if self.location is None else self.location
+        index = np.array([origin] + nodes)
+        matrices = self.matrices[:, index[:, None], index[None, :]].astype(np.int64)
+        if self.position is not None:
+            matrices[:, 0, :] = self.position[:, index]
+        # Arcs into node 0 are only ever the return leg, so they go to the depot
+        matrices[:, :, 0] = self.matrices[:, index, 0]
+        matrices[:, 0, 0] = 0
+
+        max_duration = self.options["max_route_duration"]
+        if max_duration:
+            max_duration = max(1, max_duration - (self.clock - self.departed_at))
+        request = OptimizeRequest.model_construct(**{
+            **self.options,
+            "distance_matrix": matrices[0],
+            "time_matrix": matrices[1],
+            "time_windows": [None] + [_rebase(self.time_windows[v], self.clock) for v in nodes],
+            "service_times": [0] + [self.service_times[v] for v in nodes],
+            "max_route_duration": max_duration,
+            "initial_route": list(range(1, len(self.order) + 1)) or None,
+        })
+        return request, nodes
+
+    def refresh(self) -> None:
+        """Re-score the incumbent order from the current location and clock."""
+        request, _ = self.suffix_request()
+        data = _build_data_model(request)
+        self._scores = score_orders(
+            data, [list(range(1, len(self.order) + 1))], not request.return_to_depot
+        )
+
+    def apply(self, event: SessionEvent) -> None:
+        """Update the state for one event. Raises ValueError if it doesn't fit."""
+        if isinstance(event, VisitCompleted):
+            self._take(event.visit)
+            self.completed.append(event.visit)
+            self.location, self.position = event.visit, None
+            self.clock = event.at_seconds
+        elif isinstance(event, VisitRemoved):
+            self._take(event.visit)
+        elif isinstance(event, Delay):
+            self.clock += event.seconds
+        elif isinstance(event, PositionUpdate):
+            n = self.num_nodes
+            if len(event.distance_from) != n or len(event.time_from) != n:
+                raise ValueError(f"position rows need one entry per session node ({n})")
+            self.position = np.array([event.distance_from, event.time_from], dtype=np.int64)
+            self.location = None
+            self.clock = event.at_seconds
+        elif isinstance(event, VisitAdded):
+            self._add(event)
+
+    def _add(self, event: VisitAdded) -> None:
+        """Append the new stops and insert them where they cost least."""
+        first = self.num_nodes
+        travel = event.travel
+        self.matrices = extend_matrices(
+            self.matrices, travel.distance_from, travel.distance_to,
+            travel.time_from, travel.time_to,
+        )
+        k = self.num_nodes - first
+        if self.position is not None:
+            # Reaching the new stops from between two others: via the next planned stop
+            via = self.order[0] if self.order else 0
+            self.position = np.concatenate(
+                [self.position, self.position[:, [via]] + self.matrices[:, via, first:]], axis=1
+            )
+        self.time_windows += (list(event.time_windows) + [None] * k)[:k]
+        self.service_times += (list(event.service_times) + [DEFAULT_SERVICE_TIME] * k)[:k]
+
+        new_visits = list(range(first, first + k))
+        self.dropped += new_visits
+        request, nodes = self.suffix_request()
+        placed = insert_into_route(RouteInsertionRequest.model_construct(
+            **dict(request),
+            visit_order=list(range(1, len(self.order) + 1)),
+            new_visits=[nodes.index(node) + 1 for node in new_visits],
+        ))
+        session_node = {i + 1: node for i, node in enumerate(nodes)}
+        self.order = [session_node[i] for i in placed.visit_order]
+        placed_nodes = set(self.order)
+        self.dropped = [node for node in self.dropped if node not in placed_nodes]
+
+    def with_events(self, events: list[SessionEvent]) -> "RouteSession":
+        """A re-scored copy with ``events`` applied; this session is left as it was.
+
+        Raises ValueError if an event doesn't fit. Matrices and positions are
+        replaced rather than changed in place, so only the lists are copied.
+        """
+        draft = copy.copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, list):
+                setattr(draft, name, list(value))
+        for event in events:
+            draft.apply(event)
+        draft.refresh()
+        return draft
+
+    def accept(self, result: OptimizeResponse, nodes: list[int]) -> None:
+        """Take a solve of ``suffix_request()`` as the new incumbent."""
+        session_node = {i + 1: node for i, node in enumerate(nodes)}
+        self.order = [session_node[i] for i in result.visit_order]
+        self.dropped = [session_node[i] for i in result.dropped_visits]
+        self.solver_status = result.solver_status
+        self.version += 1
+        self.refresh()
+
+    def to_state(self) -> RouteSessionState:
+        count = len(self.order)
+        scores = self._scores
+        arrivals = [self.clock + int(eta) for eta in scores["arrivals"][0][:count]]
+        late = [self.order[p] for p in np.flatnonzero(scores["late"][0][:count])]
+        return RouteSessionState(
+            session_id=self.id,
+            version=self.version,
+            clock_seconds=self.clock,
+            location=self.location,
+            completed_visits=self.completed,
+            visit_order=self.order,
+            estimated_arrivals=arrivals,
+            finish_seconds=self.clock + int(scores["duration"][0]),
+            remaining_distance_meters=int(scores["distance"][0]),
+            late_visits=late,
+            dropped_visits=sorted(self.dropped),
+            feasible=not late and not self.dropped,
+            reoptimizing=self.solving is not None,
+            solver_status=self.solver_status,
+        )
+
+
+class SessionStore:
+    """Open route sessions, with background re-solves on the solver pool.
+
+    Sessions idle for ``ttl_seconds`` are closed. ``on_result(request,
+    result)`` is called in the event loop for every finished solve.
+    """
+
+    def __init__(
+        self,
+        pool: SolverPool,
+        max_sessions: int,
+        ttl_seconds: float,
+        on_result: Callable[[OptimizeRequest, OptimizeResponse], None] | None = None,
+    ):
+        self.pool = pool
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.on_result = on_result
+        self._sessions: dict[str, RouteSession] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.events = 0
+        self.resolves_applied = 0
+        self.resolves_superseded = 0
+
+    async def open(self, request: RouteSessionRequest) -> RouteSession:
+        """Start a session, solving the route first unless it came with one.
+
+        Raises SessionLimitExceeded, ValueError for a bad ``visit_order``,
+        and PoolSaturated if the initial solve can't be queued.
+        """
+        self._prune()
+        if len(self._sessions) >= self.max_sessions:
+            raise SessionLimitExceeded(f"{len(self._sessions)} sessions are already open")
+        session = RouteSession(request)
+        if request.visit_order is None:
+            suffix, nodes = session.suffix_request()
+            future = self.pool.submit(
+                solve_with_progress, suffix, None, self.pool.manager().Event(),
+                priority=request.priority or "interactive",
+                cost_seconds=estimated_seconds(suffix),
+            )
+            self._record(suffix, session, await asyncio.wrap_future(future), nodes)
+        self._sessions[session.id] = session
+        logger.info(f"Session {session.id} opened: {session.num_nodes} nodes")
+        return session
+
+    async def update(
+        self, session_id: str, events: list[SessionEvent], reoptimize: bool
+    ) -> RouteSession | None:
+        """Apply ``events`` and refresh ETAs; None if there is no such session.
+
+        Events are all-or-nothing: if one raises ValueError, the session is
+        left as it was. They are applied to a copy in a thread, since
+        inserting added stops and re-scoring are O(N) per event, and the copy
+        replaces the session's state in one step. A re-solve started for an
+        older version is cancelled.
+        """
+        session = self.get(session_id)
+        if session is None:
+            return None
+        async with session.lock:
+            draft = await asyncio.to_thread(session.with_events, events)
+            if session.id not in self._sessions:
+                return None  # closed meanwhile
+            draft.solving = session.solving  # may have finished meanwhile
+            vars(session).update(vars(draft))
+            session.version += 1
+            session.updated_at = time.time()
+            self.events += len(events)
+            self._cancel_solve(session)
+            if reoptimize and (session.order or session.dropped):
+                self._resolve(session)
+        return session
+
+    def _resolve(self, session: RouteSession) -> None:
+        request, nodes = session.suffix_request()
+        cancel = self.pool.manager().Event()
+        try:
+            future = self.pool.submit(
+                solve_with_progress, request, None, cancel,
+                priority=request.priority or "interactive",
+                cost_seconds=estimated_seconds(request),
+            )
+        except Exception as e:
+            # The ETAs are already updated; the next event tries again
+            logger.warning(f"Session {session.id} re-solve not queued: {e}")
+            return
+        session.solving = (future, cancel)
+        # The version solved for is this one: an event may land before the task starts
+        task = asyncio.ensure_future(
+            self._watch(session, session.version, future, request, nodes)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _watch(
+        self, session: RouteSession, version: int, future,
+        request: OptimizeRequest, nodes: list[int],
+    ) -> None:
+        try:
+            result = await asyncio.wrap_future(future)
+        except (CancelledError, asyncio.CancelledError):
+            return
+        except Exception:
+            logger.exception(f"Session {session.id} re-solve failed")
+            result = None
+        finally:
+            if session.solving is not None and session.solving[0] is future:
+                session.solving = None
+        if result is None:
+            return
+        async with session.lock:  # after any update being applied right now
+            if session.version != version or session.id not in self._sessions:
+                self.resolves_superseded += 1
+                return
+            self._record(request, session, result, nodes)
+            self.resolves_applied += 1
+
+    def _record(
+        self, request: OptimizeRequest, session: RouteSession,
+        result: OptimizeResponse | None, nodes: list[int],
+    ) -> None:
+        if result is None:
+            return
+        if self.on_result is not None:
+            self.on_result(request, result)
+        session.accept(result, nodes)
+
+    def _cancel_solve(self, session: RouteSession) -> None:
+        """Stop a re-solve that no longer matches the session's state."""
+        if session.solving is None:
+            return
+        future, cancel = session.solving
+        cancel.set()
+        future.cancel()  # only succeeds while still queued
+        session.solving = None
+
+    def get(self, session_id: str) -> RouteSession | None:
+        self._prune()
+        return self._sessions.get(session_id)
+
+    def close(self, session_id: str) -> RouteSession | None:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._cancel_solve(session)
+        return session
+
+    def _prune(self) -> None:
+        """Close sessions with no events for ``ttl_seconds``."""
+        cutoff = time.time() - self.ttl_seconds
+        for session_id in [
+            session_id for session_id, session in self._sessions.items()
+            if session.updated_at < cutoff
+        ]:
+            self.close(session_id)
+
+    def stats(self) -> dict:
+        return {
+            "open": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "resolving": sum(1 for s in self._sessions.values() if s.solving is not None),
+            "events": self.events,
+            "resolves_applied": self.resolves_applied,
+            "resolves_superseded": self.resolves_superseded,
+        }
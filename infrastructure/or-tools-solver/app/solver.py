@@ -1,9 +1,15 @@
 """Google OR-Tools VRP solver for single-vehicle route optimization with time windows."""
 
+import itertools
 import logging
-from ortools.constraint_solver import routing_enums_pb2, pywrapcp
+import time
+from typing import Callable
 
-from .models import OptimizeRequest, OptimizeResponse
+import numpy as np
+from ortools.constraint_solver import routing_enums_pb2, routing_parameters_pb2, pywrapcp
+
+from .config import load_settings
+from .models import OptimizeRequest, OptimizeResponse, SolverTimings, TimeWindow
 
 logger = logging.getLogger(__name__)
 
@@ -13,25 +19,75 @@ DEFAULT_SERVICE_TIME = 600
 # Large penalty for dropping a visit – the solver will avoid it unless infeasible
 DROP_PENALTY = 100_000_000
 
+# How arc costs reach OR-Tools: "matrix" (native, no Python in the search loop)
+# or "callback" (per-arc Python closure, the historical behaviour).
+DEFAULT_TRANSIT_ENGINE = "matrix"
 
-def _build_data_model(request: OptimizeRequest) -> dict:
-    """Convert the API request into an OR-Tools data model dict."""
-    num_nodes = len(request.distance_matrix)
+# Search setup as (first-solution strategy, local-search metaheuristic), by
+# OR-Tools enum name
+SearchConfig = tuple[str, str]
+DEFAULT_SEARCH_CONFIG: SearchConfig = ("PATH_CHEAPEST_ARC", "GUIDED_LOCAL_SEARCH")
 
-    # Fill service times with defaults if not provided or incomplete
-    service_times = list(request.service_times) if request.service_times else []
-    while len(service_times) < num_nodes:
-        # Depot (index 0) gets 0, visits get DEFAULT_SERVICE_TIME
-        service_times.append(0 if len(service_times) == 0 else DEFAULT_SERVICE_TIME)
+# Models up to this many nodes (depot included) are solved exactly by
+# app.exact instead of OR-Tools (SOLVER_EXACT_MAX_NODES); 0 disables it
+EXACT_MAX_NODES = load_settings().exact_max_nodes
+
+# Default search budget by model size (nodes → seconds) when the request sets none
+TIME_LIMIT_STEPS = ((12, 1), (50, 3), (200, 10), (500, 20))
+MAX_DEFAULT_TIME_LIMIT = 30
+
+# How often a running search polls should_stop() between solutions; the
+# check can be a round trip to a manager process, so not every limit check makes it
+STOP_POLL_SECONDS = 0.1
+
+# on_solution(result, objective, elapsed_seconds) -> stop?
+SolutionCallback = Callable[[OptimizeResponse, int, float], bool | None]
+
+
+def default_time_limit(num_nodes: int) -> int:
+    """Search budget in seconds for a model of ``num_nodes`` nodes."""
+    for max_nodes, seconds in TIME_LIMIT_STEPS:
+        if num_nodes <= max_nodes:
+            return seconds
+    return MAX_DEFAULT_TIME_LIMIT
+
+
+def default_stall_seconds(num_nodes: int) -> float:
+    """No-improvement window for adaptive stopping: 20 ms per node, 0.1–5 s."""
+    return min(5.0, max(0.1, num_nodes * 0.02))
+
+
+def _trivial_timings(started: float, data_model_seconds: float) -> SolverTimings:
+    """Timings for the 0/1-visit shortcuts, where no model is built."""
+    return SolverTimings(
+        data_model_seconds=round(data_model_seconds, 6),
+        model_build_seconds=0.0,
+        search_seconds=0.0,
+        extraction_seconds=0.0,
+        total_seconds=round(time.perf_counter() - started, 6),
+    )
 
-    # Fill time windows — None means unconstrained
-    time_windows = list(request.time_windows) if request.time_windows else []
-    while len(time_windows) < num_nodes:
-        time_windows.append(None)
 
-    # Compute a safe upper-bound horizon for unconstrained windows
-    max_travel = max(max(row) for row in request.time_matrix) if request.time_matrix else 0
-    total_travel = sum(max(row) for row in request.time_matrix)
+def _as_array(matrix) -> np.ndarray:
+    """Matrices arrive as nested lists (JSON) or int arrays (binary transport).
+
+    Flattening lists through ``np.fromiter`` is about twice as fast as
+    ``np.asarray`` on nested lists.
+    """
+    if isinstance(matrix, np.ndarray):
+        return matrix.astype(np.int64, copy=False)
+    n = len(matrix)
+    flat = np.fromiter(itertools.chain.from_iterable(matrix), dtype=np.int64, count=n * n)
+    return flat.reshape(n, n)
+
+
+def _horizon(
+    time_matrix: np.ndarray, service_times: list[int], time_windows: list[TimeWindow | None]
+) -> int:
+    """A safe upper bound on any cumulative time when no duration limit is set."""
+    num_nodes = len(time_matrix)
+    max_travel = int(time_matrix.max()) if num_nodes else 0
+    total_travel = int(time_matrix.max(axis=1).sum()) if num_nodes else 0
     total_service = sum(service_times)
     travel_horizon = total_travel + total_service + max_travel
 
@@ -42,78 +98,137 @@ def _build_data_model(request: OptimizeRequest) -> dict:
             max_tw = max(max_tw, tw.earliest, tw.latest)
     # Add generous buffer after the latest time window
     tw_horizon = max_tw + total_travel + total_service + 3600 if max_tw else 0
+    return max(travel_horizon, tw_horizon, max_tw + 3600)
 
-    horizon = (
-        request.max_route_duration
-        if request.max_route_duration
-        else max(travel_horizon, tw_horizon, max_tw + 3600)
-    )
 
+def _build_data_model(request: OptimizeRequest) -> dict:
+    """Convert the API request into an OR-Tools data model dict.
+
+    The matrices become int64 arrays whichever transport they arrived on, so
+    the horizon and the sparse-mode helpers work on whole arrays instead of
+    looping over rows in Python. ``distance_rows`` keeps a JSON request's own
+    lists, which OR-Tools can take as they are.
+    """
+    distance_matrix = _as_array(request.distance_matrix)
+    time_matrix = _as_array(request.time_matrix)
+    num_nodes = len(distance_matrix)
+
+    # Fill service times with defaults if not provided or incomplete
+    service_times = list(request.service_times) if request.service_times else []
+    while len(service_times) < num_nodes:
+        # Depot (index 0) gets 0, visits get DEFAULT_SERVICE_TIME
+        service_times.append(0 if len(service_times) == 0 else DEFAULT_SERVICE_TIME)
+
+    # Fill time windows — None means unconstrained
+    time_windows = list(request.time_windows) if request.time_windows else []
+    while len(time_windows) < num_nodes:
+        time_windows.append(None)
+
+    horizon = request.max_route_duration or _horizon(time_matrix, service_times, time_windows)
+
+    distance_rows = request.distance_matrix
     return {
-        "distance_matrix": request.distance_matrix,
-        "time_matrix": request.time_matrix,
+        "distance_matrix": distance_matrix,
+        "distance_rows": None if isinstance(distance_rows, np.ndarray) else distance_rows,
+        "time_matrix": time_matrix,
         "time_windows": time_windows,
         "service_times": service_times,
         "num_vehicles": request.num_vehicles,
         "depot": request.depot,
         "horizon": horizon,
+        "max_route_duration": request.max_route_duration,
     }
 
 
-def solve(request: OptimizeRequest) -> OptimizeResponse:
-    """Run the VRP solver and return the optimized route."""
-    data = _build_data_model(request)
-    num_nodes = len(data["distance_matrix"])
-    open_route = not request.return_to_depot
-
-    # Edge case: 0 or 1 visits (just the depot, or depot + 1 stop)
-    if num_nodes <= 1:
-        return OptimizeResponse(
-            visit_order=[],
-            total_distance_meters=0,
-            total_duration_seconds=0,
-            estimated_arrivals=[],
-            feasible=True,
-            dropped_visits=[],
-            solver_status="OPTIMAL",
+def _routing_matrices(
+    data: dict, open_route: bool
+) -> tuple[list[list[int]], list[list[int]], int | None]:
+    """Return the (distance, time transit, end node) inputs for the routing model.
+
+    The time transit is travel time plus the service time at the origin,
+    precomputed so the search never adds it per arc. OR-Tools only accepts
+    nested lists, so each matrix is converted exactly once, here.
+
+    For an open route we append a zero-cost "dummy" end node: every node can
+    reach it for free, so the solver has no incentive to return to the depot
+    and the route effectively ends at the last real stop. Reaching it still
+    takes the service time at the last stop, as with any other arc.
+    """
+    service = data["service_times"]
+    dist_matrix = data["distance_rows"] or data["distance_matrix"].tolist()
+    transit_matrix = (data["time_matrix"] + np.asarray(service)[:, None]).tolist()
+    if not open_route:
+        return dist_matrix, transit_matrix, None
+
+    num_nodes = len(dist_matrix)
+    # The request's rows are copied, never extended in place
+    dist_matrix = [row + [0] for row in dist_matrix] + [[0] * (num_nodes + 1)]
+    for row, service_time in zip(transit_matrix, service):
+        row.append(service_time)
+    transit_matrix.append([0] * (num_nodes + 1))
+    return dist_matrix, transit_matrix, num_nodes
+
+
+def _register_transit(
+    routing: pywrapcp.RoutingModel,
+    manager: pywrapcp.RoutingIndexManager,
+    matrix: list[list[int]],
+    transit_engine: str,
+) -> int:
+    """Register a node-indexed transit matrix and return its evaluator index.
+
+    The ``matrix`` engine hands the whole table to OR-Tools, which evaluates
+    arcs natively during search. The ``callback`` engine wraps it in a Python
+    closure, so every arc evaluation re-enters the interpreter; it is kept for
+    benchmarking and as a fallback.
+    """
+    if transit_engine == "matrix":
+        return routing.RegisterTransitMatrix(matrix)
+    if transit_engine == "callback":
+        def transit_callback(from_index, to_index):
+            from_node = manager.IndexToNode(from_index)
+            to_node = manager.IndexToNode(to_index)
+            return matrix[from_node][to_node]
+
+        return routing.RegisterTransitCallback(transit_callback)
+    raise ValueError(f"Unknown transit engine: {transit_engine}")
+
+
+def _window_bounds(node: int, tw: TimeWindow | None, horizon: int) -> tuple[int, int]:
+    """A node's cumul range: its window clamped to the horizon, else all of it."""
+    if tw is None:
+        return 0, horizon
+    # Clamp to horizon so SetRange never gets out-of-bounds values
+    earliest = min(tw.earliest, horizon)
+    latest = min(tw.latest, horizon)
+    # Safety: if earliest > latest (bad data), treat as unconstrained
+    if earliest > latest:
+        logger.warning(
+            f"Node {node}: earliest ({earliest}) > latest ({latest}), "
+            "treating as unconstrained"
         )
-    if num_nodes == 2:
-        # Open route ends at the stop; round trip also pays the return leg.
-        out_dist = data["distance_matrix"][0][1]
-        out_time = data["time_matrix"][0][1]
-        back_dist = 0 if open_route else data["distance_matrix"][1][0]
-        back_time = 0 if open_route else data["time_matrix"][1][0]
-        return OptimizeResponse(
-            visit_order=[1],
-            total_distance_meters=out_dist + back_dist,
-            total_duration_seconds=out_time + data["service_times"][1] + back_time,
-            estimated_arrivals=[out_time],
-            feasible=True,
-            dropped_visits=[],
-            solver_status="OPTIMAL",
-        )
-
-    # ── Build the routing matrices ───────────────────────
-    # For an open route we append a zero-cost "dummy" end node: every node can
-    # reach it for free, so the solver has no incentive to return to the depot
-    # and the route effectively ends at the last real stop.
-    dist_matrix = data["distance_matrix"]
-    time_matrix = data["time_matrix"]
-    service_times = data["service_times"]
+        return 0, horizon
+    return earliest, latest
+
+
+def _build_routing_model(
+    data: dict,
+    dist_matrix: list[list[int]],
+    transit_matrix: list[list[int]],
+    end_node: int | None,
+    transit_engine: str = DEFAULT_TRANSIT_ENGINE,
+) -> tuple[pywrapcp.RoutingIndexManager, pywrapcp.RoutingModel, pywrapcp.RoutingDimension]:
+    """Create the index manager, routing model and constrained time dimension.
+
+    Takes the lists from ``_routing_matrices``. ``end_node`` is the open-route
+    dummy node, or None for a round trip.
+    """
+    model_nodes = len(dist_matrix)
+    num_nodes = len(data["distance_matrix"])
     time_windows = data["time_windows"]
-    model_nodes = num_nodes
-
-    if open_route:
-        dummy = num_nodes
-        dist_matrix = [row + [0] for row in dist_matrix] + [[0] * (num_nodes + 1)]
-        time_matrix = [row + [0] for row in time_matrix] + [[0] * (num_nodes + 1)]
-        service_times = list(service_times) + [0]
-        model_nodes = num_nodes + 1
-
-    # ── Create routing model ─────────────────────────────
-    if open_route:
+    if end_node is not None:
         manager = pywrapcp.RoutingIndexManager(
-            model_nodes, data["num_vehicles"], [data["depot"]], [dummy]
+            model_nodes, data["num_vehicles"], [data["depot"]], [end_node]
         )
     else:
         manager = pywrapcp.RoutingIndexManager(
@@ -121,24 +236,12 @@ def solve(request: OptimizeRequest) -> OptimizeResponse:
         )
     routing = pywrapcp.RoutingModel(manager)
 
-    # ── Distance callback ────────────────────────────────
-    def distance_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return dist_matrix[from_node][to_node]
-
-    distance_cb_index = routing.RegisterTransitCallback(distance_callback)
+    # ── Arc cost: distance ───────────────────────────────
+    distance_cb_index = _register_transit(routing, manager, dist_matrix, transit_engine)
     routing.SetArcCostEvaluatorOfAllVehicles(distance_cb_index)
 
-    # ── Time callback (travel time + service time at origin) ─
-    def time_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        travel = time_matrix[from_node][to_node]
-        service = service_times[from_node]
-        return travel + service
-
-    time_cb_index = routing.RegisterTransitCallback(time_callback)
+    # ── Time transit (travel time + service time at origin) ─
+    time_cb_index = _register_transit(routing, manager, transit_matrix, transit_engine)
 
     # ── Time dimension ───────────────────────────────────
     horizon = data["horizon"]
@@ -157,22 +260,7 @@ def solve(request: OptimizeRequest) -> OptimizeResponse:
     # on CumulVar(-1) segfaults. The end node needs no time window anyway.
     for node in range(num_nodes):
         index = manager.NodeToIndex(node)
-        tw = time_windows[node]
-        if tw is not None:
-            # Clamp to horizon so SetRange never gets out-of-bounds values
-            earliest = min(tw.earliest, horizon)
-            latest = min(tw.latest, horizon)
-            # Safety: if earliest > latest (bad data), treat as unconstrained
-            if earliest > latest:
-                logger.warning(
-                    f"Node {node}: earliest ({earliest}) > latest ({latest}), "
-                    "treating as unconstrained"
-                )
-                earliest = 0
-                latest = horizon
-            time_dimension.CumulVar(index).SetRange(earliest, latest)
-        else:
-            time_dimension.CumulVar(index).SetRange(0, horizon)
+        time_dimension.CumulVar(index).SetRange(*_window_bounds(node, time_windows[node], horizon))
 
     # Depot: start at time 0, end whenever
     depot_idx = routing.Start(0)
@@ -184,30 +272,429 @@ def solve(request: OptimizeRequest) -> OptimizeResponse:
         routing.AddDisjunction([manager.NodeToIndex(node)], DROP_PENALTY)
 
     # ── Max route duration constraint ────────────────────
-    if request.max_route_duration:
+    if data["max_route_duration"]:
         for vehicle_id in range(data["num_vehicles"]):
-            start_idx = routing.Start(vehicle_id)
-            end_idx = routing.End(vehicle_id)
             time_dimension.SetSpanUpperBoundForVehicle(
-                request.max_route_duration, vehicle_id
+                data["max_route_duration"], vehicle_id
             )
 
-    # ── Solver parameters ────────────────────────────────
+    return manager, routing, time_dimension
+
+
+def _sparse_successors(
+    data: dict, neighbors: int, initial_route: list[int] | None = None
+) -> list[set[int]]:
+    """Allowed successor nodes per node for sparse mode (node indices, no end node).
+
+    A visit keeps its ``neighbors`` nearest successors by travel time, plus:
+    the visits that have it among their nearest predecessors (so no visit
+    loses all its incoming arcs), the next visits in time-window order (so a
+    window-driven sequence stays reachable even across long legs), and the
+    arcs of ``initial_route``. Arcs from the depot and back to the route end
+    are never pruned.
+    """
+    time_matrix = data["time_matrix"]
+    num_nodes = len(time_matrix)
+    depot = data["depot"]
+    successors: list[set[int]] = [set() for _ in range(num_nodes)]
+    successors[depot] = set(range(num_nodes)) - {depot}
+    k = min(neighbors, num_nodes - 2)
+    if k <= 0:
+        return successors
+
+    # Visit-to-visit travel times with self and depot arcs masked out
+    masked = time_matrix.copy()
+    np.fill_diagonal(masked, np.iinfo(np.int64).max)
+    masked[:, depot] = np.iinfo(np.int64).max
+    masked[depot, :] = np.iinfo(np.int64).max
+    nearest_out = np.argpartition(masked, k - 1, axis=1)[:, :k]
+    nearest_in = np.argpartition(masked, k - 1, axis=0)[:k, :]
+    for node in range(num_nodes):
+        if node == depot:
+            continue
+        successors[node].update(nearest_out[node].tolist())
+        for predecessor in nearest_in[:, node].tolist():
+            successors[predecessor].add(node)
+
+    windowed = sorted(
+        (tw.earliest, node)
+        for node, tw in enumerate(data["time_windows"])
+        if tw is not None and node != depot
+    )
+    order = [node for _, node in windowed]
+    for position, node in enumerate(order):
+        successors[node].update(order[position + 1:position + 1 + k])
+
+    if initial_route:
+        for from_node, to_node in zip(initial_route, initial_route[1:]):
+            successors[from_node].add(to_node)
+    return successors
+
+
+def _greedy_route(data: dict) -> list[int]:
+    """Earliest-start greedy visit order, used to seed sparse-mode search.
+
+    From the current stop, go to the pending visit whose service can start
+    soonest (travel, then wait for its window to open) among those that can
+    still be reached before their window closes. Visits that never become
+    reachable are left out and start the search dropped.
+    """
+    time_matrix = data["time_matrix"]
+    service_times = np.asarray(data["service_times"], dtype=np.int64)
+    num_nodes = len(time_matrix)
+    depot = data["depot"]
+    earliest = np.zeros(num_nodes, dtype=np.int64)
+    latest = np.full(num_nodes, data["horizon"], dtype=np.int64)
+    for node, tw in enumerate(data["time_windows"]):
+        if tw is not None:
+            earliest[node], latest[node] = tw.earliest, tw.latest
+
+    pending = np.ones(num_nodes, dtype=bool)
+    pending[depot] = False
+    node, clock = depot, int(earliest[depot])
+    order: list[int] = []
+    while True:
+        arrival = clock + service_times[node] + time_matrix[node]
+        candidates = pending & (arrival <= latest)
+        if not candidates.any():
+            return order
+        start = np.where(candidates, np.maximum(arrival, earliest), np.iinfo(np.int64).max)
+        node = int(start.argmin())
+        clock = int(start[node])
+        pending[node] = False
+        order.append(node)
+
+
+def _restrict_arcs(
+    routing: pywrapcp.RoutingModel,
+    manager: pywrapcp.RoutingIndexManager,
+    successors: list[set[int]],
+    depot: int,
+) -> None:
+    """Shrink every visit's NextVar domain to its allowed successors.
+
+    The vehicle end stays reachable from every visit, and a visit may point
+    to itself, which is how OR-Tools represents a dropped (inactive) node.
+    """
+    end_index = routing.End(0)
+    for node, allowed in enumerate(successors):
+        if node == depot:
+            continue
+        index = manager.NodeToIndex(node)
+        values = [manager.NodeToIndex(successor) for successor in allowed]
+        routing.NextVar(index).SetValues(values + [index, end_index])
+
+
+def _search_parameters(
+    time_limit_seconds: int, search_config: SearchConfig = DEFAULT_SEARCH_CONFIG
+) -> routing_parameters_pb2.RoutingSearchParameters:
+    """Search strategy; by default a cheapest-arc start and guided local search."""
+    first_solution, metaheuristic = search_config
     search_params = pywrapcp.DefaultRoutingSearchParameters()
-    search_params.first_solution_strategy = (
-        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    search_params.first_solution_strategy = getattr(
+        routing_enums_pb2.FirstSolutionStrategy, first_solution
     )
-    search_params.local_search_metaheuristic = (
-        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    search_params.local_search_metaheuristic = getattr(
+        routing_enums_pb2.LocalSearchMetaheuristic, metaheuristic
     )
-    search_params.time_limit.FromSeconds(request.solver_time_limit_seconds)
+    search_params.time_limit.FromSeconds(time_limit_seconds)
+    return search_params
+
+
+def _initial_assignment(
+    routing: pywrapcp.RoutingModel,
+    initial_route: list[int] | None,
+) -> pywrapcp.Assignment | None:
+    """Turn a previous visit order into a starting assignment, if usable.
+
+    The model must already be closed. Returns None when there is no initial
+    route or when OR-Tools rejects it (e.g. it violates a hard constraint), in
+    which case the caller falls back to a cold first-solution search.
+    """
+    if not initial_route:
+        return None
+    # ignore_inactive_indices=True: nodes left out of the route start dropped
+    assignment = routing.ReadAssignmentFromRoutes([list(initial_route)], True)
+    if assignment is None:
+        logger.warning("initial_route is not a feasible assignment; solving from scratch")
+    return assignment
+
+
+def _extract_route(
+    routing: pywrapcp.RoutingModel,
+    manager: pywrapcp.RoutingIndexManager,
+    time_dimension: pywrapcp.RoutingDimension,
+    dist_matrix: list[list[int]],
+    next_value: Callable,
+    cumul_value: Callable,
+    vehicle: int = 0,
+) -> tuple[list[int], list[int], int, int]:
+    """Walk one vehicle's route: (visit_order, arrivals, distance, duration).
+
+    ``next_value``/``cumul_value`` read a variable's value, from a final
+    Assignment or from the live search state inside a solution callback.
+    """
+    visit_order: list[int] = []
+    estimated_arrivals: list[int] = []
+    total_distance = 0
+
+    start = index = routing.Start(vehicle)
+    while not routing.IsEnd(index):
+        node = manager.IndexToNode(index)
+        next_index = next_value(routing.NextVar(index))
+
+        if index != start:
+            visit_order.append(node)
+            estimated_arrivals.append(cumul_value(time_dimension.CumulVar(index)))
+
+        # Count every leg, including the final one. For a round trip the last
+        # leg is last_stop → depot; for an open route it is last_stop → dummy
+        # (cost 0), so the return distance is naturally excluded.
+        total_distance += dist_matrix[node][manager.IndexToNode(next_index)]
+        index = next_index
+
+    # Total duration from the time dimension (includes the return leg for a
+    # round trip; ends at the last stop for an open route).
+    total_duration = cumul_value(time_dimension.CumulVar(routing.End(vehicle)))
+    return visit_order, estimated_arrivals, total_distance, total_duration
+
+
+class _SearchWatch:
+    """At-solution hook: progress reports, cancellation and adaptive stopping.
+
+    OR-Tools only calls back when the search accepts a solution, so Python is
+    entered per solution rather than per arc; ``on_solution`` only sees
+    improvements. Accepted solutions can be far apart on a large model, so
+    ``should_stop`` is also polled from a search limit, at most every
+    ``STOP_POLL_SECONDS``. OR-Tools builds the first solution without
+    checking limits, so a stop during that phase lands once the first route
+    exists. With a ``stall_seconds`` window, the search ends once no
+    improvement of at least ``min_improvement_ratio`` has been seen for that
+    long.
+    """
+
+    def __init__(
+        self,
+        routing: pywrapcp.RoutingModel,
+        manager: pywrapcp.RoutingIndexManager,
+        time_dimension: pywrapcp.RoutingDimension,
+        dist_matrix: list[list[int]],
+        num_nodes: int,
+        on_solution: SolutionCallback | None,
+        should_stop: Callable[[], bool] | None,
+        stall_seconds: float | None,
+        min_improvement_ratio: float,
+    ):
+        self.routing = routing
+        self.manager = manager
+        self.time_dimension = time_dimension
+        self.dist_matrix = dist_matrix
+        self.num_nodes = num_nodes
+        self.on_solution = on_solution
+        self.should_stop = should_stop
+        self.stall_seconds = stall_seconds
+        self.min_improvement_ratio = min_improvement_ratio
+
+        self.started = time.perf_counter()
+        self.first_at: float | None = None
+        self.best: int | None = None
+        self.best_at = 0.0
+        # Objective/time of the last improvement large enough to reset the stall clock
+        self.anchor: int | None = None
+        self.anchor_at = 0.0
+        self.stop_reason: str | None = None
+        routing.AddAtSolutionCallback(self)
+        if should_stop is not None:
+            self.next_poll = 0.0
+            # Referenced here so Python keeps the limit alive for the search
+            self.stop_limit = routing.solver().CustomLimit(self._poll_stop)
+            routing.AddSearchMonitor(self.stop_limit)
+
+    def start(self) -> None:
+        """Reset the clock; call right before the search begins."""
+        self.started = time.perf_counter()
+
+    def _poll_stop(self) -> bool:
+        # Called by OR-Tools on every limit check, far more often than needed
+        now = time.perf_counter()
+        if now < self.next_poll:
+            return False
+        self.next_poll = now + STOP_POLL_SECONDS
+        if self.should_stop():
+            self.stop_reason = "CANCELLED"
+            return True
+        return False
+
+    def __call__(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        if self.first_at is None:
+            self.first_at = elapsed
+        if self.should_stop is not None and self.should_stop():
+            self._finish("CANCELLED")
+            return
+
+        objective = self.routing.CostVar().Value()
+        if self.best is None or objective < self.best:
+            self.best = objective
+            self.best_at = elapsed
+            if self.anchor is None or objective < self.anchor * (1 - self.min_improvement_ratio):
+                self.anchor = objective
+                self.anchor_at = elapsed
+            if self.on_solution is not None and self.on_solution(
+                self._current_result(), objective, elapsed
+            ):
+                self._finish("CANCELLED")
+                return
+
+        if self.stall_seconds is not None and elapsed - self.anchor_at >= self.stall_seconds:
+            self._finish("NO_IMPROVEMENT")
+
+    def _finish(self, reason: str) -> None:
+        self.stop_reason = reason
+        self.routing.solver().FinishCurrentSearch()
+
+    def _current_result(self) -> OptimizeResponse:
+        # Cumuls are still ranges mid-search; the earliest value is the ETA.
+        visit_order, arrivals, distance, duration = _extract_route(
+            self.routing, self.manager, self.time_dimension, self.dist_matrix,
+            lambda var: var.Value(), lambda var: var.Min(),
+        )
+        dropped = sorted(set(range(1, self.num_nodes)) - set(visit_order))
+        return OptimizeResponse(
+            visit_order=visit_order,
+            total_distance_meters=distance,
+            total_duration_seconds=duration,
+            estimated_arrivals=arrivals,
+            feasible=not dropped,
+            dropped_visits=dropped,
+            solver_status="FEASIBLE",
+        )
+
+
+def solve(
+    request: OptimizeRequest,
+    transit_engine: str = DEFAULT_TRANSIT_ENGINE,
+    on_solution: SolutionCallback | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    search_config: SearchConfig = DEFAULT_SEARCH_CONFIG,
+    exact_max_nodes: int | None = None,
+) -> OptimizeResponse:
+    """Run the VRP solver and return the optimized route.
+
+    ``on_solution(result, objective, elapsed_seconds)`` is called for every
+    improving solution found during the search. The search ends early, with
+    the best solution so far, when ``on_solution`` returns True or
+    ``should_stop()`` does; the latter is polled every ``STOP_POLL_SECONDS``
+    once the first solution is built. Every response carries a
+    ``SolverTimings`` breakdown; the API strips it unless the request asked
+    for it.
+
+    Models of up to ``exact_max_nodes`` nodes (default ``EXACT_MAX_NODES``)
+    skip OR-Tools: ``app.exact`` returns a proven optimum, reported once to
+    ``on_solution``. Warm starts and neighbor lists don't apply there.
+    """
+    started = time.perf_counter()
+    data = _build_data_model(request)
+    data_model_seconds = time.perf_counter() - started
+    num_nodes = len(data["distance_matrix"])
+    open_route = not request.return_to_depot
+
+    # Edge case: 0 or 1 visits (just the depot, or depot + 1 stop)
+    if num_nodes <= 1:
+        return OptimizeResponse(
+            visit_order=[],
+            total_distance_meters=0,
+            total_duration_seconds=0,
+            estimated_arrivals=[],
+            feasible=True,
+            dropped_visits=[],
+            solver_status="OPTIMAL",
+            stop_reason="COMPLETED",
+            time_to_best_seconds=0.0,
+            timings=_trivial_timings(started, data_model_seconds),
+        )
+    if num_nodes == 2:
+        # Open route ends at the stop; round trip also pays the return leg.
+        out_dist = int(data["distance_matrix"][0, 1])
+        out_time = int(data["time_matrix"][0, 1])
+        back_dist = 0 if open_route else int(data["distance_matrix"][1, 0])
+        back_time = 0 if open_route else int(data["time_matrix"][1, 0])
+        return OptimizeResponse(
+            visit_order=[1],
+            total_distance_meters=out_dist + back_dist,
+            total_duration_seconds=out_time + data["service_times"][1] + back_time,
+            estimated_arrivals=[out_time],
+            feasible=True,
+            dropped_visits=[],
+            solver_status="OPTIMAL",
+            stop_reason="COMPLETED",
+            time_to_best_seconds=0.0,
+            timings=_trivial_timings(started, data_model_seconds),
+        )
+
+    if exact_max_nodes is None:
+        exact_max_nodes = EXACT_MAX_NODES
+    if num_nodes <= exact_max_nodes:
+        # app.exact imports this module, so it can't be imported at the top
+        from .exact import exact_response
+
+        result = exact_response(data, open_route, started, data_model_seconds)
+        logger.info(
+            f"Solved exactly: {num_nodes} nodes, distance={result.total_distance_meters}m, "
+            f"dropped={len(result.dropped_visits)} in {result.timings.total_seconds:.4f}s"
+        )
+        if on_solution is not None:
+            objective = result.total_distance_meters + DROP_PENALTY * len(result.dropped_visits)
+            on_solution(result, objective, result.timings.total_seconds)
+        return result
+
+    build_started = time.perf_counter()
+    dist_matrix, transit_matrix, dummy = _routing_matrices(data, open_route)
+    manager, routing, time_dimension = _build_routing_model(
+        data, dist_matrix, transit_matrix, dummy, transit_engine
+    )
+
+    # ── Solver parameters ────────────────────────────────
+    time_limit = request.solver_time_limit_seconds or default_time_limit(num_nodes)
+    stall_seconds = None
+    if request.adaptive_stopping:
+        stall_seconds = request.no_improvement_seconds or default_stall_seconds(num_nodes)
+    search_params = _search_parameters(time_limit, search_config)
+    initial_route = request.initial_route
+    if request.neighbors:
+        # With most arcs gone, a path-building first solution dead-ends and
+        # drops whatever is left; start local search from a greedy route instead.
+        initial_route = initial_route or _greedy_route(data)
+        successors = _sparse_successors(data, request.neighbors, initial_route)
+        _restrict_arcs(routing, manager, successors, data["depot"])
 
     # ── Solve ────────────────────────────────────────────
     logger.info(
         f"Solving VRP: {num_nodes} nodes, {data['num_vehicles']} vehicle(s), "
-        f"time_limit={request.solver_time_limit_seconds}s"
+        f"time_limit={time_limit}s, stall={stall_seconds}s, "
+        f"warm_start={bool(request.initial_route)}, neighbors={request.neighbors}, "
+        f"search={'/'.join(search_config)}"
+    )
+    watch = _SearchWatch(
+        routing, manager, time_dimension, dist_matrix, num_nodes,
+        on_solution, should_stop, stall_seconds, request.min_improvement_ratio,
     )
-    solution = routing.SolveWithParameters(search_params)
+    routing.CloseModelWithParameters(search_params)
+    initial = _initial_assignment(routing, initial_route)
+    model_build_seconds = time.perf_counter() - build_started
+
+    watch.start()
+    if initial is not None:
+        solution = routing.SolveFromAssignmentWithParameters(initial, search_params)
+    else:
+        solution = routing.SolveWithParameters(search_params)
+    elapsed = time.perf_counter() - watch.started
+
+    stop_reason = watch.stop_reason
+    if stop_reason is None:
+        # OR-Tools returned on its own: either the clock ran out or the search
+        # had nothing left to explore.
+        stop_reason = "TIME_LIMIT" if elapsed >= time_limit * 0.99 else "COMPLETED"
 
     if not solution:
         status = routing.status()
@@ -230,46 +717,26 @@ def solve(request: OptimizeRequest) -> OptimizeResponse:
             feasible=False,
             dropped_visits=list(range(1, num_nodes)),
             solver_status="NO_SOLUTION",
+            stop_reason=stop_reason,
+            search_config="/".join(search_config),
+            timings=SolverTimings(
+                data_model_seconds=round(data_model_seconds, 6),
+                model_build_seconds=round(model_build_seconds, 6),
+                search_seconds=round(elapsed, 6),
+                extraction_seconds=0.0,
+                total_seconds=round(time.perf_counter() - started, 6),
+            ),
         )
 
     # ── Extract solution ─────────────────────────────────
-    visit_order: list[int] = []
-    estimated_arrivals: list[int] = []
-    dropped_visits: list[int] = []
-    total_distance = 0
-    total_duration = 0
-
-    # Collect visited nodes
-    index = routing.Start(0)
-    while not routing.IsEnd(index):
-        node = manager.IndexToNode(index)
-        next_index = solution.Value(routing.NextVar(index))
-
-        if node != data["depot"]:
-            visit_order.append(node)
-            arrival_time = solution.Value(time_dimension.CumulVar(index))
-            estimated_arrivals.append(arrival_time)
-
-        # Count every leg, including the final one. For a round trip the last
-        # leg is last_stop → depot; for an open route it is last_stop → dummy
-        # (cost 0), so the return distance is naturally excluded.
-        from_node = manager.IndexToNode(index)
-        to_node = manager.IndexToNode(next_index)
-        total_distance += dist_matrix[from_node][to_node]
-
-        index = next_index
-
-    # Total duration from the time dimension (includes the return leg for a
-    # round trip; ends at the last stop for an open route).
-    end_idx = routing.End(0)
-    total_duration = solution.Value(time_dimension.CumulVar(end_idx))
-
-    # Find dropped visits
-    all_visit_nodes = set(range(1, num_nodes))
-    visited_nodes = set(visit_order)
-    dropped_visits = sorted(all_visit_nodes - visited_nodes)
-
+    extract_started = time.perf_counter()
+    visit_order, estimated_arrivals, total_distance, total_duration = _extract_route(
+        routing, manager, time_dimension, dist_matrix, solution.Value, solution.Value,
+    )
+    dropped_visits = sorted(set(range(1, num_nodes)) - set(visit_order))
     feasible = len(dropped_visits) == 0
+    extraction_seconds = time.perf_counter() - extract_started
+    first_solution = watch.first_at if watch.first_at is not None else elapsed
 
     # Determine solver status
     status = routing.status()
@@ -283,7 +750,8 @@ def solve(request: OptimizeRequest) -> OptimizeResponse:
     logger.info(
         f"Solution found: {len(visit_order)} visits, "
         f"distance={total_distance}m, duration={total_duration}s, "
-        f"dropped={len(dropped_visits)}, status={solver_status}"
+        f"dropped={len(dropped_visits)}, status={solver_status}, "
+        f"stop={stop_reason} after {elapsed:.3f}s (best at {watch.best_at:.3f}s)"
     )
 
     return OptimizeResponse(
@@ -294,4 +762,15 @@ def solve(request: OptimizeRequest) -> OptimizeResponse:
         feasible=feasible,
         dropped_visits=dropped_visits,
         solver_status=solver_status,
+        stop_reason=stop_reason,
+        time_to_best_seconds=round(watch.best_at, 3),
+        search_config="/".join(search_config),
+        timings=SolverTimings(
+            data_model_seconds=round(data_model_seconds, 6),
+            model_build_seconds=round(model_build_seconds, 6),
+            first_solution_seconds=round(first_solution, 6),
+            search_seconds=round(elapsed - first_solution, 6),
+            extraction_seconds=round(extraction_seconds, 6),
+            total_seconds=round(time.perf_counter() - started, 6),
+        ),
     )
@@ -0,0 +1,53 @@
+"""Latency and quality of adaptive stopping vs. the fixed time limit.
+
+Each instance is solved twice under the same cap: once running the full
+``solver_time_limit_seconds`` and once with adaptive stopping.
+
+    python -m benchmarks.adaptive_stopping --sizes 8 15 50 150 --seeds 3 --time-limit 5
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from app.solver import solve
+
+from .instances import euclidean_instance
+
+
+def _timed(request) -> tuple[float, int, str]:
+    started = time.perf_counter()
+    # Both runs go through OR-Tools, even at sizes exact search would take
+    result = solve(request, exact_max_nodes=0)
+    return time.perf_counter() - started, result.total_distance_meters, result.stop_reason
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 15, 50, 150])
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--time-limit", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        fixed_times, adaptive_times, cost_deltas = [], [], []
+        for seed in range(args.seeds):
+            request = euclidean_instance(size, seed, args.time_limit)
+            fixed_time, fixed_cost, _ = _timed(
+                request.model_copy(update={"adaptive_stopping": False})
+            )
+            adaptive_time, adaptive_cost, _ = _timed(request)
+            fixed_times.append(fixed_time)
+            adaptive_times.append(adaptive_time)
+            cost_deltas.append((adaptive_cost - fixed_cost) / fixed_cost * 100)
+        print(json.dumps({
+            "visits": size,
+            "fixed_p50_seconds": round(statistics.median(fixed_times), 3),
+            "adaptive_p50_seconds": round(statistics.median(adaptive_times), 3),
+            "mean_cost_delta_percent": round(statistics.mean(cost_deltas), 2),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Interactive solve latency behind a planning backlog, FIFO vs. priority admission.
+
+A burst of planning solves fills the pool, then small interactive solves
+arrive one at a time. ``fifo`` submits everything as one class, as the pool
+did before admission control; ``priority`` tags each request with its
+class, with planning limited to all but one worker as the service
+defaults to. Reports interactive queue wait and end-to-end latency.
+
+    python -m benchmarks.admission --workers 2 --planning 6 --interactive 4
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from app.pool import ClassLimits, SolverPool
+from app.solver import solve
+
+from .instances import euclidean_instance
+
+
+async def _scenario(pool: SolverPool, planning, interactive, prioritize: bool) -> tuple[list, list]:
+    background = [
+        asyncio.wrap_future(pool.submit(
+            solve, request,
+            priority="planning" if prioritize else "interactive",
+            cost_seconds=request.solver_time_limit_seconds,
+        ))
+        for request in planning
+    ]
+    latencies, waits = [], []
+    for request in interactive:
+        started = time.perf_counter()
+        future = pool.submit(solve, request, priority="interactive", cost_seconds=1)
+        await asyncio.wrap_future(future)
+        latencies.append(time.perf_counter() - started)
+        waits.append(future.queue_wait_seconds)
+    await asyncio.gather(*background)
+    return latencies, waits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--planning", type=int, default=6, help="Planning solves in the backlog")
+    parser.add_argument("--planning-size", type=int, default=150)
+    parser.add_argument("--planning-time-limit", type=int, default=5)
+    parser.add_argument("--interactive", type=int, default=4)
+    parser.add_argument("--interactive-size", type=int, default=20)
+    args = parser.parse_args()
+
+    planning = [
+        euclidean_instance(args.planning_size, seed, args.planning_time_limit)
+        for seed in range(args.planning)
+    ]
+    interactive = [
+        euclidean_instance(args.interactive_size, seed, time_limit_seconds=1)
+        for seed in range(args.interactive)
+    ]
+    for mode in ("fifo", "priority"):
+        limits = {}
+        if mode == "priority":
+            limits["planning"] = ClassLimits(max(1, args.workers - 1), args.planning)
+        pool = SolverPool(args.workers, limits)
+        pool.start()
+        try:
+            asyncio.run(pool.warm())
+            latencies, waits = asyncio.run(
+                _scenario(pool, planning, interactive, mode == "priority")
+            )
+        finally:
+            pool.shutdown()
+        print(json.dumps({
+            "mode": mode,
+            "workers": args.workers,
+            "planning_backlog": args.planning,
+            "interactive_mean_ms": round(float(np.mean(latencies)) * 1000),
+            "interactive_p50_ms": round(float(np.percentile(latencies, 50)) * 1000),
+            "interactive_max_ms": round(max(latencies) * 1000),
+            "interactive_mean_wait_ms": round(float(np.mean(waits)) * 1000),
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
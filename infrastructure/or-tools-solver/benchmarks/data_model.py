@@ -0,0 +1,69 @@
+"""Cost of turning a request into a routing model: time and peak memory.
+
+Each size runs in a fresh process so peak RSS is per request. Reported:
+the data-model and model-build phases from ``OptimizeResponse.timings``,
+the peak of Python allocations during ``solve()`` (tracemalloc, excludes
+OR-Tools' C++ memory), and the process's peak RSS growth over the solve.
+
+    python -m benchmarks.data_model --sizes 200 500 1000 --transport json
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import tracemalloc
+
+from app.codec import decode_request, encode_request
+from app.solver import solve
+
+from .instances import euclidean_instance
+
+
+def _request(size: int, transport: str):
+    request = euclidean_instance(size, seed=0, time_limit_seconds=1, return_to_depot=False)
+    request = request.model_copy(update={"adaptive_stopping": False, "include_timings": True})
+    if transport == "binary":
+        request = decode_request(encode_request(request))
+    return request
+
+
+def _timed(size: int, transport: str) -> dict:
+    request = _request(size, transport)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result = solve(request)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "data_model_ms": round(result.timings.data_model_seconds * 1000, 1),
+        "model_build_ms": round(result.timings.model_build_seconds * 1000, 1),
+        "rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+    }
+
+
+def _traced(size: int, transport: str) -> dict:
+    # Separate run: tracemalloc slows allocation-heavy code several-fold
+    request = _request(size, transport)
+    tracemalloc.start()
+    solve(request)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"python_peak_mb": round(python_peak / 2**20, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 500, 1000])
+    parser.add_argument("--transport", choices=["json", "binary"], default="json")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        row = {"nodes": size + 1, "transport": args.transport}
+        for measure in (_timed, _traced):
+            with context.Pool(1) as pool:
+                row.update(pool.apply(measure, (size, args.transport)))
+        print(json.dumps(row), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Cluster-first decomposition vs. one routing model on thousand-stop routes.
+
+The single model gets ``--time-limit`` seconds; the decomposed solve passes
+the same limit to every cluster and runs the clusters on a pool of
+``--workers`` processes, so compare the wall times as well as the costs.
+
+    python -m benchmarks.decomposition --size 1000 --cluster-size 150 --workers 4 --time-limit 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from app.decompose import solve_decomposed
+from app.pool import SolverPool
+from app.solver import solve
+
+from .instances import InstanceSpec, make_instance
+
+
+def _row(name: str, mode: str, started: float, result) -> dict:
+    return {
+        "instance": name,
+        "mode": mode,
+        "wall_seconds": round(time.perf_counter() - started, 2),
+        "cost": result.total_distance_meters,
+        "dropped_visits": len(result.dropped_visits),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--cluster-size", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--time-limit", type=int, default=20)
+    parser.add_argument("--layouts", nargs="+", default=["uniform", "clustered"])
+    parser.add_argument("--windows", nargs="+", default=["none", "loose", "tight"])
+    args = parser.parse_args()
+
+    pool = SolverPool(args.workers)
+    pool.start()
+    try:
+        for layout in args.layouts:
+            for windows in args.windows:
+                spec = InstanceSpec(layout, windows, "round", args.size)
+                request = make_instance(spec, args.time_limit)
+
+                started = time.perf_counter()
+                single = asyncio.run(pool.run(solve, request))
+                print(json.dumps(_row(spec.name, "single", started, single)), flush=True)
+
+                started = time.perf_counter()
+                decomposed = asyncio.run(solve_decomposed(
+                    request.model_copy(update={"cluster_size": args.cluster_size}),
+                    pool.run,
+                    args.workers,
+                ))
+                print(json.dumps(_row(spec.name, "decomposed", started, decomposed)), flush=True)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Fixed-order scoring: vectorized ``evaluate()`` vs. a per-order Python loop.
+
+Scores ``--candidates`` random orders of every visit. The loop baseline walks
+each order stop by stop (``app.decompose._schedule``), which is what scoring
+without the array formulation costs.
+
+    python -m benchmarks.evaluate --sizes 50 100 --candidates 1000 5000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from app.decompose import _schedule
+from app.evaluate import evaluate, score_orders
+from app.models import EvaluateRequest
+from app.solver import _build_data_model
+
+from .instances import InstanceSpec, make_instance
+
+
+def _best_of(fn, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        base = make_instance(InstanceSpec("uniform", "loose", "round", size), time_limit_seconds=1)
+        for count in args.candidates:
+            orders = [rng.sample(range(1, size + 1), size) for _ in range(count)]
+            request = EvaluateRequest(**dict(base), orders=orders, include_arrivals=False)
+            data = _build_data_model(request)
+            print(json.dumps({
+                "visits": size,
+                "candidates": count,
+                "loop_ms": _best_of(lambda: [_schedule(data, order, False) for order in orders]),
+                "score_orders_ms": _best_of(lambda: score_orders(data, orders, False)),
+                "evaluate_ms": _best_of(lambda: evaluate(request)),
+            }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
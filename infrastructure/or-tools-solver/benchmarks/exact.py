@@ -0,0 +1,64 @@
+"""Small routes: exact dynamic programming vs. the OR-Tools search.
+
+Solves the suite's instances (uniform/clustered, no/loose/tight windows,
+round/open) at driver-route sizes both ways and reports median wall time
+and how often each side is strictly cheaper, by the routing objective
+(distance plus the drop penalty).
+
+    python -m benchmarks.exact --sizes 3 6 9 12 --seeds 3
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from app.solver import DROP_PENALTY, solve
+
+from .instances import make_instance, suite_specs
+
+
+def _run(request, exact_max_nodes: int) -> tuple[float, int, str]:
+    started = time.perf_counter()
+    result = solve(request, exact_max_nodes=exact_max_nodes)
+    objective = result.total_distance_meters + DROP_PENALTY * len(result.dropped_visits)
+    return time.perf_counter() - started, objective, result.solver_status
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 6, 9, 12],
+                        help="Visits per route")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--time-limit", type=int, default=None,
+                        help="OR-Tools budget; default scales with the node count")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        exact_ms, search_ms = [], []
+        exact_better = search_better = search_optimal = 0
+        specs = suite_specs(sizes=(size,), seeds=range(args.seeds))
+        for spec in specs:
+            request = make_instance(spec, args.time_limit)
+            seconds, exact_cost, _ = _run(request, exact_max_nodes=size + 1)
+            exact_ms.append(seconds * 1000)
+            seconds, search_cost, status = _run(request, exact_max_nodes=0)
+            search_ms.append(seconds * 1000)
+            exact_better += exact_cost < search_cost
+            search_better += search_cost < exact_cost
+            search_optimal += status == "OPTIMAL"
+
+        print(json.dumps({
+            "visits": size,
+            "instances": len(specs),
+            "exact_ms_median": round(statistics.median(exact_ms), 2),
+            "ortools_ms_median": round(statistics.median(search_ms), 1),
+            "speedup": round(statistics.median(search_ms) / statistics.median(exact_ms), 1),
+            "exact_cheaper": exact_better,
+            "ortools_cheaper": search_better,
+            "ortools_reported_optimal": search_optimal,
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Fleet solve vs. assigning visits by hand and solving each driver separately.
+
+Drivers start from (and return to) their own homes, with a shift length and
+a stop capacity. The per-driver baseline does what the tracking service
+does today: every visit goes to the nearest driver with room left, then
+each route is optimized on its own. The fleet solve gets the same total
+search budget in one model.
+
+    python -m benchmarks.fleet --drivers 3 5 --visits 60 120 --time-limit 2
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+
+from app.fleet import solve_fleet
+from app.models import FleetOptimizeRequest, OptimizeRequest, Vehicle
+from app.solver import solve
+
+from .instances import CITY_SIZE_METERS, SERVICE_TIME_SECONDS, InstanceSpec, _matrices, _points
+
+
+def _fleet_instance(drivers: int, visits: int, shift_hours: float, seed: int) -> FleetOptimizeRequest:
+    """Driver homes scattered over the city, clustered visits, homes first in the matrix."""
+    rng = random.Random(f"fleet/{drivers}/{visits}/{seed}")
+    homes = [
+        (rng.uniform(0, CITY_SIZE_METERS), rng.uniform(0, CITY_SIZE_METERS))
+        for _ in range(drivers)
+    ]
+    stops = _points(InstanceSpec("clustered", "none", "round", visits, seed), rng)[1:]
+    distance_matrix, time_matrix = _matrices(homes + stops)
+    capacity = math.ceil(visits / drivers * 1.25)
+    return FleetOptimizeRequest(
+        distance_matrix=distance_matrix,
+        time_matrix=time_matrix,
+        vehicles=[
+            Vehicle(start=k, end=k, max_duration=int(shift_hours * 3600), capacity=capacity)
+            for k in range(drivers)
+        ],
+        service_times=[0] * drivers + [SERVICE_TIME_SECONDS] * visits,
+    )
+
+
+def _assign_by_hand(request: FleetOptimizeRequest) -> list[list[int]]:
+    """Each visit to the nearest driver home that still has capacity."""
+    drivers = len(request.vehicles)
+    assigned: list[list[int]] = [[] for _ in range(drivers)]
+    for node in range(drivers, len(request.time_matrix)):
+        open_drivers = [
+            k for k in range(drivers) if len(assigned[k]) < request.vehicles[k].capacity
+        ]
+        nearest = min(open_drivers, key=lambda k: request.time_matrix[k][node])
+        assigned[nearest].append(node)
+    return assigned
+
+
+def _solve_per_driver(request: FleetOptimizeRequest, time_limit: int) -> tuple[int, int]:
+    """(total distance, dropped visits) over one single-vehicle solve per driver."""
+    distance = dropped = 0
+    for k, nodes in enumerate(_assign_by_hand(request)):
+        index = [k] + nodes
+        result = solve(OptimizeRequest(
+            distance_matrix=[[request.distance_matrix[i][j] for j in index] for i in index],
+            time_matrix=[[request.time_matrix[i][j] for j in index] for i in index],
+            service_times=[request.service_times[i] for i in index],
+            max_route_duration=request.vehicles[k].max_duration,
+            solver_time_limit_seconds=time_limit,
+        ))
+        distance += result.total_distance_meters
+        dropped += len(result.dropped_visits)
+    return distance, dropped
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--visits", type=int, nargs="+", default=[60, 120])
+    parser.add_argument("--shift-hours", type=float, default=8.0)
+    parser.add_argument("--time-limit", type=int, default=2, help="Seconds per driver solve")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for drivers in args.drivers:
+        for visits in args.visits:
+            request = _fleet_instance(drivers, visits, args.shift_hours, args.seed)
+
+            started = time.perf_counter()
+            per_driver_distance, per_driver_dropped = _solve_per_driver(request, args.time_limit)
+            per_driver_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            fleet = solve_fleet(request.model_copy(
+                update={"solver_time_limit_seconds": args.time_limit * drivers}
+            ))
+            fleet_seconds = time.perf_counter() - started
+
+            print(json.dumps({
+                "drivers": drivers,
+                "visits": visits,
+                "per_driver_distance_m": per_driver_distance,
+                "fleet_distance_m": fleet.total_distance_meters,
+                "distance_saving_pct": round(
+                    100 * (1 - fleet.total_distance_meters / per_driver_distance), 1
+                ),
+                "per_driver_dropped": per_driver_dropped,
+                "fleet_dropped": len(fleet.dropped_visits),
+                "per_driver_calls": drivers,
+                "fleet_calls": 1,
+                "per_driver_seconds": round(per_driver_seconds, 2),
+                "fleet_seconds": round(fleet_seconds, 2),
+            }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Cheapest insertion vs. re-solving every driver's route for one new order.
+
+Each driver's current route is a solved route with one visit taken out;
+that visit is the new order (a different one per driver). Insertion scores
+all drivers in one ``insert_visits`` call. The baseline is a warm-started
+``solve()`` per driver. Both report the distance the new order adds.
+
+    python -m benchmarks.insertion --drivers 10 --stops 30 80
+"""
+
+import argparse
+import json
+import time
+
+from app.insertion import insert_visits
+from app.models import InsertionRequest, RouteInsertionRequest
+from app.solver import solve
+
+from .instances import InstanceSpec, make_instance
+
+
+def _driver(stops: int, seed: int) -> RouteInsertionRequest:
+    """A solved route of ``stops`` visits with one more visit pending."""
+    spec = InstanceSpec("uniform", "loose", "round", stops + 1, seed)
+    request = make_instance(spec, time_limit_seconds=2)
+    solved = solve(request)
+    new_visit = solved.visit_order[seed % len(solved.visit_order)]
+    current = [node for node in solved.visit_order if node != new_visit]
+    return RouteInsertionRequest(**dict(request), visit_order=current, new_visits=[new_visit])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=10)
+    parser.add_argument("--stops", type=int, nargs="+", default=[30, 80])
+    args = parser.parse_args()
+
+    for stops in args.stops:
+        routes = [_driver(stops, seed) for seed in range(args.drivers)]
+
+        started = time.perf_counter()
+        inserted = insert_visits(InsertionRequest(routes=routes))
+        insertion_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        resolved = [
+            solve(route.model_copy(update={"initial_route": route.visit_order}))
+            for route in routes
+        ]
+        resolve_ms = (time.perf_counter() - started) * 1000
+
+        insert_added = [result.distance_delta for result in inserted.results]
+        # Current route length: the updated one minus what insertion added
+        resolve_added = [
+            result.total_distance_meters - (update.total_distance_meters - update.distance_delta)
+            for result, update in zip(resolved, inserted.results)
+        ]
+        print(json.dumps({
+            "drivers": args.drivers,
+            "stops": stops,
+            "insertion_ms": round(insertion_ms, 1),
+            "resolve_ms": round(resolve_ms, 1),
+            "insertion_added_m": round(sum(insert_added) / len(insert_added)),
+            "resolve_added_m": round(sum(resolve_added) / len(resolve_added)),
+            "best_route": inserted.best_route,
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
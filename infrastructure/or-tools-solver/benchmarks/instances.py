@@ -0,0 +1,168 @@
+"""Seeded instance generators for solver benchmarks."""
+
+import math
+import random
+from dataclasses import dataclass
+
+from app.models import OptimizeRequest, TimeWindow
+
+# Stops are scattered over a square city of this side length (meters)
+CITY_SIZE_METERS = 20_000
+
+# Straight-line distance → road distance, and average urban driving speed
+ROAD_FACTOR = 1.3
+SPEED_METERS_PER_SECOND = 8.3  # ~30 km/h
+
+
+def _matrices(points: list[tuple[float, float]]) -> tuple[list[list[int]], list[list[int]]]:
+    """Distance (meters) and time (seconds) matrices for planar points."""
+    distance_matrix = []
+    time_matrix = []
+    for ax, ay in points:
+        dist_row = []
+        time_row = []
+        for bx, by in points:
+            meters = int(math.hypot(ax - bx, ay - by) * ROAD_FACTOR)
+            dist_row.append(meters)
+            time_row.append(int(meters / SPEED_METERS_PER_SECOND))
+        distance_matrix.append(dist_row)
+        time_matrix.append(time_row)
+    return distance_matrix, time_matrix
+
+
+def euclidean_instance(
+    num_visits: int,
+    seed: int = 0,
+    time_limit_seconds: int = 5,
+    return_to_depot: bool = True,
+) -> OptimizeRequest:
+    """Uniformly scattered visits with the depot in the city centre."""
+    rng = random.Random(seed)
+    points = [(CITY_SIZE_METERS / 2, CITY_SIZE_METERS / 2)] + [
+        (rng.uniform(0, CITY_SIZE_METERS), rng.uniform(0, CITY_SIZE_METERS))
+        for _ in range(num_visits)
+    ]
+    distance_matrix, time_matrix = _matrices(points)
+    return OptimizeRequest(
+        distance_matrix=distance_matrix,
+        time_matrix=time_matrix,
+        service_times=[0] + [300] * num_visits,
+        return_to_depot=return_to_depot,
+        solver_time_limit_seconds=time_limit_seconds,
+    )
+
+
+# ── Benchmark suite instances ────────────────────────────
+LAYOUTS = ("uniform", "clustered")
+WINDOWS = ("none", "loose", "tight")
+ROUTES = ("round", "open")
+SIZES = (10, 50, 200, 1000)
+
+SERVICE_TIME_SECONDS = 300
+
+# Width of each visit's time window around its reference arrival
+WINDOW_WIDTH_SECONDS = {"loose": 3 * 3600, "tight": 1800}
+
+# Clustered layout: one cluster per this many visits, points spread around it
+VISITS_PER_CLUSTER = 25
+CLUSTER_SPREAD_METERS = 800
+
+
+@dataclass(frozen=True)
+class InstanceSpec:
+    """Identifies one seeded benchmark instance."""
+
+    layout: str
+    windows: str
+    route: str
+    size: int
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.layout}-{self.windows}-{self.route}-n{self.size}-s{self.seed}"
+
+
+def suite_specs(
+    sizes=SIZES, layouts=LAYOUTS, windows=WINDOWS, routes=ROUTES, seeds=(0,)
+) -> list[InstanceSpec]:
+    """Cartesian product of the suite dimensions, smallest instances first."""
+    return [
+        InstanceSpec(layout, window, route, size, seed)
+        for size in sizes
+        for layout in layouts
+        for window in windows
+        for route in routes
+        for seed in seeds
+    ]
+
+
+def _points(spec: InstanceSpec, rng: random.Random) -> list[tuple[float, float]]:
+    depot = (CITY_SIZE_METERS / 2, CITY_SIZE_METERS / 2)
+    if spec.layout == "uniform":
+        visits = [
+            (rng.uniform(0, CITY_SIZE_METERS), rng.uniform(0, CITY_SIZE_METERS))
+            for _ in range(spec.size)
+        ]
+    elif spec.layout == "clustered":
+        centers = [
+            (rng.uniform(0, CITY_SIZE_METERS), rng.uniform(0, CITY_SIZE_METERS))
+            for _ in range(max(2, spec.size // VISITS_PER_CLUSTER))
+        ]
+        visits = []
+        for _ in range(spec.size):
+            cx, cy = rng.choice(centers)
+            visits.append((
+                min(max(rng.gauss(cx, CLUSTER_SPREAD_METERS), 0), CITY_SIZE_METERS),
+                min(max(rng.gauss(cy, CLUSTER_SPREAD_METERS), 0), CITY_SIZE_METERS),
+            ))
+    else:
+        raise ValueError(f"Unknown layout: {spec.layout}")
+    return [depot] + visits
+
+
+def _reference_arrivals(time_matrix: list[list[int]]) -> list[int]:
+    """Arrival time at each node along a nearest-neighbour tour from the depot.
+
+    Windows are placed around these arrivals, so every instance has at least
+    one schedule that meets all of them.
+    """
+    n = len(time_matrix)
+    arrivals = [0] * n
+    unvisited = set(range(1, n))
+    node, clock = 0, 0
+    while unvisited:
+        nxt = min(unvisited, key=lambda candidate: time_matrix[node][candidate])
+        clock += time_matrix[node][nxt] + (SERVICE_TIME_SECONDS if node else 0)
+        arrivals[nxt] = clock
+        unvisited.remove(nxt)
+        node = nxt
+    return arrivals
+
+
+def make_instance(spec: InstanceSpec, time_limit_seconds: int | None = None) -> OptimizeRequest:
+    """Build the request for ``spec``; identical specs give identical requests."""
+    if spec.windows not in WINDOWS:
+        raise ValueError(f"Unknown window mode: {spec.windows}")
+    if spec.route not in ROUTES:
+        raise ValueError(f"Unknown route type: {spec.route}")
+    rng = random.Random(f"{spec.layout}/{spec.size}/{spec.seed}")
+    distance_matrix, time_matrix = _matrices(_points(spec, rng))
+
+    time_windows = []
+    if spec.windows != "none":
+        width = WINDOW_WIDTH_SECONDS[spec.windows]
+        time_windows = [None]
+        for arrival in _reference_arrivals(time_matrix)[1:]:
+            # A window of exactly ``width`` seconds that contains the arrival
+            earliest = max(0, arrival - rng.randint(0, width))
+            time_windows.append(TimeWindow(earliest=earliest, latest=earliest + width))
+
+    return OptimizeRequest(
+        distance_matrix=distance_matrix,
+        time_matrix=time_matrix,
+        time_windows=time_windows,
+        service_times=[0] + [SERVICE_TIME_SECONDS] * spec.size,
+        return_to_depot=spec.route == "round",
+        solver_time_limit_seconds=time_limit_seconds,
+    )
@@ -0,0 +1,201 @@
+"""Load generator for a running solver service: throughput and latency percentiles.
+
+Sends ``/optimize`` requests of mixed size to ``--url``, either closed-loop
+(``--concurrency`` clients back to back) or open-loop at ``--rate`` requests
+per second with Poisson arrivals, capped at ``--concurrency`` in flight.
+Open-loop latency is measured from the scheduled arrival, so time spent
+waiting for a free client counts, as it would for a real caller.
+
+Reports one JSON line for all requests and one per size: throughput,
+p50/p95/p99 latency of successful requests, error and timeout rates, HTTP
+codes and solver statuses. Run the service with ``SOLVER_CACHE_SIZE=0`` to
+measure solves rather than cache hits.
+
+    python -m benchmarks.load_test --url http://localhost:5002 --sizes 10 30 80 \\
+        --weights 5 3 2 --concurrency 4 --rate 2 --duration 60
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from .instances import InstanceSpec, make_instance
+
+
+@dataclass(frozen=True)
+class Sample:
+    """Outcome of one request; times are ``time.perf_counter()`` values."""
+
+    size: int
+    scheduled: float
+    finished: float
+    # "ok", "error" or "timeout"
+    outcome: str
+    http_status: int | None = None
+    solver_status: str | None = None
+
+    @property
+    def latency(self) -> float:
+        return self.finished - self.scheduled
+
+
+def _bodies(sizes: list[int], variants: int, time_limit: int) -> dict[int, list[bytes]]:
+    """Pre-encoded requests per size, mixing layouts, window tightness and route type."""
+    bodies: dict[int, list[bytes]] = {}
+    for size in sizes:
+        bodies[size] = []
+        for seed in range(variants):
+            spec = InstanceSpec(
+                ("uniform", "clustered")[seed % 2],
+                ("loose", "tight")[seed // 2 % 2],
+                ("round", "open")[seed // 4 % 2],
+                size,
+                seed,
+            )
+            request = make_instance(spec, time_limit_seconds=time_limit)
+            bodies[size].append(request.model_dump_json().encode())
+    return bodies
+
+
+def _send(url: str, size: int, body: bytes, scheduled: float, timeout: float) -> Sample:
+    request = urllib.request.Request(
+        f"{url}/optimize", data=body, headers={"Content-Type": "application/json"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.loads(response.read())
+        return Sample(
+            size, scheduled, time.perf_counter(), "ok", response.status, payload.get("solver_status")
+        )
+    except urllib.error.HTTPError as exc:
+        return Sample(size, scheduled, time.perf_counter(), "error", exc.code)
+    except TimeoutError:
+        return Sample(size, scheduled, time.perf_counter(), "timeout")
+    except urllib.error.URLError as exc:
+        outcome = "timeout" if isinstance(exc.reason, TimeoutError) else "error"
+        return Sample(size, scheduled, time.perf_counter(), outcome)
+    except (OSError, ValueError):
+        # Dropped connections and unparsable bodies
+        return Sample(size, scheduled, time.perf_counter(), "error")
+
+
+def run_load(
+    url: str,
+    bodies: dict[int, list[bytes]],
+    weights: list[float],
+    concurrency: int,
+    rate: float,
+    duration: float,
+    timeout: float,
+    seed: int = 0,
+) -> tuple[list[Sample], float]:
+    """Drive the service for ``duration`` seconds; ``rate`` 0 means closed-loop.
+
+    Returns every sample plus the wall time until the last one finished.
+    """
+    rng = random.Random(seed)
+    sizes = list(bodies)
+    samples: list[Sample] = []
+    lock = threading.Lock()
+
+    def pick() -> tuple[int, bytes]:
+        with lock:
+            size = rng.choices(sizes, weights)[0]
+            return size, rng.choice(bodies[size])
+
+    def record(sample: Sample) -> None:
+        with lock:
+            samples.append(sample)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    if rate > 0:
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            arrival = started
+            while True:
+                arrival += rng.expovariate(rate)
+                if arrival >= deadline:
+                    break
+                time.sleep(max(0.0, arrival - time.perf_counter()))
+                size, body = pick()
+                future = clients.submit(_send, url, size, body, arrival, timeout)
+                future.add_done_callback(lambda done: record(done.result()))
+    else:
+        def client() -> None:
+            while time.perf_counter() < deadline:
+                size, body = pick()
+                record(_send(url, size, body, time.perf_counter(), timeout))
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict:
+    """Throughput, latency percentiles (successful requests) and failure rates."""
+    outcomes = Counter(sample.outcome for sample in samples)
+    latencies = np.array([sample.latency for sample in samples if sample.outcome == "ok"])
+    total = len(samples)
+    summary = {
+        "requests": total,
+        "throughput_per_second": round(outcomes["ok"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "error_rate": round(outcomes["error"] / total, 4) if total else 0.0,
+        "timeout_rate": round(outcomes["timeout"] / total, 4) if total else 0.0,
+    }
+    for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100)):
+        summary[f"{name}_ms"] = (
+            round(float(np.percentile(latencies, q)) * 1000, 1) if latencies.size else None
+        )
+    summary["http_status"] = dict(Counter(str(sample.http_status) for sample in samples))
+    summary["solver_status"] = dict(
+        Counter(sample.solver_status for sample in samples if sample.solver_status)
+    )
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:5002")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 30, 80])
+    parser.add_argument("--weights", type=float, nargs="+", default=None,
+                        help="Relative frequency per size (default: equal)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Arrivals per second; 0 runs closed-loop")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--time-limit", type=int, default=2)
+    parser.add_argument("--variants", type=int, default=16,
+                        help="Distinct instances per size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    weights = args.weights or [1.0] * len(args.sizes)
+    if len(weights) != len(args.sizes):
+        parser.error("--weights needs one value per size")
+
+    bodies = _bodies(args.sizes, args.variants, args.time_limit)
+    samples, elapsed = run_load(
+        args.url, bodies, weights, args.concurrency, args.rate, args.duration, args.timeout, args.seed
+    )
+    mode = {"concurrency": args.concurrency, "rate": args.rate or None}
+    print(json.dumps({"size": "all", **mode, **summarize(samples, elapsed)}), flush=True)
+    for size in args.sizes:
+        subset = [sample for sample in samples if sample.size == size]
+        print(json.dumps({"size": size, **mode, **summarize(subset, elapsed)}), flush=True)
+
+
+if __name__ == "__main__":
+    main()
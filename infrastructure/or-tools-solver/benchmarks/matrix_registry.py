@@ -0,0 +1,99 @@
+"""Request bytes and decode time of a mid-day re-optimization, inline vs. by handle.
+
+The morning's matrices cover the depot and every planned stop. By midday a
+quarter of the stops are done and one new order has come in. ``inline``
+sends the remaining route's full matrices to /optimize; ``handle`` sends
+the registered handle, the remaining nodes and the new stop's rows and
+columns. Decode time covers what the API process does before solving:
+JSON parsing and validation, then building the int arrays the solver
+reads (``_as_array`` inline; extend + subset by handle).
+
+    python -m benchmarks.matrix_registry --sizes 100 300 1000
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from app.models import HandleOptimizeRequest, OptimizeRequest
+from app.registry import MatrixRegistry
+from app.solver import _as_array
+
+from .instances import euclidean_instance
+
+
+def _median_ms(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000],
+                        help="Visits planned in the morning")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        # size + 1 planned nodes plus the new order, which the morning didn't know
+        day = euclidean_instance(size + 1, seed=size, time_limit_seconds=5)
+        planned = size + 1
+        distance, time_matrix = day.distance_matrix, day.time_matrix
+        remaining = [0] + list(range(1 + size // 4, planned))
+        new = planned
+
+        inline_nodes = remaining + [new]
+        inline_body = OptimizeRequest(
+            distance_matrix=[[distance[i][j] for j in inline_nodes] for i in inline_nodes],
+            time_matrix=[[time_matrix[i][j] for j in inline_nodes] for i in inline_nodes],
+            solver_time_limit_seconds=5,
+        ).model_dump_json().encode()
+
+        registry = MatrixRegistry(max_bytes=1 << 30)
+        handle = registry.register(
+            [row[:planned] for row in distance[:planned]],
+            [row[:planned] for row in time_matrix[:planned]],
+        )
+        handle_body = json.dumps({
+            "matrix_handle": handle,
+            "nodes": inline_nodes,
+            "extension": {
+                "distance_from": [distance[new]],
+                "distance_to": [[distance[i][new] for i in range(planned)]],
+                "time_from": [time_matrix[new]],
+                "time_to": [[time_matrix[i][new] for i in range(planned)]],
+            },
+            "solver_time_limit_seconds": 5,
+        }).encode()
+
+        def decode_inline():
+            request = OptimizeRequest.model_validate_json(inline_body)
+            _as_array(request.distance_matrix)
+            _as_array(request.time_matrix)
+
+        def decode_handle():
+            request = HandleOptimizeRequest.model_validate_json(handle_body)
+            extended = registry.extend(request.matrix_handle, **dict(request.extension))
+            registry.subset(extended, request.nodes)
+
+        inline_ms = _median_ms(decode_inline, args.repeats)
+        handle_ms = _median_ms(decode_handle, args.repeats)
+        print(json.dumps({
+            "planned_visits": size,
+            "routed_nodes": len(inline_nodes),
+            "inline_bytes": len(inline_body),
+            "handle_bytes": len(handle_body),
+            "bytes_ratio": round(len(inline_body) / len(handle_body), 1),
+            "inline_decode_ms": round(inline_ms, 2),
+            "handle_decode_ms": round(handle_ms, 2),
+            "decode_ratio": round(inline_ms / handle_ms, 1),
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""OSRM calls and payload per optimization, with and without the pair cache.
+
+Simulates a fleet over several days: each driver has a territory of
+recurring customers, and each day's route is the depot plus most of that
+territory, with a few first-time addresses mixed in. The uncached mode is
+what a full NxN ``/table`` per optimization costs; the cached mode goes
+through ``MatrixBuilder``. The first day warms the cache and is left out.
+
+    python -m benchmarks.osrm_cache --drivers 5 --days 10 --stops 80
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from app.models import Location
+from app.osrm import MatrixBuilder, OsrmClient, PairCache
+
+from .osrm_stub import OsrmStub
+
+DEPOT = Location(lat=-16.5, lon=-68.15)
+# Customers per driver relative to the stops on one day's route
+TERRITORY_FACTOR = 1.25
+
+
+def _days(args):
+    rng = random.Random(args.seed)
+
+    def near_depot() -> Location:
+        return Location(lat=DEPOT.lat + rng.uniform(-0.05, 0.05),
+                        lon=DEPOT.lon + rng.uniform(-0.05, 0.05))
+
+    territories = [
+        [near_depot() for _ in range(round(args.stops * TERRITORY_FACTOR))]
+        for _ in range(args.drivers)
+    ]
+    for _ in range(args.days):
+        routes = []
+        for territory in territories:
+            visits = rng.sample(territory, args.stops - args.new_per_route)
+            visits += [near_depot() for _ in range(args.new_per_route)]
+            rng.shuffle(visits)
+            routes.append([DEPOT] + visits)
+        yield routes
+
+
+def _run(osrm_url: str, cache_size: int, args) -> dict:
+    client = OsrmClient(osrm_url)
+    builder = MatrixBuilder(client, PairCache(cache_size, ttl_seconds=24 * 3600))
+    days = _days(args)
+    for locations in next(days):
+        asyncio.run(builder.build(locations))
+    client.calls = client.cells = client.bytes_received = 0
+
+    routes = 0
+    started = time.perf_counter()
+    for day in days:
+        for locations in day:
+            asyncio.run(builder.build(locations))
+            routes += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": "cached" if cache_size else "full_table",
+        "osrm_calls_per_route": round(client.calls / routes, 2),
+        "cells_per_route": round(client.cells / routes),
+        "kb_per_route": round(client.bytes_received / routes / 1024, 1),
+        "ms_per_route": round(elapsed / routes * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=5)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--stops", type=int, default=80)
+    parser.add_argument("--new-per-route", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with OsrmStub() as osrm:
+        for cache_size in (0, 1_000_000):
+            print(json.dumps(_run(osrm.url, cache_size, args)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
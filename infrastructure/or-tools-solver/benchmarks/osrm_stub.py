@@ -0,0 +1,101 @@
+"""Local stand-in for OSRM's ``/table`` service, for tests and benchmarks.
+
+Distances are great-circle metres times a detour factor, and durations
+assume a constant speed, so results are deterministic and self-consistent.
+Every request is counted, so callers can check how much they asked for.
+
+    with OsrmStub() as osrm:
+        client = OsrmClient(osrm.url)
+"""
+
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DETOUR_FACTOR = 1.3
+SPEED_METERS_PER_SECOND = 8.0  # ~30 km/h urban driving
+
+
+def _meters(a: tuple[float, float], b: tuple[float, float]) -> float:
+    """Great-circle distance between two (lon, lat) points."""
+    lon1, lat1, lon2, lat2 = map(math.radians, (*a, *b))
+    h = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * 6_371_000 * math.asin(math.sqrt(h))
+
+
+class OsrmStub:
+    """Threaded HTTP server answering ``GET /table/v1/{profile}/{coordinates}``."""
+
+    def __init__(self, port: int = 0):
+        self.calls = 0
+        self.cells = 0
+        self.fail_with: str | None = None
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        parsed = urlsplit(handler.path)
+        parts = parsed.path.split("/")
+        if len(parts) != 5 or parts[1] != "table":
+            handler.send_error(404)
+            return
+        points = [tuple(map(float, pair.split(","))) for pair in parts[4].split(";")]
+        query = parse_qs(parsed.query)
+
+        def indices(name: str) -> list[int]:
+            if name not in query:
+                return list(range(len(points)))
+            return [int(i) for i in query[name][0].split(";")]
+
+        sources, destinations = indices("sources"), indices("destinations")
+        self.calls += 1
+        self.cells += len(sources) * len(destinations)
+        if self.fail_with:
+            body = {"code": self.fail_with, "message": "stub failure"}
+        else:
+            distances = [
+                [_meters(points[i], points[j]) * DETOUR_FACTOR for j in destinations]
+                for i in sources
+            ]
+            body = {
+                "code": "Ok",
+                "distances": distances,
+                "durations": [[d / SPEED_METERS_PER_SECOND for d in row] for row in distances],
+            }
+        payload = json.dumps(body).encode()
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def start(self) -> "OsrmStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OsrmStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
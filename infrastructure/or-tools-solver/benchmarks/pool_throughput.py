@@ -0,0 +1,56 @@
+"""Measure /optimize-style throughput through the solver pool as workers grow.
+
+    python -m benchmarks.pool_throughput --workers 1 2 4 --jobs 8 --time-limit 2
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from app.pool import SolverPool
+from app.solver import solve
+
+from .instances import euclidean_instance
+
+
+async def _run_jobs(pool: SolverPool, requests) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(*(pool.run(solve, request) for request in requests))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--time-limit", type=int, default=2)
+    args = parser.parse_args()
+
+    requests = [
+        euclidean_instance(args.size, seed, args.time_limit) for seed in range(args.jobs)
+    ]
+    baseline = None
+    for workers in args.workers:
+        pool = SolverPool(workers)
+        pool.start()
+        try:
+            # Warm every worker so process start-up is not timed
+            asyncio.run(_run_jobs(pool, [euclidean_instance(3, 0, 1)] * workers))
+            elapsed = asyncio.run(_run_jobs(pool, requests))
+        finally:
+            pool.shutdown()
+        throughput = args.jobs / elapsed
+        baseline = baseline or throughput
+        print(json.dumps({
+            "workers": workers,
+            "jobs": args.jobs,
+            "elapsed_seconds": round(elapsed, 2),
+            "solves_per_second": round(throughput, 2),
+            "scaling": round(throughput / baseline, 2),
+        }))
+
+
+if __name__ == "__main__":
+    main()
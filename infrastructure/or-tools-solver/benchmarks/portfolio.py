@@ -0,0 +1,55 @@
+"""Portfolio search vs. the default configuration, at equal wall-clock.
+
+For each instance: the default configuration with ``--time-limit`` seconds,
+the default with ``--portfolio`` times that budget ("wait longer"), and the
+best of the first ``--portfolio`` configurations at ``--time-limit`` each,
+which is what a portfolio on that many idle cores returns in the same wall
+time as the first row. Configurations are solved one after another here, so
+the numbers don't depend on the machine's core count.
+
+    python -m benchmarks.portfolio --sizes 50 200 --portfolio 4 --time-limit 3
+"""
+
+import argparse
+import json
+
+from app.portfolio import SEARCH_PORTFOLIO, _rank, solve_with_config
+
+from .instances import LAYOUTS, InstanceSpec, make_instance
+
+
+def _summary(result) -> dict:
+    return {"cost": result.total_distance_meters, "dropped_visits": len(result.dropped_visits)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--windows", nargs="+", default=["none", "tight"])
+    parser.add_argument("--portfolio", type=int, default=4)
+    parser.add_argument("--time-limit", type=int, default=3)
+    args = parser.parse_args()
+
+    configs = SEARCH_PORTFOLIO[:args.portfolio]
+    for size in args.sizes:
+        for layout in LAYOUTS:
+            for windows in args.windows:
+                spec = InstanceSpec(layout, windows, "round", size)
+                request = make_instance(spec, args.time_limit).model_copy(
+                    update={"adaptive_stopping": False}
+                )
+                longer = request.model_copy(
+                    update={"solver_time_limit_seconds": args.time_limit * len(configs)}
+                )
+                results = [solve_with_config(request, config) for config in configs]
+                best = min(results, key=_rank)
+                print(json.dumps({
+                    "instance": spec.name,
+                    "default": _summary(results[0]),
+                    "default_longer": _summary(solve_with_config(longer, configs[0])),
+                    "portfolio": {**_summary(best), "winner": best.search_config},
+                }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Time to fresh ETAs per route event: session update vs. a stateless re-solve.
+
+A driver works through a solved route; after every few completed visits a
+new order comes in. For each event the session answers from its
+incumbent (re-scored, new stops inserted cheaply), while the baseline is
+what the tracking service does today: a fresh ``solve()`` of the remaining
+route. Also reports how far the session's immediate answer is from the
+re-solved distance, i.e. what the background re-solve still has to win.
+
+    python -m benchmarks.sessions --sizes 30 80 --events 8 --add-every 3
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.models import MatrixExtension, RouteSessionRequest, VisitAdded, VisitCompleted
+from app.sessions import RouteSession
+from app.solver import solve
+
+from .instances import CITY_SIZE_METERS, _matrices
+
+
+def _session_and_extra(size: int, extra: int, time_limit: int, seed: int):
+    """A solved session of ``size`` visits and the full matrices incl. ``extra`` later stops."""
+    rng = random.Random(f"sessions/{size}/{seed}")
+    points = [(CITY_SIZE_METERS / 2, CITY_SIZE_METERS / 2)] + [
+        (rng.uniform(0, CITY_SIZE_METERS), rng.uniform(0, CITY_SIZE_METERS))
+        for _ in range(size + extra)
+    ]
+    distance, time_matrix = _matrices(points)
+    n = size + 1
+    request = RouteSessionRequest(
+        distance_matrix=[row[:n] for row in distance[:n]],
+        time_matrix=[row[:n] for row in time_matrix[:n]],
+        service_times=[0] + [300] * size,
+        solver_time_limit_seconds=time_limit,
+    )
+    planned = solve(request)
+    session = RouteSession(request.model_copy(update={"visit_order": planned.visit_order}))
+    return session, distance, time_matrix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 80])
+    parser.add_argument("--events", type=int, default=8)
+    parser.add_argument("--add-every", type=int, default=3, help="Every k-th event adds an order")
+    parser.add_argument("--time-limit", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        extra = args.events // args.add_every + 1
+        session, distance, time_matrix = _session_and_extra(size, extra, args.time_limit, args.seed)
+        update_ms, resolve_ms, gaps = [], [], []
+        next_new = size + 1
+        for k in range(1, args.events + 1):
+            if k % args.add_every == 0:
+                n = session.num_nodes
+                event = VisitAdded(type="added", travel=MatrixExtension(
+                    distance_from=[distance[next_new][:n + 1]],
+                    distance_to=[[distance[i][next_new] for i in range(n)]],
+                    time_from=[time_matrix[next_new][:n + 1]],
+                    time_to=[[time_matrix[i][next_new] for i in range(n)]],
+                ), service_times=[300])
+                next_new += 1
+            else:
+                visit = session.order[0]
+                # Leave after arriving and serving, on the current ETA
+                at = session.to_state().estimated_arrivals[0] + 300
+                event = VisitCompleted(type="completed", visit=visit, at_seconds=at)
+
+            started = time.perf_counter()
+            session.apply(event)
+            session.refresh()
+            state = session.to_state()
+            update_ms.append((time.perf_counter() - started) * 1000)
+
+            request, _ = session.suffix_request()
+            started = time.perf_counter()
+            fresh = solve(request.model_copy(update={"initial_route": None}))
+            resolve_ms.append((time.perf_counter() - started) * 1000)
+            if fresh.total_distance_meters:
+                gaps.append(state.remaining_distance_meters / fresh.total_distance_meters - 1)
+
+        print(json.dumps({
+            "visits": size,
+            "events": args.events,
+            "session_update_ms_median": round(statistics.median(update_ms), 2),
+            "session_update_ms_max": round(max(update_ms), 2),
+            "stateless_resolve_ms_median": round(statistics.median(resolve_ms), 1),
+            "immediate_distance_gap_pct": round(100 * statistics.mean(gaps), 2) if gaps else None,
+        }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
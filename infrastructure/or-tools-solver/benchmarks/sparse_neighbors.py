@@ -0,0 +1,58 @@
+"""Sparse k-nearest arc mode vs. the dense N² model on large routes.
+
+Each instance is solved with every arc allowed and then with ``neighbors``
+set to each k, under the same fixed time limit (adaptive stopping off).
+
+    python -m benchmarks.sparse_neighbors --sizes 500 1000 --k 10 20 40 --time-limit 20
+"""
+
+import argparse
+import json
+
+from app.solver import solve
+
+from .instances import InstanceSpec, make_instance
+
+
+def _run(request) -> dict:
+    result = solve(request)
+    return {
+        "model_build_seconds": round(result.timings.model_build_seconds, 3),
+        "first_solution_seconds": round(result.timings.first_solution_seconds or 0.0, 3),
+        "time_to_best_seconds": result.time_to_best_seconds,
+        "cost": result.total_distance_meters,
+        "dropped_visits": len(result.dropped_visits),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000])
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 20, 40])
+    parser.add_argument("--layouts", nargs="+", default=["uniform", "clustered"])
+    parser.add_argument("--windows", nargs="+", default=["none", "loose"])
+    parser.add_argument("--time-limit", type=int, default=20)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for layout in args.layouts:
+            for windows in args.windows:
+                spec = InstanceSpec(layout, windows, "round", size)
+                request = make_instance(spec, args.time_limit).model_copy(
+                    update={"adaptive_stopping": False}
+                )
+                dense = _run(request)
+                print(json.dumps({"instance": spec.name, "neighbors": None, **dense}), flush=True)
+                for k in args.k:
+                    sparse = _run(request.model_copy(update={"neighbors": k}))
+                    delta = (sparse["cost"] - dense["cost"]) / dense["cost"] * 100
+                    print(json.dumps({
+                        "instance": spec.name,
+                        "neighbors": k,
+                        **sparse,
+                        "cost_delta_percent": round(delta, 2),
+                    }), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Time to ready and first-request latency of a fresh service, cold vs. warmed.
+
+Starts ``uvicorn app.main:app`` in a subprocess per mode, polls ``/ready``
+until it answers 200, then times the first and second ``/optimize`` calls.
+``cold`` is ``SOLVER_WARM_WORKERS=0``: ready as soon as it listens, but the
+first solve spawns its worker.
+
+    python -m benchmarks.startup --workers 2 --size 50
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from .instances import euclidean_instance
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _ready(base_url: str) -> bool:
+    try:
+        with urllib.request.urlopen(f"{base_url}/ready", timeout=1) as response:
+            return response.status == 200
+    except OSError:  # refused while starting, HTTPError (503) while warming
+        return False
+
+
+def _post(base_url: str, body: bytes) -> float:
+    request = urllib.request.Request(
+        f"{base_url}/optimize", data=body, headers={"Content-Type": "application/json"}
+    )
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=120) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def _measure(warm: bool, workers: int, body: bytes, second_body: bytes) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "SOLVER_WORKERS": str(workers),
+        "SOLVER_WARM_WORKERS": "1" if warm else "0",
+        "SOLVER_CACHE_SIZE": "0",
+    }
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while not _ready(base_url):
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited before becoming ready")
+            time.sleep(0.05)
+        ready_seconds = time.perf_counter() - started
+        first = _post(base_url, body)
+        second = _post(base_url, second_body)
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "mode": "warm" if warm else "cold",
+        "workers": workers,
+        "ready_seconds": round(ready_seconds, 2),
+        "first_request_ms": round(first * 1000),
+        "second_request_ms": round(second * 1000),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--size", type=int, default=50)
+    args = parser.parse_args()
+
+    # Different instances so the result cache can't answer the second call
+    body, second_body = (
+        euclidean_instance(args.size, seed, time_limit_seconds=1).model_dump_json().encode()
+        for seed in (0, 1)
+    )
+    for warm in (False, True):
+        print(json.dumps(_measure(warm, args.workers, body, second_body)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
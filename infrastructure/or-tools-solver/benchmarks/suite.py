@@ -0,0 +1,161 @@
+"""Reproducible solver benchmark suite with regression comparison.
+
+Runs seeded instances (uniform/clustered stops, no/loose/tight windows,
+round/open routes, 10–1000 nodes) through ``solve()`` and records wall time,
+time to first and best solution, final cost and dropped visits as JSON.
+
+    python -m benchmarks.suite run --out baseline.json
+    python -m benchmarks.suite run --sizes 10 50 --out candidate.json
+    python -m benchmarks.suite compare baseline.json candidate.json
+
+``compare`` exits with status 1 when the candidate regresses.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+from ortools import __version__ as ortools_version
+
+from app.solver import solve
+
+from .instances import LAYOUTS, ROUTES, SIZES, WINDOWS, InstanceSpec, make_instance, suite_specs
+
+
+def run_instance(spec: InstanceSpec, time_limit_seconds: int | None) -> dict:
+    """Solve one instance and return its metrics row."""
+    request = make_instance(spec, time_limit_seconds)
+    first_solution = None
+
+    def on_solution(result, objective, elapsed):
+        nonlocal first_solution
+        if first_solution is None:
+            first_solution = elapsed
+        return False
+
+    started = time.perf_counter()
+    result = solve(request, on_solution=on_solution)
+    wall = time.perf_counter() - started
+    return {
+        "name": spec.name,
+        "layout": spec.layout,
+        "windows": spec.windows,
+        "route": spec.route,
+        "size": spec.size,
+        "seed": spec.seed,
+        "wall_seconds": round(wall, 3),
+        "time_to_first_solution_seconds": (
+            round(first_solution, 3) if first_solution is not None else None
+        ),
+        "time_to_best_seconds": result.time_to_best_seconds,
+        "cost": result.total_distance_meters,
+        "duration_seconds": result.total_duration_seconds,
+        "dropped_visits": len(result.dropped_visits),
+        "solver_status": result.solver_status,
+        "stop_reason": result.stop_reason,
+    }
+
+
+def run(args: argparse.Namespace) -> int:
+    specs = suite_specs(
+        sizes=args.sizes,
+        layouts=args.layouts,
+        windows=args.windows,
+        routes=args.routes,
+        seeds=range(args.seeds),
+    )
+    rows = []
+    for spec in specs:
+        row = run_instance(spec, args.time_limit)
+        rows.append(row)
+        print(json.dumps(row), file=sys.stderr)
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "ortools": ortools_version,
+            "machine": platform.machine(),
+            "time_limit_seconds": args.time_limit,
+        },
+        "results": rows,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{len(rows)} instances written to {args.out}", file=sys.stderr)
+    return 0
+
+
+def compare_reports(
+    baseline: dict, candidate: dict, cost_tolerance: float, time_tolerance: float
+) -> list[dict]:
+    """Per-instance regressions of ``candidate`` against ``baseline``.
+
+    Flags a cost increase above ``cost_tolerance`` (relative), any increase in
+    dropped visits, and a wall-time increase above ``time_tolerance``
+    (relative, ignoring differences under 50 ms).
+    """
+    base_rows = {row["name"]: row for row in baseline["results"]}
+    regressions = []
+    for row in candidate["results"]:
+        base = base_rows.get(row["name"])
+        if base is None:
+            continue
+        problems = []
+        if row["dropped_visits"] > base["dropped_visits"]:
+            problems.append(f"dropped {base['dropped_visits']} -> {row['dropped_visits']}")
+        if base["cost"] and row["cost"] > base["cost"] * (1 + cost_tolerance):
+            problems.append(f"cost {base['cost']} -> {row['cost']}")
+        slower = row["wall_seconds"] - base["wall_seconds"]
+        if slower > 0.05 and row["wall_seconds"] > base["wall_seconds"] * (1 + time_tolerance):
+            problems.append(f"wall {base['wall_seconds']}s -> {row['wall_seconds']}s")
+        if problems:
+            regressions.append({"name": row["name"], "problems": problems})
+    return regressions
+
+
+def compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    regressions = compare_reports(baseline, candidate, args.cost_tolerance, args.time_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression['name']}: {'; '.join(regression['problems'])}")
+    compared = len({r["name"] for r in baseline["results"]} & {r["name"] for r in candidate["results"]})
+    print(f"{compared} instances compared, {len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and write a JSON report")
+    run_parser.add_argument("--out", required=True)
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    run_parser.add_argument("--layouts", nargs="+", default=list(LAYOUTS), choices=LAYOUTS)
+    run_parser.add_argument("--windows", nargs="+", default=list(WINDOWS), choices=WINDOWS)
+    run_parser.add_argument("--routes", nargs="+", default=list(ROUTES), choices=ROUTES)
+    run_parser.add_argument("--seeds", type=int, default=1)
+    run_parser.add_argument(
+        "--time-limit", type=int, default=None,
+        help="cap per instance in seconds (default: the solver's node-count budget)",
+    )
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--cost-tolerance", type=float, default=0.01)
+    compare_parser.add_argument("--time-tolerance", type=float, default=0.25)
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compare native matrix transits against per-arc Python callbacks.
+
+Both engines get the same model and the same time limit; the figure of merit
+is how many solutions the search explores per second, and the cost it ends on.
+
+    python -m benchmarks.transit_engines --sizes 50 150 400 --time-limit 5
+"""
+
+import argparse
+import json
+import time
+
+from app.solver import _build_data_model, _build_routing_model, _routing_matrices, _search_parameters
+
+from .instances import euclidean_instance
+
+ENGINES = ("callback", "matrix")
+
+
+def run_engine(request, transit_engine: str) -> dict:
+    """Solve one instance with the given engine and count accepted solutions."""
+    data = _build_data_model(request)
+    dist_matrix, transit_matrix, dummy = _routing_matrices(data, not request.return_to_depot)
+    manager, routing, _ = _build_routing_model(
+        data, dist_matrix, transit_matrix, dummy, transit_engine
+    )
+    solutions = 0
+
+    def on_solution():
+        nonlocal solutions
+        solutions += 1
+
+    routing.AddAtSolutionCallback(on_solution)
+    started = time.perf_counter()
+    solution = routing.SolveWithParameters(
+        _search_parameters(request.solver_time_limit_seconds)
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "engine": transit_engine,
+        "nodes": len(data["distance_matrix"]),
+        "elapsed_seconds": round(elapsed, 3),
+        "solutions": solutions,
+        "solutions_per_second": round(solutions / elapsed, 1),
+        "objective": solution.ObjectiveValue() if solution else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 150, 400])
+    parser.add_argument("--time-limit", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        request = euclidean_instance(size, args.seed, args.time_limit)
+        rows = {engine: run_engine(request, engine) for engine in ENGINES}
+        speedup = (
+            rows["matrix"]["solutions_per_second"]
+            / max(rows["callback"]["solutions_per_second"], 0.1)
+        )
+        for row in rows.values():
+            print(json.dumps(row))
+        print(json.dumps({"nodes": size + 1, "solutions_per_second_speedup": round(speedup, 2)}))
+
+
+if __name__ == "__main__":
+    main()
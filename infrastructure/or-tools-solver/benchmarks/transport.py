@@ -0,0 +1,54 @@
+"""Request decode cost: JSON + pydantic vs. the binary transport.
+
+    python -m benchmarks.transport --sizes 100 500 1000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from app.codec import decode_request, encode_request
+from app.models import OptimizeRequest
+
+from .instances import euclidean_instance
+
+
+def _measure(decode, body) -> tuple[float, int]:
+    """Best-of-3 wall time (ms) and peak traced allocation (bytes)."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        decode(body)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    decode(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        request = euclidean_instance(size - 1)
+        json_body = request.model_dump_json().encode()
+        binary_body = encode_request(request)
+        json_ms, json_peak = _measure(OptimizeRequest.model_validate_json, json_body)
+        binary_ms, binary_peak = _measure(decode_request, binary_body)
+        print(json.dumps({
+            "nodes": size,
+            "json_bytes": len(json_body),
+            "binary_bytes": len(binary_body),
+            "json_decode_ms": round(json_ms, 2),
+            "binary_decode_ms": round(binary_ms, 3),
+            "json_peak_mb": round(json_peak / 2**20, 1),
+            "binary_peak_mb": round(binary_peak / 2**20, 2),
+        }))
+
+
+if __name__ == "__main__":
+    main()
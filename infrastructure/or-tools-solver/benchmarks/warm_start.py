@@ -0,0 +1,94 @@
+"""Time-to-equal-quality of warm-started vs. cold re-optimization.
+
+Simulates a mid-day change: a route of N visits was optimized earlier (with
+a longer budget, as plans are refined over the morning), then one visit is
+added. The cold run re-solves from PATH_CHEAPEST_ARC; the warm
+run starts from the previous visit order. Both get the same time limit, and
+we report how long each needs to reach the cold run's final cost.
+
+    python -m benchmarks.warm_start --sizes 50 150 --time-limit 10
+"""
+
+import argparse
+import json
+import time
+
+from app.models import OptimizeRequest
+from app.solver import (
+    _build_data_model,
+    _build_routing_model,
+    _initial_assignment,
+    _routing_matrices,
+    _search_parameters,
+    solve,
+)
+
+from .instances import euclidean_instance
+
+
+def trajectory(request: OptimizeRequest) -> list[tuple[float, int]]:
+    """(elapsed seconds, best cost so far) for every solution the search accepts."""
+    data = _build_data_model(request)
+    dist_matrix, transit_matrix, dummy = _routing_matrices(data, not request.return_to_depot)
+    _, routing, _ = _build_routing_model(data, dist_matrix, transit_matrix, dummy)
+    search_params = _search_parameters(request.solver_time_limit_seconds)
+    points: list[tuple[float, int]] = []
+    started = time.perf_counter()
+
+    def on_solution():
+        cost = routing.CostVar().Value()
+        best = min(cost, points[-1][1]) if points else cost
+        points.append((time.perf_counter() - started, best))
+
+    routing.AddAtSolutionCallback(on_solution)
+    routing.CloseModelWithParameters(search_params)
+    initial = _initial_assignment(routing, request.initial_route)
+    if initial is not None:
+        routing.SolveFromAssignmentWithParameters(initial, search_params)
+    else:
+        routing.SolveWithParameters(search_params)
+    return points
+
+
+def time_to_reach(points: list[tuple[float, int]], target: int) -> float | None:
+    for elapsed, best in points:
+        if best <= target:
+            return elapsed
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 150])
+    parser.add_argument("--time-limit", type=int, default=10)
+    parser.add_argument("--previous-time-limit", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        full = euclidean_instance(size, args.seed, args.time_limit)
+        # Yesterday's plan: the same stops minus the newest visit
+        previous = solve(OptimizeRequest(
+            distance_matrix=[row[:size] for row in full.distance_matrix[:size]],
+            time_matrix=[row[:size] for row in full.time_matrix[:size]],
+            service_times=full.service_times[:size],
+            solver_time_limit_seconds=args.previous_time_limit,
+        ))
+
+        cold = trajectory(full)
+        warm = trajectory(full.model_copy(update={"initial_route": previous.visit_order}))
+        target = cold[-1][1]
+        cold_time = time_to_reach(cold, target)
+        warm_time = time_to_reach(warm, target)
+        print(json.dumps({
+            "nodes": size + 1,
+            "time_limit_seconds": args.time_limit,
+            "cold_final_cost": target,
+            "warm_final_cost": warm[-1][1],
+            "cold_seconds_to_target": round(cold_time, 3),
+            "warm_seconds_to_target": round(warm_time, 3) if warm_time is not None else None,
+        }))
+
+
+if __name__ == "__main__":
+    main()
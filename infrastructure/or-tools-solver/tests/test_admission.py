@@ -0,0 +1,26 @@
+"""Tests for request classification."""
+
+from app.admission import estimated_seconds, request_priority
+from app.models import OptimizeRequest
+from app.solver import default_time_limit
+
+
+def _request(n: int, **options) -> OptimizeRequest:
+    return OptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        **options,
+    )
+
+
+def test_estimate_is_the_search_budget():
+    assert estimated_seconds(_request(5, solver_time_limit_seconds=7)) == 7
+    assert estimated_seconds(_request(5)) == default_time_limit(5)
+
+
+def test_cheap_requests_are_interactive_and_explicit_priority_wins():
+    assert request_priority(_request(5, solver_time_limit_seconds=2), 5) == "interactive"
+    assert request_priority(_request(5, solver_time_limit_seconds=30), 5) == "planning"
+    assert request_priority(
+        _request(5, solver_time_limit_seconds=2, priority="batch"), 5
+    ) == "batch"
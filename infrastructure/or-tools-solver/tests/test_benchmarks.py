@@ -0,0 +1,68 @@
+"""Tests for the benchmark instance generators and report comparison."""
+
+import socket
+
+from benchmarks.instances import InstanceSpec, make_instance, suite_specs
+from benchmarks.load_test import Sample, run_load, summarize
+from benchmarks.suite import compare_reports
+from app.solver import solve
+
+
+def test_instances_are_reproducible():
+    spec = InstanceSpec("clustered", "tight", "open", 20, seed=3)
+    assert make_instance(spec) == make_instance(spec)
+    assert make_instance(spec) != make_instance(InstanceSpec("clustered", "tight", "open", 20, seed=4))
+
+
+def test_instance_shape_follows_spec():
+    request = make_instance(InstanceSpec("uniform", "loose", "open", 12), time_limit_seconds=2)
+    assert len(request.distance_matrix) == 13
+    assert len(request.time_windows) == 13
+    assert request.time_windows[0] is None
+    assert all(tw.latest - tw.earliest == 3 * 3600 for tw in request.time_windows[1:])
+    assert request.return_to_depot is False
+    assert request.solver_time_limit_seconds == 2
+
+
+def test_tight_windows_admit_a_full_schedule():
+    request = make_instance(InstanceSpec("uniform", "tight", "round", 10))
+    assert solve(request).dropped_visits == []
+
+
+def test_suite_specs_cover_every_combination():
+    specs = suite_specs(sizes=(10, 50), seeds=range(2))
+    assert len(specs) == 2 * 2 * 3 * 2 * 2
+    assert len({spec.name for spec in specs}) == len(specs)
+
+
+def test_compare_flags_regressions():
+    def report(cost, dropped, wall):
+        return {"results": [{"name": "x", "cost": cost, "dropped_visits": dropped, "wall_seconds": wall}]}
+
+    assert compare_reports(report(1000, 0, 1.0), report(1005, 0, 1.1), 0.01, 0.25) == []
+    problems = compare_reports(report(1000, 0, 1.0), report(1100, 1, 2.0), 0.01, 0.25)[0]["problems"]
+    assert len(problems) == 3
+
+
+def test_load_summary_percentiles_and_rates():
+    samples = [Sample(10, 0.0, ms / 1000, "ok", 200, "OPTIMAL") for ms in range(1, 101)]
+    samples += [Sample(30, 0.0, 5.0, "timeout"), Sample(30, 0.0, 0.1, "error", 503)]
+    summary = summarize(samples, elapsed=10.0)
+
+    assert summary["requests"] == 102
+    assert summary["throughput_per_second"] == 10.0
+    assert summary["p50_ms"] == 50.5 and summary["max_ms"] == 100.0
+    assert round(summary["p99_ms"]) == 99  # timeouts don't skew success latency
+    assert summary["timeout_rate"] == summary["error_rate"] == round(1 / 102, 4)
+    assert summary["http_status"] == {"200": 100, "None": 1, "503": 1}
+
+
+def test_load_run_counts_refused_connections_as_errors():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    samples, _ = run_load(
+        f"http://127.0.0.1:{port}", {5: [b"{}"]}, [1.0],
+        concurrency=2, rate=50, duration=0.2, timeout=1,
+    )
+    assert samples and all(sample.outcome == "error" for sample in samples)
@@ -0,0 +1,122 @@
+"""Tests for the solver result cache."""
+
+import asyncio
+
+import pytest
+from app.cache import ResultCache, request_key
+from app.models import OptimizeRequest, OptimizeResponse
+
+
+def _response(distance: int = 100) -> OptimizeResponse:
+    return OptimizeResponse(
+        visit_order=[1],
+        total_distance_meters=distance,
+        total_duration_seconds=60,
+        estimated_arrivals=[60],
+        feasible=True,
+        solver_status="OPTIMAL",
+    )
+
+
+def _request(**overrides) -> OptimizeRequest:
+    payload = {
+        "distance_matrix": [[0, 100, 200], [100, 0, 100], [200, 100, 0]],
+        "time_matrix": [[0, 60, 120], [60, 0, 60], [120, 60, 0]],
+    }
+    payload.update(overrides)
+    return OptimizeRequest(**payload)
+
+
+def test_key_ignores_explicit_defaults():
+    assert request_key(_request()) == request_key(
+        _request(service_times=[0, 600, 600], time_windows=[None, None, None])
+    )
+
+
+def test_key_changes_with_content():
+    assert request_key(_request()) != request_key(_request(return_to_depot=False))
+    assert request_key(_request()) != request_key(_request(service_times=[0, 300]))
+
+
+def test_identical_in_flight_requests_share_one_solve():
+    cache = ResultCache(max_entries=8, ttl_seconds=60)
+    calls = 0
+
+    async def slow_solve():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return _response()
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(cache.get_or_solve("k", slow_solve) for _ in range(3))
+        )
+        again = await cache.get_or_solve("k", slow_solve)
+        return results, again
+
+    results, again = asyncio.run(scenario())
+
+    assert calls == 1
+    assert all(result == _response() for result in results)
+    assert again == _response()
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_solve_is_cancelled_only_when_its_last_caller_leaves():
+    cache = ResultCache(max_entries=8, ttl_seconds=60)
+    started = []
+
+    async def slow_solve():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10)
+        return _response()
+
+    async def scenario():
+        first = asyncio.ensure_future(cache.get_or_solve("k", slow_solve))
+        second = asyncio.ensure_future(cache.get_or_solve("k", slow_solve))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        still_running = not started[0].done()
+        second.cancel()
+        await asyncio.sleep(0.01)
+        return still_running, started[0].cancelled()
+
+    still_running, cancelled = asyncio.run(scenario())
+
+    assert still_running
+    assert cancelled
+    assert cache.stats()["in_flight"] == 0
+    assert cache.stats()["size"] == 0
+
+
+def test_failures_are_not_cached():
+    cache = ResultCache(max_entries=8, ttl_seconds=60)
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_solve("k", broken))
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.cache.time.monotonic", lambda: now[0])
+    cache = ResultCache(max_entries=2, ttl_seconds=10)
+
+    cache.put("a", _response(1))
+    cache.put("b", _response(2))
+    assert cache.get("a") is not None  # "a" is now most recently used
+    cache.put("c", _response(3))
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
@@ -0,0 +1,75 @@
+"""Tests for the binary request/response encoding."""
+
+import numpy as np
+import pytest
+from app.cache import request_key
+from app.codec import decode_request, decode_response, encode_request, encode_response
+from app.models import OptimizeRequest, TimeWindow
+from app.solver import solve
+
+
+def _request() -> OptimizeRequest:
+    return OptimizeRequest(
+        distance_matrix=[
+            [  0,  100,  200,  300],
+            [100,    0,  100,  200],
+            [200,  100,    0,  100],
+            [300,  200,  100,    0],
+        ],
+        time_matrix=[
+            [  0,   60,  120,  180],
+            [ 60,    0,   60,  120],
+            [120,   60,    0,   60],
+            [180,  120,   60,    0],
+        ],
+        time_windows=[None, TimeWindow(earliest=0, latest=3600)],
+        service_times=[0, 300, 300, 300],
+        return_to_depot=False,
+        solver_time_limit_seconds=1,
+    )
+
+
+def test_request_round_trip():
+    original = _request()
+    decoded = decode_request(encode_request(original))
+
+    assert isinstance(decoded.distance_matrix, np.ndarray)
+    assert decoded.distance_matrix.tolist() == original.distance_matrix
+    assert decoded.time_matrix.tolist() == original.time_matrix
+    assert decoded.time_windows == original.time_windows
+    assert decoded.return_to_depot is False
+    assert request_key(decoded) == request_key(original)
+
+
+def test_decoded_request_solves_like_json():
+    original = _request()
+    from_binary = solve(decode_request(encode_request(original)))
+    from_json = solve(original)
+    assert from_binary.visit_order == from_json.visit_order
+    assert from_binary.estimated_arrivals == from_json.estimated_arrivals
+    assert from_binary.total_distance_meters == from_json.total_distance_meters
+
+
+def test_response_round_trip():
+    response = solve(_request())
+    assert decode_response(encode_response(response)) == response
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda body: body[:3],                     # truncated prefix
+        lambda body: b"XXXX" + body[4:],           # wrong magic
+        lambda body: body[:-4],                    # matrix cells missing
+        lambda body: body + b"\0\0\0\0",           # trailing bytes
+    ],
+)
+def test_malformed_requests_are_rejected(mutate):
+    with pytest.raises(ValueError):
+        decode_request(mutate(encode_request(_request())))
+
+
+def test_header_fields_are_validated():
+    body = encode_request(_request()).replace(b'"return_to_depot":false', b'"return_to_depot":"maybe"')
+    with pytest.raises(ValueError):
+        decode_request(body)
@@ -0,0 +1,131 @@
+"""Tests for cluster-first decomposition."""
+
+import asyncio
+
+import pytest
+from app.decompose import ClusterPlan, _schedule, plan_clusters, solve_decomposed, stitch
+from app.exact import EXACT_SEARCH_CONFIG
+from app.models import OptimizeRequest, OptimizeResponse, TimeWindow
+from app.solver import _build_data_model, solve
+from benchmarks.instances import InstanceSpec, make_instance
+
+
+async def _inline(fn, *args):
+    return fn(*args)
+
+
+def _request(windows: str, route: str = "round", size: int = 60):
+    return make_instance(InstanceSpec("clustered", windows, route, size), time_limit_seconds=1)
+
+
+def test_plan_covers_every_visit_once():
+    request = _request("loose").model_copy(update={"cluster_size": 20})
+    plan = plan_clusters(request)
+
+    visits = [node for cluster in plan.clusters for node in cluster]
+    assert sorted(visits) == list(range(1, 61))
+    assert len(plan.clusters) == 3
+    assert all(len(sub.distance_matrix) == len(cluster) + 1
+               for sub, cluster in zip(plan.requests, plan.clusters))
+    # Only the last cluster of a round trip heads back to the real depot
+    assert all(sub.return_to_depot for sub in plan.requests)
+
+
+def test_stitched_route_meets_windows_with_combined_etas():
+    request = _request("loose").model_copy(update={"cluster_size": 20})
+    plan = plan_clusters(request)
+    result = stitch(request, plan, [solve(sub) for sub in plan.requests])
+
+    assert sorted(result.visit_order + result.dropped_visits) == list(range(1, 61))
+    data = _build_data_model(request)
+    arrivals, late, distance, duration = _schedule(data, result.visit_order, False)
+    assert late == []
+    assert result.estimated_arrivals == arrivals
+    assert result.total_distance_meters == distance
+    assert result.total_duration_seconds == duration
+    for node, eta in zip(result.visit_order, result.estimated_arrivals):
+        tw = request.time_windows[node]
+        assert tw.earliest <= eta <= tw.latest
+
+
+def test_decomposed_open_route_without_windows():
+    request = _request("none", route="open").model_copy(update={"cluster_size": 25})
+    result = asyncio.run(solve_decomposed(request, _inline, 1))
+
+    assert sorted(result.visit_order) == list(range(1, 61))
+    assert result.feasible
+    assert result.solver_status == "FEASIBLE"
+
+
+def test_small_request_is_solved_directly():
+    request = _request("none", size=15).model_copy(update={"cluster_size": 20})
+    result = asyncio.run(solve_decomposed(request, _inline, 1))
+
+    assert sorted(result.visit_order) == list(range(1, 16))
+    assert result.timings is not None  # a plain solve() result
+
+
+def test_request_the_exact_engine_takes_is_not_split():
+    # 12 visits would make two clusters of 10, but 13 nodes are solved exactly
+    request = _request("loose", size=12).model_copy(update={"cluster_size": 10})
+    result = asyncio.run(solve_decomposed(request, _inline, 1))
+
+    assert result.search_config == EXACT_SEARCH_CONFIG
+    assert sorted(result.visit_order + result.dropped_visits) == list(range(1, 13))
+
+
+def test_cluster_solves_share_the_time_limit_by_wave():
+    request = _request("loose").model_copy(
+        update={"cluster_size": 20, "solver_time_limit_seconds": 7}
+    )
+    limits = []
+
+    async def recorded(fn, *args):
+        if fn is solve:
+            limits.append(args[0].solver_time_limit_seconds)
+        return fn(*args)
+
+    asyncio.run(solve_decomposed(request, recorded, 1))
+    one_worker = limits[:]
+    limits.clear()
+    asyncio.run(solve_decomposed(request, recorded, 3))
+
+    # Three clusters: three waves of ~2 s on one worker, one wave of ~6 s on three
+    assert one_worker == [2, 2, 2]
+    assert limits == [6, 6, 6]
+
+
+@pytest.mark.parametrize("update", [
+    {"time_windows": [None] + [TimeWindow(earliest=0, latest=0)] * 60},
+    {"max_route_duration": 1},
+], ids=["windows-closed", "tight-duration"])
+def test_nothing_reachable_falls_back_to_one_cluster(update):
+    # The greedy pass reaches no visit, so it can't seed any clusters
+    request = _request("none").model_copy(update={"cluster_size": 20, **update})
+    plan = plan_clusters(request)
+    assert plan.clusters == [list(range(1, 61))]
+    assert plan.requests[0].max_route_duration == request.max_route_duration
+
+    result = asyncio.run(solve_decomposed(request, _inline, 1))
+    assert result.visit_order == []
+    assert result.dropped_visits == list(range(1, 61))
+
+
+def test_stitch_over_the_duration_limit_drops_the_costliest_visit():
+    # Stops 1-6 a minute apart on a line; stop 7 is a long detour mid-route
+    positions = [0, 1, 2, 3, 4, 5, 6, 30]
+    matrix = [[abs(a - b) * 60 for b in positions] for a in positions]
+    request = OptimizeRequest(
+        distance_matrix=matrix, time_matrix=matrix, service_times=[0] * 8,
+        max_route_duration=800,
+    )
+    sub_route = OptimizeResponse(
+        visit_order=[1, 2, 3, 7, 4, 5, 6], total_distance_meters=0, total_duration_seconds=0,
+        estimated_arrivals=[], feasible=True, dropped_visits=[], solver_status="FEASIBLE",
+    )
+    plan = ClusterPlan(clusters=[list(range(1, 8))], requests=[request], unreachable=[])
+    result = stitch(request, plan, [sub_route])
+
+    assert result.visit_order == [1, 2, 3, 4, 5, 6]
+    assert result.dropped_visits == [7]
+    assert result.total_duration_seconds == 720
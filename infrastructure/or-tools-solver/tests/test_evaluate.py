@@ -0,0 +1,66 @@
+"""Tests for fixed-order route evaluation."""
+
+import random
+
+from app.decompose import _schedule
+from app.evaluate import evaluate
+from app.models import EvaluateRequest, TimeWindow
+from app.solver import _build_data_model, solve
+from benchmarks.instances import InstanceSpec, make_instance
+
+
+def _request(spec: InstanceSpec, orders: list[list[int]], **overrides) -> EvaluateRequest:
+    request = make_instance(spec, time_limit_seconds=1)
+    return EvaluateRequest(**dict(request), orders=orders, **overrides)
+
+
+def test_matches_the_sequential_schedule():
+    rng = random.Random(3)
+    for route in ("round", "open"):
+        spec = InstanceSpec("clustered", "tight", route, 30)
+        orders = [rng.sample(range(1, 31), rng.randint(0, 30)) for _ in range(50)]
+        request = _request(spec, orders)
+        data = _build_data_model(request)
+
+        for order, result in zip(orders, evaluate(request).results):
+            arrivals, late, distance, duration = _schedule(data, order, route == "open")
+            if order:
+                assert (result.total_distance_meters, result.total_duration_seconds) == (
+                    distance, duration
+                )
+            assert result.estimated_arrivals == arrivals
+            assert result.late_visits == [order[position] for position in late]
+            assert result.feasible == (not late)
+
+
+def test_scores_the_solver_route_like_the_solver():
+    spec = InstanceSpec("uniform", "none", "open", 12)
+    solved = solve(make_instance(spec, time_limit_seconds=1))
+    [result] = evaluate(_request(spec, [solved.visit_order])).results
+
+    assert result.total_distance_meters == solved.total_distance_meters
+    assert result.total_duration_seconds == solved.total_duration_seconds
+    assert result.estimated_arrivals == solved.estimated_arrivals
+
+
+def test_reports_lateness_and_max_duration():
+    windows = [None, TimeWindow(earliest=0, latest=100), TimeWindow(earliest=500, latest=600)]
+    request = EvaluateRequest(
+        distance_matrix=[[0, 10, 20], [10, 0, 10], [20, 10, 0]],
+        time_matrix=[[0, 60, 120], [60, 0, 60], [120, 60, 0]],
+        time_windows=windows,
+        service_times=[0, 30, 30],
+        max_route_duration=660,
+        orders=[[1, 2], [2, 1], []],
+    )
+    in_order, reversed_order, empty = evaluate(request).results
+
+    assert in_order.estimated_arrivals == [60, 500]  # waits for node 2 to open
+    assert in_order.total_duration_seconds == 500 + 30 + 120
+    assert in_order.feasible and in_order.lateness_seconds == 0
+    assert reversed_order.estimated_arrivals == [500, 590]
+    assert reversed_order.late_visits == [1]
+    assert reversed_order.lateness_seconds == 490
+    assert reversed_order.exceeds_max_duration  # 590 + 30 + 60 back to the depot
+    assert not in_order.exceeds_max_duration
+    assert empty.total_duration_seconds == 0 and empty.feasible
@@ -0,0 +1,128 @@
+"""Tests for the exact dynamic-programming engine, checked against OR-Tools."""
+
+import random
+
+import pytest
+from app.evaluate import score_orders
+from app.exact import solve_exact
+from app.models import OptimizeRequest, TimeWindow
+from app.solver import DROP_PENALTY, _build_data_model, solve
+
+
+def _line_request(n: int, **options) -> OptimizeRequest:
+    """Depot at 0 and visits on a line, 100 m / 60 s apart, 60 s service."""
+    return OptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        service_times=[0] + [60] * (n - 1),
+        solver_time_limit_seconds=1,
+        **options,
+    )
+
+
+def _random_request(seed: int) -> OptimizeRequest:
+    """Scattered stops with some windows, random route type and duration cap."""
+    rng = random.Random(seed)
+    n = rng.randint(4, 10)
+    points = [(rng.uniform(0, 5000), rng.uniform(0, 5000)) for _ in range(n)]
+    distance = [[int(((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5) for bx, by in points]
+                for ax, ay in points]
+    windows = [None]
+    for _ in range(n - 1):
+        earliest = rng.randint(0, 3000)
+        windows.append(
+            TimeWindow(earliest=earliest, latest=earliest + rng.randint(300, 2000))
+            if rng.random() < 0.6 else None
+        )
+    return OptimizeRequest(
+        distance_matrix=distance,
+        time_matrix=[[d // 8 for d in row] for row in distance],
+        time_windows=windows,
+        service_times=[0] + [rng.randint(60, 400) for _ in range(n - 1)],
+        return_to_depot=rng.random() < 0.5,
+        max_route_duration=rng.choice([None, 3000, 5000]),
+        solver_time_limit_seconds=1,
+    )
+
+
+def _objective(result) -> int:
+    return result.total_distance_meters + DROP_PENALTY * len(result.dropped_visits)
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_exact_is_feasible_and_never_worse_than_ortools(seed):
+    request = _random_request(seed)
+    exact = solve(request)
+    search = solve(request, exact_max_nodes=0)
+
+    assert exact.search_config == "EXACT_DP"
+    assert exact.solver_status == "OPTIMAL"
+    assert _objective(exact) <= _objective(search)
+
+    # The same route, re-scored independently, meets every window and the horizon
+    data = _build_data_model(request)
+    scored = score_orders(data, [exact.visit_order], not request.return_to_depot)
+    assert scored["lateness"][0] == 0
+    assert int(scored["distance"][0]) == exact.total_distance_meters
+    assert list(scored["arrivals"][0][:len(exact.visit_order)]) == exact.estimated_arrivals
+    assert exact.total_duration_seconds <= data["horizon"]
+    assert sorted(exact.visit_order + exact.dropped_visits) == list(range(1, len(data["time_windows"])))
+
+
+def test_windows_can_force_a_longer_route():
+    # Stop 3 closes before the nearest-first order would reach it
+    windows = [None, None, None, TimeWindow(earliest=0, latest=200)]
+    result = solve(_line_request(4, time_windows=windows))
+    assert result.visit_order == [3, 2, 1]
+    assert result.estimated_arrivals == [180, 300, 420]
+    assert result.total_distance_meters == 600
+    assert result.total_duration_seconds == 420 + 60 + 60
+
+
+def test_open_route_ends_after_the_last_service():
+    result = solve(_line_request(5, return_to_depot=False))
+    assert result.visit_order == [1, 2, 3, 4]
+    assert result.total_distance_meters == 400
+    assert result.total_duration_seconds == 4 * 60 + 4 * 60
+
+
+def test_duration_cap_drops_as_few_visits_as_possible():
+    # 740 s covers stops 1-4 and back (240 + 240 + 240) but not a fifth
+    result = solve(_line_request(6, max_route_duration=740))
+    assert sorted(result.visit_order) == [1, 2, 3, 4]
+    assert result.total_distance_meters == 800
+    assert result.dropped_visits == [5]
+    assert not result.feasible
+    assert result.solver_status == "OPTIMAL"
+
+
+def test_unreachable_window_is_dropped():
+    windows = [None, TimeWindow(earliest=0, latest=10), None]
+    result = solve(_line_request(3, time_windows=windows))
+    assert result.visit_order == [2]
+    assert result.dropped_visits == [1]
+
+
+@pytest.mark.parametrize("return_to_depot", [True, False])
+@pytest.mark.parametrize("window", [(100, 200), (1000, 5000), (0, 300)])
+def test_depot_window_matches_ortools(window, return_to_depot):
+    earliest, latest = window
+    windows = [TimeWindow(earliest=earliest, latest=latest), None, TimeWindow(earliest=0, latest=1300)]
+    request = _line_request(5, time_windows=windows + [None, None], return_to_depot=return_to_depot)
+    exact = solve(request)
+    search = solve(request, exact_max_nodes=0)
+
+    assert exact.search_config == "EXACT_DP"
+    assert exact.dropped_visits == search.dropped_visits
+    assert exact.total_distance_meters == search.total_distance_meters
+    assert exact.total_duration_seconds == search.total_duration_seconds
+    # Leaves when the depot opens, 60 s per 100 m to the first stop
+    assert exact.estimated_arrivals[0] == earliest + 60 * exact.visit_order[0]
+
+
+def test_larger_models_go_to_ortools():
+    request = _line_request(8)
+    assert solve(request, exact_max_nodes=7).search_config != "EXACT_DP"
+    assert solve(request, exact_max_nodes=8).search_config == "EXACT_DP"
+    with pytest.raises(ValueError):
+        solve_exact(_build_data_model(_line_request(21)), open_route=False)
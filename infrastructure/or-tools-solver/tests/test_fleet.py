@@ -0,0 +1,63 @@
+"""Tests for the multi-vehicle fleet solve."""
+
+import math
+
+from app.fleet import solve_fleet
+from app.models import FleetOptimizeRequest, TimeWindow, Vehicle
+
+
+def _line(n: int = 11, **overrides) -> FleetOptimizeRequest:
+    """Nodes on a line 100 m / 60 s apart."""
+    return FleetOptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        solver_time_limit_seconds=2,
+        **overrides,
+    )
+
+
+def test_visits_go_to_the_nearer_driver():
+    # Two depots 5 km apart, each with three visits around it
+    points = [(0, 0), (0, 300), (300, 0), (-300, 0), (5000, 0), (5000, 300), (5300, 0), (4700, 0)]
+    meters = [[int(math.dist(a, b)) for b in points] for a in points]
+    result = solve_fleet(FleetOptimizeRequest(
+        distance_matrix=meters,
+        time_matrix=[[m // 10 for m in row] for row in meters],
+        vehicles=[Vehicle(start=0, end=0), Vehicle(start=4, end=4)],
+        solver_time_limit_seconds=2,
+    ))
+
+    assert [sorted(route.visit_order) for route in result.routes] == [[1, 2, 3], [5, 6, 7]]
+    assert result.total_distance_meters == sum(r.total_distance_meters for r in result.routes)
+    assert result.feasible and result.dropped_visits == []
+
+
+def test_capacities_and_shifts_are_respected():
+    windows = [None] * 11
+    windows[5] = TimeWindow(earliest=9000, latest=9500)
+    result = solve_fleet(_line(
+        vehicles=[
+            Vehicle(start=0, end=0, capacity=3, shift=TimeWindow(earliest=3600, latest=20000)),
+            Vehicle(start=10, capacity=4, max_duration=3000),
+        ],
+        time_windows=windows,
+        demands=[0] + [1] * 9 + [0],
+    ))
+
+    first, second = result.routes
+    assert first.load <= 3 and second.load <= 4
+    assert first.departure_seconds >= 3600
+    assert second.total_duration_seconds <= 3000
+    assert len(result.dropped_visits) == 9 - first.load - second.load
+    for route in result.routes:
+        if 5 in route.visit_order:
+            assert 9000 <= route.estimated_arrivals[route.visit_order.index(5)] <= 9500
+
+
+def test_vehicles_can_share_a_depot():
+    result = solve_fleet(_line(
+        n=7, vehicles=[Vehicle(capacity=3, end=0), Vehicle(capacity=3, end=0)]
+    ))
+
+    assert sorted(route.load for route in result.routes) == [3, 3]
+    assert sorted(sum((r.visit_order for r in result.routes), [])) == [1, 2, 3, 4, 5, 6]
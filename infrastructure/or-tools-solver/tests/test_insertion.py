@@ -0,0 +1,60 @@
+"""Tests for cheapest insertion into existing routes."""
+
+from app.evaluate import evaluate
+from app.insertion import insert_into_route, insert_visits
+from app.models import EvaluateRequest, InsertionRequest, RouteInsertionRequest, TimeWindow
+
+
+def _route(visit_order: list[int], new_visits: list[int], n: int = 6, **overrides):
+    return RouteInsertionRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        service_times=[0] + [30] * (n - 1),
+        visit_order=visit_order,
+        new_visits=new_visits,
+        **overrides,
+    )
+
+
+def test_inserts_at_the_cheapest_position():
+    result = insert_into_route(_route([1, 2, 4, 5], [3]))
+
+    assert result.visit_order == [1, 2, 3, 4, 5]
+    assert result.insertions[0].position == 2
+    assert result.distance_delta == 0  # on the way between 2 and 4
+    assert result.duration_delta == 30  # its service time
+    assert result.feasible and result.unplaced_visits == []
+
+
+def test_updated_etas_match_evaluating_the_new_order():
+    request = _route([5, 1], [3, 2, 4], return_to_depot=False)
+    result = insert_into_route(request)
+
+    [evaluation] = evaluate(EvaluateRequest(
+        **dict(request), orders=[result.visit_order]
+    )).results
+    assert sorted(result.visit_order) == [1, 2, 3, 4, 5]
+    assert result.estimated_arrivals == evaluation.estimated_arrivals
+    assert result.total_distance_meters == evaluation.total_distance_meters
+    assert sum(step.distance_delta for step in result.insertions) == result.distance_delta
+
+
+def test_respects_windows_and_reports_what_does_not_fit():
+    windows = [None] * 6
+    windows[4] = TimeWindow(earliest=0, latest=100)       # can't be reached in time
+    windows[3] = TimeWindow(earliest=1000, latest=1200)   # only fits after the others
+    result = insert_into_route(_route([1, 2], [3, 4], time_windows=windows))
+
+    assert result.visit_order == [1, 2, 3]
+    assert result.unplaced_visits == [4]
+    assert not result.feasible
+    assert result.estimated_arrivals[-1] == 1000  # waits for the window
+
+
+def test_names_the_cheapest_route():
+    far = _route([1, 2], [5])
+    near = _route([4, 5], [3])
+    response = insert_visits(InsertionRequest(routes=[far, near]))
+
+    assert response.results[1].distance_delta < response.results[0].distance_delta
+    assert response.best_route == 1
@@ -0,0 +1,115 @@
+"""Tests for the asynchronous job store."""
+
+import asyncio
+
+import pytest
+from app.jobs import JobLimitExceeded, JobStore
+from app.models import OptimizeRequest
+from app.pool import ClassLimits, PoolSaturated, SolverPool
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SolverPool(workers=1)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def _request(n: int, time_limit: int, adaptive: bool = True) -> OptimizeRequest:
+    points = [(i % 10, i // 10) for i in range(n)]
+    matrix = [[(abs(ax - bx) + abs(ay - by)) * 100 for bx, by in points] for ax, ay in points]
+    return OptimizeRequest(
+        distance_matrix=matrix,
+        time_matrix=[[cell // 10 for cell in row] for row in matrix],
+        solver_time_limit_seconds=time_limit,
+        adaptive_stopping=adaptive,
+    )
+
+
+async def _wait_finished(store: JobStore, job_id: str, timeout: float = 10):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while store.get(job_id).finished_at is None:
+        assert asyncio.get_running_loop().time() < deadline, "job did not finish"
+        await asyncio.sleep(0.05)
+    return store.get(job_id)
+
+
+def test_job_runs_to_completion(pool):
+    store = JobStore(pool, max_active=4, ttl_seconds=60)
+
+    async def scenario():
+        job = store.submit(_request(6, 1))
+        assert job.status in ("queued", "running")
+        return await _wait_finished(store, job.id)
+
+    job = asyncio.run(scenario())
+    assert job.status == "succeeded"
+    assert sorted(job.result.visit_order) == [1, 2, 3, 4, 5]
+
+
+def test_cancel_stops_running_search(pool):
+    store = JobStore(pool, max_active=4, ttl_seconds=60)
+
+    async def scenario():
+        running = store.submit(_request(60, 30, adaptive=False))
+        queued = store.submit(_request(6, 1))
+        await asyncio.sleep(1.5)
+        assert store.cancel(queued.id).status == "cancelled"
+        # Acknowledged at once, but the search still holds its worker
+        assert store.cancel(running.id).status == "cancelling"
+        assert pool.stats()["busy_workers"] == 1
+        started = asyncio.get_running_loop().time()
+        running = await _wait_finished(store, running.id)
+        assert pool.stats()["busy_workers"] == 0
+        queued = await _wait_finished(store, queued.id)
+        return running, queued, asyncio.get_running_loop().time() - started
+
+    running, queued, waited = asyncio.run(scenario())
+
+    assert running.status == "cancelled"
+    assert running.result is not None  # best route found before the stop
+    assert queued.status == "cancelled"
+    assert queued.result is None
+    assert waited < 5
+
+
+def test_job_limit_and_expiry(pool, monkeypatch):
+    store = JobStore(pool, max_active=1, ttl_seconds=60)
+
+    async def scenario():
+        job = store.submit(_request(5, 1))
+        with pytest.raises(JobLimitExceeded):
+            store.submit(_request(5, 1))
+        return await _wait_finished(store, job.id)
+
+    job = asyncio.run(scenario())
+    now = job.finished_at + 61
+    monkeypatch.setattr("app.jobs.time.time", lambda: now)
+    assert store.get(job.id) is None
+
+
+def test_rejected_job_releases_its_cancel_event():
+    pool = SolverPool(workers=1, limits={"planning": ClassLimits(max_running=1, max_queued=0)})
+    pool.start()
+    store = JobStore(pool, max_active=4, ttl_seconds=60)
+
+    async def scenario():
+        running = store.submit(_request(6, 1))
+        held = pool.manager()._number_of_objects()
+        try:
+            store.submit(_request(6, 1))
+        except PoolSaturated as e:
+            rejected = e
+        # Nothing left behind in the manager while `rejected` keeps the traceback alive
+        released = pool.manager()._number_of_objects()
+        await _wait_finished(store, running.id)
+        return held, released, rejected
+
+    try:
+        held, released, rejected = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert rejected.priority == "planning"
+    assert released == held
@@ -0,0 +1,476 @@
+"""Tests for the FastAPI endpoints, called directly against a live solver pool."""
+
+import asyncio
+import dataclasses
+import json
+import time
+from functools import partial
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app import main
+from app.models import (
+    BatchOptimizeRequest,
+    CoordinateOptimizeRequest,
+    EvaluateRequest,
+    FleetOptimizeRequest,
+    HandleOptimizeRequest,
+    InsertionRequest,
+    Location,
+    MatrixExtension,
+    MatrixUploadRequest,
+    OptimizeRequest,
+    RouteSessionRequest,
+    SessionUpdate,
+)
+from app.osrm import MatrixBuilder, OsrmClient, PairCache
+from app.portfolio import SEARCH_PORTFOLIO, solve_portfolio
+from app.solver import solve
+from benchmarks.osrm_stub import OsrmStub
+
+
+# OR-Tools even on small models, so a call holds its worker for the time limit
+_busy_solve = partial(solve, exact_max_nodes=0)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def solver_pool():
+    main.pool.start()
+    yield main.pool
+    main.pool.shutdown()
+
+
+def _payload(n: int = 4) -> dict:
+    return {
+        "distance_matrix": [[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        "time_matrix": [[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        "solver_time_limit_seconds": 1,
+    }
+
+
+async def _read_ndjson(response) -> list[dict]:
+    lines = []
+    async for chunk in response.body_iterator:
+        lines.extend(json.loads(line) for line in chunk.splitlines() if line)
+    return lines
+
+
+def test_optimize_rejects_ragged_matrix():
+    payload = _payload()
+    payload["time_matrix"][2] = [0, 1]
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.optimize(OptimizeRequest.model_validate(payload)))
+    assert exc.value.status_code == 400
+
+
+def test_batch_reports_each_item_separately():
+    ragged = _payload()
+    ragged["distance_matrix"][1] = [0]
+    batch = BatchOptimizeRequest(
+        requests=[_payload(4), ragged, {"distance_matrix": "nope"}, _payload(5)]
+    )
+
+    async def scenario():
+        response = await main.optimize_batch(batch)
+        return await _read_ndjson(response)
+
+    items = sorted(asyncio.run(scenario()), key=lambda item: item["index"])
+
+    assert [item["index"] for item in items] == [0, 1, 2, 3]
+    assert [item["status"] for item in items] == ["ok", "invalid", "invalid", "ok"]
+    assert sorted(items[0]["result"]["visit_order"]) == [1, 2, 3]
+    assert sorted(items[3]["result"]["visit_order"]) == [1, 2, 3, 4]
+    assert "distance_matrix row 1" in items[1]["error"]
+
+
+def test_cancelled_batch_drains_the_pool_queue():
+    def entry(scale: int) -> dict:
+        # Distinct OR-Tools-sized routes, so nothing is coalesced or cached
+        payload = _grid_payload(20, 2)
+        payload["distance_matrix"] = [[cell * scale for cell in row] for row in payload["distance_matrix"]]
+        return {**payload, "adaptive_stopping": False}
+
+    batch = BatchOptimizeRequest(requests=[entry(scale) for scale in range(3, 9)])
+
+    async def scenario():
+        response = await main.optimize_batch(batch)
+        reading = asyncio.ensure_future(response.body_iterator.__anext__())
+        await asyncio.sleep(0.2)
+        queued = main.pool.stats()["queue_depth"]
+        reading.cancel()  # client hangs up
+        await asyncio.gather(reading, return_exceptions=True)
+        await asyncio.sleep(0.1)
+        after = main.pool.stats()
+        while main.pool.stats()["busy_workers"]:
+            await asyncio.sleep(0.05)
+        return queued, after
+
+    queued, after = asyncio.run(scenario())
+
+    assert queued > 0
+    assert after["queue_depth"] == 0
+    assert after["busy_workers"] <= main.pool.workers
+
+
+def test_batch_size_limit(monkeypatch):
+    monkeypatch.setattr(main, "settings", dataclasses.replace(main.settings, max_batch_size=1))
+    batch = BatchOptimizeRequest(requests=[_payload(), _payload()])
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.optimize_batch(batch))
+    assert exc.value.status_code == 400
+
+
+def test_optimize_rejects_bad_initial_route():
+    for route in ([1, 4], [1, 1, 2]):
+        request = OptimizeRequest.model_validate({**_payload(), "initial_route": route})
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(main.optimize(request))
+        assert exc.value.status_code == 400
+
+
+def _grid_payload(n: int, time_limit: int) -> dict:
+    """Stops on a 10-wide grid: enough structure for several improving solutions."""
+    points = [(i % 10, i // 10) for i in range(n)]
+    matrix = [[(abs(ax - bx) + abs(ay - by)) * 100 for bx, by in points] for ax, ay in points]
+    return {
+        "distance_matrix": matrix,
+        "time_matrix": [[cell // 10 for cell in row] for row in matrix],
+        "solver_time_limit_seconds": time_limit,
+    }
+
+
+def test_stream_emits_improvements_then_final():
+    request = OptimizeRequest.model_validate(_grid_payload(30, 1))
+
+    async def scenario():
+        response = await main.optimize_stream(request)
+        return await _read_ndjson(response)
+
+    events = asyncio.run(scenario())
+
+    assert events[-1]["event"] == "final"
+    assert sorted(events[-1]["result"]["visit_order"]) == list(range(1, 30))
+    improvements = [event for event in events if event["event"] == "solution"]
+    assert improvements
+    objectives = [event["objective"] for event in improvements]
+    assert objectives == sorted(objectives, reverse=True)
+    assert all(len(event["result"]["estimated_arrivals"]) == 29 for event in improvements)
+
+
+def test_stream_disconnect_cancels_search():
+    request = OptimizeRequest.model_validate(
+        {**_grid_payload(60, 30), "adaptive_stopping": False}
+    )
+
+    async def scenario():
+        response = await main.optimize_stream(request)
+        body = response.body_iterator
+        first = json.loads(await body.__anext__())
+        await body.aclose()  # client hangs up
+        started = asyncio.get_running_loop().time()
+        while main.pool.stats()["busy_workers"]:
+            await asyncio.sleep(0.05)
+        return first, asyncio.get_running_loop().time() - started
+
+    first, wait = asyncio.run(scenario())
+
+    assert first["event"] == "solution"
+    assert wait < 5  # far less than the 30 s time limit
+
+
+def test_cancelled_optimize_stops_its_running_search():
+    request = OptimizeRequest.model_validate(
+        {**_grid_payload(60, 30), "adaptive_stopping": False}
+    )
+
+    async def scenario():
+        solving = asyncio.ensure_future(main.optimize(request))
+        while not main.pool.stats()["busy_workers"]:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(1)
+        solving.cancel()  # client hangs up, and nobody else waits on this route
+        await asyncio.gather(solving, return_exceptions=True)
+        started = asyncio.get_running_loop().time()
+        while main.pool.stats()["busy_workers"]:
+            await asyncio.sleep(0.05)
+        return asyncio.get_running_loop().time() - started
+
+    wait = asyncio.run(scenario())
+
+    assert wait < 5  # far less than the 30 s time limit
+    assert main.cache.get(main.request_key(request)) is None
+
+
+def test_optimize_timings_are_opt_in():
+    plain = asyncio.run(main.optimize(OptimizeRequest(**_payload(5))))
+    assert plain.timings is None
+
+    timed = asyncio.run(main.optimize(OptimizeRequest(**_payload(5), include_timings=True)))
+    timings = timed.timings
+    assert timings is not None
+    assert timings.validation_seconds is not None
+    assert timings.first_solution_seconds is not None
+    assert timings.total_seconds >= timings.model_build_seconds + timings.search_seconds
+
+
+def test_metrics_export_phases_and_outcomes():
+    asyncio.run(main.optimize(OptimizeRequest(**_payload(6))))
+    response = asyncio.run(main.prometheus_metrics())
+    body = response.body.decode()
+
+    assert response.media_type.startswith("text/plain")
+    assert 'solver_phase_seconds_count{phase="model_build"}' in body
+    assert 'solver_phase_seconds_count{phase="validation"}' in body
+    assert 'solver_solves_total{status="' in body
+    assert 'solver_phase_seconds_bucket{phase="search",le="+Inf"}' in body
+    assert "solver_pool_workers " in body
+    assert "# HELP solver_pool_workers " in body
+    assert "# TYPE solver_pool_completed_total counter" in body
+
+
+def test_ready_reports_free_capacity_and_turns_away_when_full():
+    def probe() -> tuple[int, dict]:
+        response = asyncio.run(main.ready())
+        return response.status_code, json.loads(response.body)
+
+    status, body = probe()
+    assert status == 200
+    assert body["status"] == "ready"
+    assert body["free_workers"] == main.pool.workers
+
+    async def saturated():
+        request = OptimizeRequest(**_payload(5), adaptive_stopping=False)
+        jobs = [
+            asyncio.ensure_future(main.pool.run(_busy_solve, request))
+            for _ in range(main.pool.workers)
+        ]
+        await asyncio.sleep(0)
+        response = await main.ready()
+        await asyncio.gather(*jobs)
+        return response.status_code, json.loads(response.body)
+
+    status, body = asyncio.run(saturated())
+    assert status == 503
+    assert body["status"] == "busy"
+    assert body["free_workers"] == 0
+
+
+def test_optimize_returns_429_with_retry_after_when_its_class_is_full(monkeypatch):
+    monkeypatch.setitem(main.pool.limits, "interactive", main.ClassLimits(1, 0))
+
+    async def scenario():
+        request = OptimizeRequest(**_payload(5), adaptive_stopping=False)
+        jobs = [
+            asyncio.ensure_future(main.pool.run(_busy_solve, request, priority="interactive"))
+            for _ in range(main.pool.workers)
+        ]
+        await asyncio.sleep(0)
+        try:
+            # A size no other test solves, so the result cache can't answer it
+            await main.optimize(OptimizeRequest(**_payload(9)))
+        finally:
+            await asyncio.gather(*jobs)
+
+    with pytest.raises(HTTPException) as rejected:
+        asyncio.run(scenario())
+    assert rejected.value.status_code == 429
+    assert int(rejected.value.headers["Retry-After"]) >= 1
+
+
+def test_queue_wait_is_reported_apart_from_solve_time():
+    timings = asyncio.run(
+        main.optimize(OptimizeRequest(**_payload(7), include_timings=True))
+    ).timings
+    assert timings.queue_wait_seconds is not None
+    assert timings.queue_wait_seconds < timings.total_seconds
+
+
+def test_ready_waits_for_warm_up(monkeypatch):
+    monkeypatch.setattr(main.pool, "warm_state", "warming")
+    response = asyncio.run(main.ready())
+    assert response.status_code == 503
+    assert json.loads(response.body)["status"] == "warming"
+    assert asyncio.run(main.health())["status"] == "ok"  # still alive
+
+
+def test_optimize_decomposes_on_the_pool():
+    payload = {**_grid_payload(30, 1), "cluster_size": 10}
+    result = asyncio.run(main.optimize(OptimizeRequest.model_validate(payload)))
+    assert sorted(result.visit_order + result.dropped_visits) == list(range(1, 30))
+
+
+def test_stream_and_jobs_reject_fan_out_modes():
+    for option in ({"cluster_size": 10}, {"portfolio": 2}):
+        request = OptimizeRequest.model_validate({**_payload(), **option})
+        for endpoint in (main.optimize_stream, main.submit_job):
+            with pytest.raises(HTTPException) as exc:
+                asyncio.run(endpoint(request))
+            assert exc.value.status_code == 400
+
+
+def test_portfolio_fits_its_class_running_limit(monkeypatch):
+    # More workers than the planning class may use at once
+    monkeypatch.setattr(main.pool, "workers", 3)
+    monkeypatch.setitem(main.pool.limits, "planning", main.ClassLimits(1, 10))
+    sizes = []
+
+    async def recorded(request, run, max_parallel):
+        sizes.append(max_parallel)
+        return await solve_portfolio(request, run, max_parallel)
+
+    monkeypatch.setattr(main, "solve_portfolio", recorded)
+    request = OptimizeRequest(**_grid_payload(20, 1), portfolio=3, priority="planning")
+    started = time.perf_counter()
+    result = asyncio.run(main.optimize(request))
+
+    assert sizes == [1]
+    assert result.search_config == "/".join(SEARCH_PORTFOLIO[0])
+    assert time.perf_counter() - started < 3  # one time limit, not one per configuration
+
+
+def test_optimize_rejects_oversized_portfolio():
+    request = OptimizeRequest.model_validate({**_payload(), "portfolio": 99})
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.optimize(request))
+    assert exc.value.status_code == 400
+
+
+def test_optimize_from_coordinates_fetches_matrices_once(monkeypatch):
+    with OsrmStub() as osrm:
+        builder = MatrixBuilder(OsrmClient(osrm.url), PairCache(1000, 3600))
+        monkeypatch.setattr(main, "matrices", builder)
+        request = CoordinateOptimizeRequest(
+            locations=[{"lat": -16.5, "lon": -68.15 + 0.01 * i} for i in range(5)],
+            solver_time_limit_seconds=1,
+        )
+        first = asyncio.run(main.optimize_coordinates(request))
+        again = asyncio.run(main.optimize_coordinates(request))
+
+        assert first.visit_order in ([1, 2, 3, 4], [4, 3, 2, 1])
+        assert again == first
+        assert osrm.calls == 1
+
+        osrm.fail_with = "NoTable"
+        new_stop = request.locations + [Location(lat=-16.4, lon=-68.1)]
+        moved = request.model_copy(update={"locations": new_stop})
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(main.optimize_coordinates(moved))
+        assert exc.value.status_code == 502
+
+
+def test_evaluate_scores_orders_and_rejects_bad_ones():
+    request = EvaluateRequest(**_payload(4), orders=[[1, 2, 3], [3, 2, 1]])
+    forward, backward = asyncio.run(main.evaluate_orders(request)).results
+    assert forward.total_distance_meters == backward.total_distance_meters == 600
+
+    for orders in ([[1, 1]], [[0, 2]], [[4]]):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(main.evaluate_orders(request.model_copy(update={"orders": orders})))
+        assert exc.value.status_code == 400
+
+
+def test_fleet_returns_a_route_per_vehicle_and_checks_nodes():
+    payload = {**_payload(6), "vehicles": [{"start": 0, "end": 0}, {"start": 5}]}
+    response = asyncio.run(main.optimize_fleet(FleetOptimizeRequest(**payload)))
+    assert [route.vehicle for route in response.routes] == [0, 1]
+    assert sorted(sum((route.visit_order for route in response.routes), [])) == [1, 2, 3, 4]
+    assert response.timings is None
+
+    bad = FleetOptimizeRequest(**{**payload, "vehicles": [{"start": 0, "end": 6}]})
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.optimize_fleet(bad))
+    assert exc.value.status_code == 400
+
+
+def test_insert_places_new_visits_and_rejects_overlaps():
+    route = {**_payload(5), "visit_order": [1, 2, 4], "new_visits": [3]}
+    response = asyncio.run(main.insert(InsertionRequest(routes=[route])))
+    assert response.results[0].visit_order == [1, 2, 3, 4]
+    assert response.best_route == 0
+
+    overlapping = InsertionRequest(routes=[{**route, "new_visits": [2]}])
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.insert(overlapping))
+    assert exc.value.status_code == 400
+
+
+def test_optimize_by_handle_matches_inline_matrices():
+    payload = _payload(8)
+    registered = asyncio.run(main.register_matrices(MatrixUploadRequest(
+        distance_matrix=payload["distance_matrix"], time_matrix=payload["time_matrix"]
+    )))
+    assert registered.nodes == 8
+
+    nodes = [0, 2, 5, 7]
+    inline = asyncio.run(main.optimize(OptimizeRequest(
+        distance_matrix=[[payload["distance_matrix"][i][j] for j in nodes] for i in nodes],
+        time_matrix=[[payload["time_matrix"][i][j] for j in nodes] for i in nodes],
+        solver_time_limit_seconds=1,
+    )))
+    by_handle = asyncio.run(main.optimize_handle(HandleOptimizeRequest(
+        matrix_handle=registered.handle, nodes=nodes, solver_time_limit_seconds=1
+    ), Response()))
+    assert by_handle.visit_order == inline.visit_order
+    assert by_handle.total_distance_meters == inline.total_distance_meters
+
+    # One new stop, 100 m past node 7: its row and column only
+    response = Response()
+    extended = asyncio.run(main.optimize_handle(HandleOptimizeRequest(
+        matrix_handle=registered.handle,
+        nodes=[0, 7, 8],
+        extension=MatrixExtension(
+            distance_from=[[100 * (8 - j) for j in range(9)]],
+            distance_to=[[100 * (8 - i) for i in range(8)]],
+            time_from=[[60 * (8 - j) for j in range(9)]],
+            time_to=[[60 * (8 - i) for i in range(8)]],
+        ),
+        solver_time_limit_seconds=1,
+    ), response))
+    # Out along the line and back: either direction is optimal
+    assert extended.visit_order in ([1, 2], [2, 1])
+    assert extended.total_distance_meters == 1600
+    assert asyncio.run(main.get_matrices(response.headers["X-Matrix-Handle"])).nodes == 9
+
+    asyncio.run(main.delete_matrices(registered.handle))
+    with pytest.raises(HTTPException) as missing:
+        asyncio.run(main.optimize_handle(
+            HandleOptimizeRequest(matrix_handle=registered.handle), Response()
+        ))
+    assert missing.value.status_code == 404
+
+
+def test_session_endpoints_apply_events_and_reject_bad_ones():
+    state = asyncio.run(main.open_session(
+        RouteSessionRequest(**_payload(5), visit_order=[1, 2, 3, 4])
+    ))
+    assert state.visit_order == [1, 2, 3, 4]
+
+    updated = asyncio.run(main.update_session(state.session_id, SessionUpdate.model_validate({
+        "events": [{"type": "completed", "visit": 1, "at_seconds": 700}],
+        "reoptimize": False,
+    })))
+    assert updated.visit_order == [2, 3, 4]
+    assert updated.estimated_arrivals[0] == 760
+
+    for session_id, events, status in (
+        (state.session_id, [{"type": "removed", "visit": 1}], 400),
+        ("missing", [{"type": "delay", "seconds": 60}], 404),
+    ):
+        with pytest.raises(HTTPException) as rejected:
+            asyncio.run(main.update_session(
+                session_id, SessionUpdate.model_validate({"events": events})
+            ))
+        assert rejected.value.status_code == status
+    asyncio.run(main.close_session(state.session_id))
+
+
+def test_session_solver_failure_is_a_500(monkeypatch):
+    async def failing(request):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(main.sessions, "open", failing)
+    with pytest.raises(HTTPException) as failed:
+        asyncio.run(main.open_session(RouteSessionRequest(**_payload(5))))
+    assert failed.value.status_code == 500
+    assert failed.value.detail == "Solver error: worker died"
@@ -0,0 +1,66 @@
+"""Tests for the Prometheus metrics registry."""
+
+from app.metrics import Counter, Histogram, SolverMetrics
+from app.models import OptimizeRequest
+from app.solver import solve
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("h", "help", (0.1, 1.0), label="phase")
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "search")
+    lines = histogram.render()
+    assert 'h_bucket{phase="search",le="0.1"} 1' in lines
+    assert 'h_bucket{phase="search",le="1.0"} 2' in lines
+    assert 'h_bucket{phase="search",le="+Inf"} 3' in lines
+    assert 'h_count{phase="search"} 3' in lines
+
+
+def test_unlabelled_counter_renders_zero():
+    assert Counter("c_total", "help").render()[-1] == "c_total 0"
+
+
+def test_observe_solve_records_every_phase():
+    n = 6
+    request = OptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        solver_time_limit_seconds=1,
+    )
+    metrics = SolverMetrics()
+    metrics.observe_solve(request, solve(request))
+
+    for phase in ("data_model", "model_build", "first_solution", "search", "extraction"):
+        assert metrics.phase_seconds.count(phase) == 1
+    assert metrics.nodes.count() == 1
+    assert metrics.dropped_visits.value() == 0
+    assert sum(metrics.solves._values.values()) == 1
+    assert "solver_cache_hits_total 3" in metrics.render({"cache": {"hits": 3, "enabled": True}})
+
+
+def test_stats_export_with_help_and_counter_types():
+    lines = SolverMetrics().render({
+        "cache": {"size": 2, "hits": 3},
+        "pool": {"batch_queued": 1, "batch_rejected": 4},
+        "jobs": {"running": 1},
+        "extra": {"widgets": 5},
+    }).splitlines()
+
+    assert "# TYPE solver_cache_size gauge" in lines
+    assert "# TYPE solver_cache_hits_total counter" in lines
+    assert "solver_cache_hits_total 3" in lines
+    assert "# TYPE solver_pool_batch_queued gauge" in lines
+    assert (
+        "# HELP solver_pool_batch_rejected_total "
+        "Solves turned away with a full queue in the batch class"
+    ) in lines
+    assert "solver_pool_batch_rejected_total 4" in lines
+    assert "# TYPE solver_extra_widgets gauge" in lines
+    # Every exported series has HELP and TYPE lines for its metric
+    described = {line.split()[2] for line in lines if line.startswith("# HELP")}
+    typed = {line.split()[2] for line in lines if line.startswith("# TYPE")}
+    samples = {line.split("{")[0].split()[0] for line in lines if not line.startswith("#")}
+    assert described == typed
+    assert all(
+        sample in typed or sample.rsplit("_", 1)[0] in typed for sample in samples
+    )
@@ -0,0 +1,96 @@
+"""Tests for the OSRM table client and the pairwise travel cache."""
+
+import asyncio
+
+import numpy as np
+import pytest
+from app.models import Location
+from app.osrm import MatrixBuilder, OsrmClient, OsrmError, PairCache, _coordinate, _plan, snap
+from benchmarks.osrm_stub import OsrmStub
+
+
+@pytest.fixture
+def osrm():
+    with OsrmStub() as stub:
+        yield stub
+
+
+def _locations(n: int, offset: int = 0) -> list[Location]:
+    return [Location(lat=-16.5 + 0.001 * (i + offset), lon=-68.15 + 0.002 * i) for i in range(n)]
+
+
+def _builder(osrm: OsrmStub, **cache) -> MatrixBuilder:
+    options = {"max_pairs": 10_000, "ttl_seconds": 3600, **cache}
+    return MatrixBuilder(OsrmClient(osrm.url), PairCache(**options))
+
+
+def test_snap_rounds_to_about_a_meter():
+    a = Location(lat=-16.500001, lon=-68.150004)
+    assert snap(a) == snap(Location(lat=-16.5, lon=-68.15))
+    assert _coordinate(snap(a)) == "-68.15000,-16.50000"
+    assert snap(a) != snap(Location(lat=-16.50001, lon=-68.15))
+
+
+def test_plan_fetches_rows_and_columns_of_new_stops():
+    missing = np.zeros((6, 6), dtype=bool)
+    missing[4, :] = missing[:, 4] = True
+    np.fill_diagonal(missing, False)
+    assert _plan(missing) == [([4], None), ([0, 1, 2, 3, 5], [4])]
+
+    scattered = np.zeros((6, 6), dtype=bool)
+    scattered[1, 2] = scattered[3, 2] = True
+    assert _plan(scattered) == [([1, 3], [2])]
+
+    everything = ~np.eye(6, dtype=bool)
+    assert _plan(everything) == [(None, None)]
+
+
+def test_known_pairs_are_not_fetched_again(osrm):
+    builder = _builder(osrm)
+    distance, duration = asyncio.run(builder.build(_locations(5)))
+    assert osrm.calls == 1 and osrm.cells == 25
+    assert distance[0][0] == 0 and distance[0][1] > 0 and duration[1][0] > 0
+
+    again = asyncio.run(builder.build(list(reversed(_locations(5)))))
+    assert osrm.calls == 1
+    assert again[0] == [row[::-1] for row in distance[::-1]]
+
+    # One new stop: its row and column only
+    asyncio.run(builder.build(_locations(5) + [Location(lat=-16.4, lon=-68.1)]))
+    assert osrm.calls == 3 and osrm.cells == 25 + 6 + 5
+
+
+def test_duplicate_locations_share_a_key(osrm):
+    locations = _locations(3)
+    distance, _ = asyncio.run(_builder(osrm).build(locations + [locations[1]]))
+    assert distance[1][3] == distance[3][1] == 0
+    assert distance[0][3] == distance[0][1]
+    assert osrm.cells == 9
+
+
+def test_expired_pairs_are_refetched(osrm):
+    builder = _builder(osrm, ttl_seconds=0)
+    asyncio.run(builder.build(_locations(4)))
+    asyncio.run(builder.build(_locations(4)))
+    assert osrm.calls == 2
+    assert builder.cache.expirations == 12
+
+
+def test_disk_store_survives_a_restart(osrm, tmp_path):
+    path = str(tmp_path / "pairs.sqlite")
+    first = _builder(osrm, path=path)
+    expected = asyncio.run(first.build(_locations(4)))
+    first.cache.close()
+
+    second = _builder(osrm, path=path)
+    assert second.cache.stats()["size"] == 12
+    assert asyncio.run(second.build(_locations(4))) == expected
+    assert osrm.calls == 1
+
+
+def test_osrm_failure_raises(osrm):
+    osrm.fail_with = "InvalidQuery"
+    with pytest.raises(OsrmError, match="InvalidQuery"):
+        asyncio.run(_builder(osrm).build(_locations(3)))
+    with pytest.raises(OsrmError, match="request failed"):
+        OsrmClient("http://127.0.0.1:9", timeout_seconds=1).table([snap(_locations(1)[0])] * 2)
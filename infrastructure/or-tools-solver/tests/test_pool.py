@@ -0,0 +1,140 @@
+"""Tests for the solver process pool."""
+
+import asyncio
+import time
+from functools import partial
+
+import pytest
+from app.models import OptimizeRequest
+from app.pool import ClassLimits, PoolSaturated, SolverPool
+from app.solver import solve
+
+
+# OR-Tools even on small models, so a call holds its worker for the time limit
+_search = partial(solve, exact_max_nodes=0)
+
+
+def _request(time_limit: int = 1) -> OptimizeRequest:
+    n = 5
+    return OptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        solver_time_limit_seconds=time_limit,
+        adaptive_stopping=False,
+    )
+
+
+def test_pool_solves_off_the_event_loop():
+    """The loop keeps ticking while a worker process runs the search."""
+    pool = SolverPool(workers=1)
+    pool.start()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.05)
+
+        ticking = asyncio.create_task(ticker())
+        result = await pool.run(_search, _request())
+        ticking.cancel()
+        return result, ticks
+
+    try:
+        result, ticks = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert sorted(result.visit_order) == [1, 2, 3, 4]
+    assert ticks >= 10  # ~1 s of search at 50 ms per tick
+    assert pool.stats()["completed"] == 1
+
+
+def test_pool_stats_report_busy_and_queued():
+    pool = SolverPool(workers=1)
+    pool.start()
+
+    async def scenario():
+        jobs = [asyncio.ensure_future(pool.run(_search, _request())) for _ in range(3)]
+        await asyncio.sleep(0)
+        during = pool.stats()
+        await asyncio.gather(*jobs)
+        return during, pool.stats()
+
+    try:
+        during, after = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert during["busy_workers"] == 1
+    assert during["queue_depth"] == 2
+    assert after["busy_workers"] == 0
+    assert after["queue_depth"] == 0
+    assert after["completed"] == 3
+
+
+def test_pool_requires_start():
+    with pytest.raises(RuntimeError):
+        asyncio.run(SolverPool(workers=1).run(_search, _request()))
+
+
+def test_warm_spawns_and_solves_on_every_worker():
+    pool = SolverPool(workers=2)
+    pool.start()
+    try:
+        reports = asyncio.run(pool.warm())
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+
+    assert len({report["pid"] for report in reports}) == 2
+    assert all(report["first_solve_seconds"] > 0 for report in reports)
+    assert stats["warm_state"] == "warm"
+    assert stats["warm_workers"] == 2
+    assert stats["completed"] == 0  # warm-ups are not counted as solves
+    assert pool.warm_state == "cold"  # after shutdown
+
+
+def test_interactive_work_jumps_the_batch_queue():
+    pool = SolverPool(workers=1)
+    pool.start()
+    try:
+        busy = pool.submit(time.sleep, 0.5, priority="planning")
+        batch = pool.submit(time.time, priority="batch")
+        interactive = pool.submit(time.time, priority="interactive")
+        during = pool.stats()
+        busy.result()
+        batch_ran, interactive_ran = batch.result(), interactive.result()
+    finally:
+        pool.shutdown()
+
+    assert during["planning_running"] == 1
+    assert during["batch_queued"] == 1
+    assert during["interactive_queued"] == 1
+    assert interactive_ran < batch_ran
+    assert interactive.queue_wait_seconds > 0.3  # waited behind the sleep, not the batch call
+
+
+def test_full_class_queue_is_rejected_with_a_retry_hint():
+    pool = SolverPool(workers=1, limits={"planning": ClassLimits(max_running=1, max_queued=1)})
+    pool.start()
+    try:
+        running = pool.submit(time.sleep, 0.5, priority="planning", cost_seconds=3)
+        queued = pool.submit(time.sleep, 0, priority="planning", cost_seconds=3)
+        with pytest.raises(PoolSaturated) as rejected:
+            pool.submit(time.sleep, 0, priority="planning", cost_seconds=3)
+        # Other classes keep their own queues
+        interactive = pool.submit(time.time, priority="interactive")
+        stats = pool.stats()
+        for future in (running, queued, interactive):
+            future.result()
+    finally:
+        pool.shutdown()
+
+    assert rejected.value.priority == "planning"
+    assert rejected.value.retry_after_seconds == 3
+    assert stats["planning_rejected"] == 1
+    assert stats["interactive_queued"] == 1
@@ -0,0 +1,59 @@
+"""Tests for portfolio search."""
+
+import asyncio
+
+from app.exact import EXACT_SEARCH_CONFIG
+from app.portfolio import SEARCH_PORTFOLIO, solve_portfolio
+from app.solver import solve
+from benchmarks.instances import InstanceSpec, make_instance
+
+
+def _request(portfolio: int):
+    request = make_instance(InstanceSpec("uniform", "tight", "open", 20), time_limit_seconds=1)
+    return request.model_copy(update={"portfolio": portfolio})
+
+
+def test_default_solve_reports_its_configuration():
+    result = solve(_request(2))
+    assert result.search_config == "/".join(SEARCH_PORTFOLIO[0])
+
+
+def test_portfolio_returns_the_best_configuration():
+    calls = []
+
+    async def run(fn, *args):
+        result = fn(*args)
+        calls.append(result)
+        return result
+
+    best = asyncio.run(solve_portfolio(_request(3), run, max_parallel=4))
+
+    assert [result.search_config for result in calls] == [
+        "/".join(config) for config in SEARCH_PORTFOLIO[:3]
+    ]
+    ranks = [(len(r.dropped_visits), r.total_distance_meters) for r in calls]
+    assert (len(best.dropped_visits), best.total_distance_meters) == min(ranks)
+
+
+def test_portfolio_is_capped_at_the_pool_size():
+    calls = []
+
+    async def run(fn, *args):
+        calls.append(args[1])
+        return fn(*args)
+
+    asyncio.run(solve_portfolio(_request(5), run, max_parallel=2))
+    assert calls == list(SEARCH_PORTFOLIO[:2])
+
+
+def test_small_models_are_solved_once_without_a_race():
+    calls = []
+
+    async def run(fn, *args):
+        calls.append(fn)
+        return fn(*args)
+
+    request = make_instance(InstanceSpec("uniform", "tight", "open", 8), time_limit_seconds=1)
+    result = asyncio.run(solve_portfolio(request.model_copy(update={"portfolio": 4}), run, 4))
+    assert calls == [solve]
+    assert result.search_config == EXACT_SEARCH_CONFIG
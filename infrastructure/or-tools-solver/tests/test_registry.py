@@ -0,0 +1,79 @@
+"""Tests for the server-side matrix registry."""
+
+import numpy as np
+import pytest
+from app.registry import MatrixRegistry, UnknownMatrix
+
+
+def _matrices(n: int, scale: int = 1) -> tuple[list[list[int]], list[list[int]]]:
+    distance = [[abs(i - j) * 100 * scale for j in range(n)] for i in range(n)]
+    time = [[abs(i - j) * 60 * scale for j in range(n)] for i in range(n)]
+    return distance, time
+
+
+def test_same_matrices_get_the_same_handle_and_one_copy():
+    registry = MatrixRegistry(max_bytes=10_000)
+    handle = registry.register(*_matrices(4))
+    assert registry.register(*_matrices(4)) == handle
+    assert registry.register(*_matrices(4, scale=2)) != handle
+    assert registry.stats()["bytes"] == 2 * (2 * 4 * 4 * 4)
+
+
+def test_subset_picks_rows_and_columns_in_node_order():
+    registry = MatrixRegistry(max_bytes=10_000)
+    handle = registry.register(*_matrices(5))
+    distance, time = registry.subset(handle, [3, 0, 4])
+    assert distance.tolist() == [[0, 300, 100], [300, 0, 400], [100, 400, 0]]
+    assert time[0, 2] == 60
+    with pytest.raises(ValueError):
+        registry.subset(handle, [0, 5])
+    with pytest.raises(ValueError):
+        registry.subset(handle, [0, 1, 1])
+
+
+def test_extension_appends_stops_and_keeps_the_base():
+    registry = MatrixRegistry(max_bytes=10_000)
+    distance, time = _matrices(3)
+    base = registry.register(distance, time)
+    # New stop 3 sits 50 m past node 2
+    extended = registry.extend(
+        base,
+        distance_from=[[250, 150, 50, 0]],
+        distance_to=[[260, 160, 60]],
+        time_from=[[150, 90, 30, 0]],
+        time_to=[[156, 96, 36]],
+    )
+    full_distance, full_time = registry.subset(extended, None)
+    assert full_distance[:3, :3].tolist() == distance
+    assert full_distance[3].tolist() == [250, 150, 50, 0]
+    assert full_distance[:, 3].tolist() == [260, 160, 60, 0]
+    assert full_time[1, 3] == 96
+    assert registry.describe(base)["nodes"] == 3
+    with pytest.raises(ValueError):
+        registry.extend(base, [[1, 2, 3]], [[1, 2, 3]], [[1, 2, 3, 0]], [[1, 2, 3]])
+
+
+def test_least_recently_used_matrix_is_evicted_first():
+    one = 2 * 4 * 4 * 4
+    registry = MatrixRegistry(max_bytes=2 * one)
+    first = registry.register(*_matrices(4))
+    second = registry.register(*_matrices(4, scale=2))
+    registry.get(first)
+    registry.register(*_matrices(4, scale=3))
+
+    assert registry.get(first) is not None
+    with pytest.raises(UnknownMatrix):
+        registry.get(second)
+    assert registry.stats()["evictions"] == 1
+    with pytest.raises(ValueError):
+        MatrixRegistry(max_bytes=one - 1).register(*_matrices(4))
+
+
+def test_registered_matrices_are_read_only_int32():
+    registry = MatrixRegistry(max_bytes=10_000)
+    distance, _ = registry.subset(registry.register(*_matrices(3)), None)
+    assert distance.dtype == np.int32
+    with pytest.raises(ValueError):
+        distance[0, 1] = 7
+    with pytest.raises(ValueError):
+        registry.register([[0, 2**31]], [[0, 0]])
@@ -0,0 +1,225 @@
+"""Tests for stateful route sessions."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from app import sessions
+from app.insertion import insert_into_route
+from app.models import (
+    Delay,
+    MatrixExtension,
+    PositionUpdate,
+    RouteSessionRequest,
+    TimeWindow,
+    VisitAdded,
+    VisitCompleted,
+    VisitRemoved,
+)
+from app.pool import SolverPool
+from app.sessions import RouteSession, SessionLimitExceeded, SessionStore
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SolverPool(workers=1)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def _request(n: int = 5, **options) -> RouteSessionRequest:
+    """Depot at 0 and visits on a line, 100 m / 60 s apart, 60 s service."""
+    return RouteSessionRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        service_times=[0] + [60] * (n - 1),
+        solver_time_limit_seconds=1,
+        **options,
+    )
+
+
+def test_planned_route_is_scored_from_departure():
+    state = RouteSession(_request(visit_order=[1, 2, 3, 4], departure_seconds=1000)).to_state()
+    assert state.estimated_arrivals == [1060, 1180, 1300, 1420]
+    assert state.finish_seconds == 1420 + 60 + 240
+    assert state.remaining_distance_meters == 800
+    assert state.feasible
+
+
+def test_completed_visit_and_delay_move_the_remaining_etas():
+    session = RouteSession(_request(visit_order=[1, 2, 3, 4]))
+    session.apply(VisitCompleted(type="completed", visit=1, at_seconds=200))
+    session.apply(Delay(type="delay", seconds=100))
+    session.refresh()
+    state = session.to_state()
+
+    assert state.completed_visits == [1]
+    assert state.location == 1
+    assert state.visit_order == [2, 3, 4]
+    # Leaves node 1 at 300 s, 60 s per leg plus 60 s service at each stop
+    assert state.estimated_arrivals == [360, 480, 600]
+    assert state.remaining_distance_meters == 300 + 400  # on to 4, then back to the depot
+
+
+def test_closed_windows_and_max_duration_are_measured_from_the_clock():
+    session = RouteSession(_request(
+        visit_order=[1, 2, 3, 4],
+        time_windows=[None, None, TimeWindow(earliest=0, latest=300), None, None],
+        max_route_duration=1000,
+        departure_seconds=100,
+    ))
+    assert session.to_state().late_visits == []  # reached at 280, window closes at 300
+    session.apply(Delay(type="delay", seconds=300))
+    session.refresh()
+    assert session.to_state().late_visits == [2]
+
+    request, _ = session.suffix_request()
+    assert request.max_route_duration == 700
+    assert request.time_windows[2] == TimeWindow(earliest=0, latest=0)
+
+
+def test_position_update_replaces_the_origin_row():
+    session = RouteSession(_request(visit_order=[1, 2, 3, 4]))
+    # Halfway between 2 and 3
+    session.apply(PositionUpdate(
+        type="position", at_seconds=500,
+        distance_from=[250, 150, 50, 50, 150], time_from=[150, 90, 30, 30, 90],
+    ))
+    session.apply(VisitRemoved(type="removed", visit=1))
+    session.apply(VisitRemoved(type="removed", visit=2))
+    session.refresh()
+    state = session.to_state()
+    assert state.location is None
+    assert state.estimated_arrivals == [530, 650]
+
+
+def test_added_stop_is_inserted_where_it_costs_least():
+    session = RouteSession(_request(visit_order=[1, 2, 3, 4]))
+    # Node 5 sits between 2 and 3
+    session.apply(VisitAdded(
+        type="added",
+        travel=MatrixExtension(
+            distance_from=[[250, 150, 50, 50, 150, 0]],
+            distance_to=[[250, 150, 50, 50, 150]],
+            time_from=[[150, 90, 30, 30, 90, 0]],
+            time_to=[[150, 90, 30, 30, 90]],
+        ),
+        service_times=[30],
+    ))
+    session.refresh()
+    state = session.to_state()
+    assert state.visit_order == [1, 2, 5, 3, 4]
+    assert state.remaining_distance_meters == 800  # on the way: no extra distance
+    assert session.num_nodes == 6
+
+
+def test_failed_event_batch_leaves_the_session_unchanged(pool):
+    store = SessionStore(pool, max_sessions=4, ttl_seconds=60)
+
+    async def scenario():
+        session = await store.open(_request(visit_order=[1, 2, 3, 4]))
+        with pytest.raises(ValueError):
+            await store.update(session.id, [
+                VisitCompleted(type="completed", visit=1, at_seconds=100),
+                VisitCompleted(type="completed", visit=1, at_seconds=200),
+            ], reoptimize=False)
+        return session.to_state()
+
+    state = asyncio.run(scenario())
+    assert state.visit_order == [1, 2, 3, 4]
+    assert state.completed_visits == []
+    assert state.version == 0
+
+
+def test_events_answer_at_once_and_the_resolve_lands_later(pool):
+    store = SessionStore(pool, max_sessions=1, ttl_seconds=60)
+
+    async def scenario():
+        # A bad plan: the re-solve should straighten it out
+        session = await store.open(_request(7, visit_order=[4, 1, 6, 2, 5, 3]))
+        with pytest.raises(SessionLimitExceeded):
+            await store.open(_request())
+        updated = (await store.update(
+            session.id, [VisitCompleted(type="completed", visit=4, at_seconds=300)], True
+        )).to_state()
+        deadline = asyncio.get_running_loop().time() + 10
+        while store.get(session.id).solving is not None:
+            assert asyncio.get_running_loop().time() < deadline, "re-solve did not finish"
+            await asyncio.sleep(0.05)
+        return updated, store.get(session.id).to_state()
+
+    updated, resolved = asyncio.run(scenario())
+    assert updated.reoptimizing
+    assert updated.visit_order == [1, 6, 2, 5, 3]
+    assert resolved.version == updated.version + 1
+    assert resolved.remaining_distance_meters < updated.remaining_distance_meters
+    assert sorted(resolved.visit_order) == [1, 2, 3, 5, 6]
+    assert resolved.solver_status in ("OPTIMAL", "FEASIBLE")
+    assert store.stats()["resolves_applied"] == 1
+
+
+def test_resolve_superseded_before_its_task_starts_is_discarded(pool):
+    store = SessionStore(pool, max_sessions=1, ttl_seconds=60)
+
+    async def scenario():
+        session = await store.open(_request(7, visit_order=[4, 1, 6, 2, 5, 3]))
+        await store.update(
+            session.id, [VisitCompleted(type="completed", visit=4, at_seconds=300)], True
+        )
+        # Block the loop: the re-solve finishes before its watcher task first runs
+        time.sleep(1)
+        await store.update(
+            session.id, [VisitCompleted(type="completed", visit=1, at_seconds=500)], False
+        )
+        await asyncio.sleep(0.2)
+        return session.to_state()
+
+    state = asyncio.run(scenario())
+    assert state.visit_order == [6, 2, 5, 3]
+    assert store.stats()["resolves_applied"] == 0
+    assert store.stats()["resolves_superseded"] == 1
+
+
+def test_added_stops_are_inserted_off_the_event_loop(pool, monkeypatch):
+    store = SessionStore(pool, max_sessions=1, ttl_seconds=60)
+    threads = []
+
+    def recorded(request):
+        threads.append(threading.current_thread())
+        return insert_into_route(request)
+
+    monkeypatch.setattr(sessions, "insert_into_route", recorded)
+    added = VisitAdded(
+        type="added",
+        travel=MatrixExtension(
+            distance_from=[[250, 150, 50, 50, 150, 0]],
+            distance_to=[[250, 150, 50, 50, 150]],
+            time_from=[[150, 90, 30, 30, 90, 0]],
+            time_to=[[150, 90, 30, 30, 90]],
+        ),
+    )
+    delay = Delay(type="delay", seconds=60)
+
+    async def scenario():
+        session = await store.open(_request(visit_order=[1, 2, 3, 4]))
+        # Concurrent updates of one session are applied one after the other
+        await asyncio.gather(
+            store.update(session.id, [added], False),
+            store.update(session.id, [delay], False),
+        )
+        return session.to_state()
+
+    state = asyncio.run(scenario())
+    assert threads and threading.main_thread() not in threads
+    assert state.visit_order == [1, 2, 5, 3, 4]
+    assert state.clock_seconds == 60
+    assert state.version == 2
+
+
+def test_open_without_a_plan_solves_one(pool):
+    store = SessionStore(pool, max_sessions=4, ttl_seconds=60)
+    state = asyncio.run(store.open(_request(6))).to_state()
+    assert state.visit_order in ([1, 2, 3, 4, 5], [5, 4, 3, 2, 1])
+    assert state.remaining_distance_meters == 1000
@@ -1,8 +1,26 @@
 """Tests for the OR-Tools VRP solver."""
 
+import time
+
+import numpy as np
 import pytest
+from app import solver
 from app.models import OptimizeRequest, TimeWindow
-from app.solver import solve
+from app.solver import (
+    _build_data_model,
+    _greedy_route,
+    _routing_matrices,
+    _sparse_successors,
+    default_stall_seconds,
+    default_time_limit,
+    solve,
+)
+
+
+@pytest.fixture(params=[0, None], ids=["ortools", "exact"])
+def exact_max_nodes(request):
+    """Run a model-semantics test through both engines small models can take."""
+    return request.param
 
 
 def test_empty_route():
@@ -36,7 +54,7 @@ def test_single_visit():
     assert result.feasible is True
 
 
-def test_three_visits_optimal_order():
+def test_three_visits_optimal_order(exact_max_nodes):
     """3 visits in a line: depot → A → B → C should be optimal
     when distances form a clear sequential path.
 
@@ -65,7 +83,7 @@ def test_three_visits_optimal_order():
         ],
         service_times=[0, 300, 300, 300],  # 5 min per stop
     )
-    result = solve(request)
+    result = solve(request, exact_max_nodes=exact_max_nodes)
 
     assert len(result.visit_order) == 3
     assert result.feasible is True
@@ -76,7 +94,7 @@ def test_three_visits_optimal_order():
     assert result.visit_order == [1, 2, 3] or result.visit_order == [3, 2, 1]
 
 
-def test_time_windows_respected():
+def test_time_windows_respected(exact_max_nodes):
     """Visits with non-overlapping time windows should be sequenced
     to respect those windows."""
     # Visit A: must arrive between 0-3600s (first hour)
@@ -103,7 +121,7 @@ def test_time_windows_respected():
         ],
         service_times=[0, 600, 600, 600],  # 10 min per stop
     )
-    result = solve(request)
+    result = solve(request, exact_max_nodes=exact_max_nodes)
 
     assert result.feasible is True
     assert len(result.visit_order) == 3
@@ -111,7 +129,7 @@ def test_time_windows_respected():
     assert result.visit_order == [1, 2, 3]
 
 
-def test_infeasible_time_windows_drops_visits():
+def test_infeasible_time_windows_drops_visits(exact_max_nodes):
     """When time windows are impossible to satisfy, the solver
     should drop visits and report them."""
     # Two visits both requiring arrival at time 0 but 10 min apart
@@ -133,14 +151,14 @@ def test_infeasible_time_windows_drops_visits():
         ],
         service_times=[0, 600, 600],
     )
-    result = solve(request)
+    result = solve(request, exact_max_nodes=exact_max_nodes)
 
     # At least one visit should be dropped since both can't be reached in 100s
     assert len(result.dropped_visits) >= 1
     assert result.feasible is False
 
 
-def test_five_stops_returns_all():
+def test_five_stops_returns_all(exact_max_nodes):
     """A 5-stop route with no time windows should visit all stops."""
     n = 6  # depot + 5 visits
     # Simple symmetric distance matrix
@@ -152,7 +170,7 @@ def test_five_stops_returns_all():
         time_matrix=time_matrix,
         service_times=[0] + [300] * 5,
     )
-    result = solve(request)
+    result = solve(request, exact_max_nodes=exact_max_nodes)
 
     assert len(result.visit_order) == 5
     assert set(result.visit_order) == {1, 2, 3, 4, 5}
@@ -181,7 +199,7 @@ def test_single_visit_open_route():
     assert result.feasible is True
 
 
-def test_open_route_excludes_return_leg():
+def test_open_route_excludes_return_leg(exact_max_nodes):
     """For a linear depot→A→B→C layout, an open route should be cheaper than
     the round trip by exactly the return leg (C → depot)."""
     distance_matrix = [
@@ -204,13 +222,13 @@ def test_open_route_excludes_return_leg():
         time_matrix=time_matrix,
         service_times=service_times,
         return_to_depot=True,
-    ))
+    ), exact_max_nodes=exact_max_nodes)
     open_route = solve(OptimizeRequest(
         distance_matrix=distance_matrix,
         time_matrix=time_matrix,
         service_times=service_times,
         return_to_depot=False,
-    ))
+    ), exact_max_nodes=exact_max_nodes)
 
     # Both visit all 3 stops in linear order
     assert open_route.visit_order == [1, 2, 3]
@@ -231,3 +249,206 @@ def test_solver_status_values():
     )
     result = solve(request)
     assert result.solver_status in ("OPTIMAL", "FEASIBLE", "NO_SOLUTION", "TIMEOUT", "MANUAL")
+
+
+def test_transit_engines_agree():
+    """Native matrix transits and Python callbacks must produce the same route."""
+    request = OptimizeRequest(
+        distance_matrix=[
+            [  0,  100,  200,  300],
+            [100,    0,  100,  200],
+            [200,  100,    0,  100],
+            [300,  200,  100,    0],
+        ],
+        time_matrix=[
+            [  0,   60,  120,  180],
+            [ 60,    0,   60,  120],
+            [120,   60,    0,   60],
+            [180,  120,   60,    0],
+        ],
+        service_times=[0, 300, 300, 300],
+        return_to_depot=False,
+        solver_time_limit_seconds=1,
+    )
+    native = solve(request, transit_engine="matrix", exact_max_nodes=0)
+    callback = solve(request, transit_engine="callback", exact_max_nodes=0)
+
+    assert native.visit_order == callback.visit_order == [1, 2, 3]
+    assert native.total_distance_meters == callback.total_distance_meters
+    assert native.estimated_arrivals == callback.estimated_arrivals
+
+
+def test_unknown_transit_engine_rejected():
+    request = OptimizeRequest(
+        distance_matrix=[[0, 1, 1], [1, 0, 1], [1, 1, 0]],
+        time_matrix=[[0, 1, 1], [1, 0, 1], [1, 1, 0]],
+    )
+    with pytest.raises(ValueError):
+        solve(request, transit_engine="lua", exact_max_nodes=0)
+
+
+def test_warm_start_from_previous_order():
+    """A previous visit order is accepted as the starting assignment, and a
+    visit missing from it is still inserted by the search."""
+    n = 6
+    request = OptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        service_times=[0] + [300] * 5,
+        return_to_depot=False,
+        initial_route=[1, 2, 4, 3],  # visit 5 is new, 3/4 are out of order
+        solver_time_limit_seconds=1,
+    )
+    result = solve(request, exact_max_nodes=0)
+
+    assert result.visit_order == [1, 2, 3, 4, 5]
+    assert result.dropped_visits == []
+
+
+def test_warm_start_infeasible_route_falls_back_to_cold_solve():
+    """An initial route that breaks a hard constraint is ignored."""
+    request = OptimizeRequest(
+        distance_matrix=[
+            [0, 1000, 1000, 1000],
+            [1000, 0, 500, 1500],
+            [1000, 500, 0, 500],
+            [1000, 1500, 500, 0],
+        ],
+        time_matrix=[
+            [0, 600, 600, 600],
+            [600, 0, 300, 900],
+            [600, 300, 0, 300],
+            [600, 900, 300, 0],
+        ],
+        time_windows=[
+            None,
+            TimeWindow(earliest=0, latest=3600),
+            TimeWindow(earliest=3600, latest=7200),
+            TimeWindow(earliest=7200, latest=10800),
+        ],
+        service_times=[0, 600, 600, 600],
+        initial_route=[3, 2, 1],
+        solver_time_limit_seconds=1,
+    )
+    result = solve(request, exact_max_nodes=0)
+
+    assert result.visit_order == [1, 2, 3]
+    assert result.feasible is True
+
+
+def test_adaptive_stopping_ends_small_routes_early():
+    """A small route stops once it stalls instead of using the whole budget."""
+    n = 9
+    request = OptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        solver_time_limit_seconds=5,
+        no_improvement_seconds=0.2,
+    )
+    started = time.perf_counter()
+    result = solve(request, exact_max_nodes=0)
+    elapsed = time.perf_counter() - started
+
+    assert result.stop_reason == "NO_IMPROVEMENT"
+    assert elapsed < 2
+    assert result.time_to_best_seconds is not None
+    assert result.time_to_best_seconds <= elapsed
+    assert sorted(result.visit_order) == list(range(1, n))
+
+
+def test_fixed_time_limit_without_adaptive_stopping():
+    n = 5
+    request = OptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        solver_time_limit_seconds=1,
+        adaptive_stopping=False,
+    )
+    assert solve(request, exact_max_nodes=0).stop_reason == "TIME_LIMIT"
+
+
+def test_stop_is_polled_between_solutions(monkeypatch):
+    """A cancel lands within about STOP_POLL_SECONDS, not at the next solution."""
+    # Silence the at-solution hook: only the periodic poll can see the stop
+    monkeypatch.setattr(solver._SearchWatch, "__call__", lambda self: None)
+    request = _line_request(40, adaptive_stopping=False).model_copy(
+        update={"solver_time_limit_seconds": 10}
+    )
+    started = time.perf_counter()
+    result = solve(request, should_stop=lambda: time.perf_counter() - started > 0.3)
+    elapsed = time.perf_counter() - started
+
+    assert result.stop_reason == "CANCELLED"
+    assert elapsed < 0.3 + solver.STOP_POLL_SECONDS + 0.5
+    assert sorted(result.visit_order) == list(range(1, 40))
+
+
+def test_default_budget_scales_with_node_count():
+    assert default_time_limit(8) < default_time_limit(100) < default_time_limit(1000)
+    assert default_stall_seconds(5) == 0.1
+    assert default_stall_seconds(100_000) == 5.0
+
+
+def _line_request(n: int, **overrides) -> OptimizeRequest:
+    return OptimizeRequest(
+        distance_matrix=[[abs(i - j) * 100 for j in range(n)] for i in range(n)],
+        time_matrix=[[abs(i - j) * 60 for j in range(n)] for i in range(n)],
+        solver_time_limit_seconds=1,
+        **overrides,
+    )
+
+
+def test_sparse_successors_keep_nearest_depot_and_window_arcs():
+    windows = [None] * 10
+    windows[2] = TimeWindow(earliest=0, latest=600)
+    windows[9] = TimeWindow(earliest=700, latest=1200)
+    request = _line_request(10, time_windows=windows, initial_route=[5, 1])
+    successors = _sparse_successors(_build_data_model(request), 2, request.initial_route)
+
+    assert successors[0] == set(range(1, 10))
+    assert successors[4] == {3, 5}
+    assert 9 in successors[2]  # next in time-window order, far away on the line
+    assert 1 in successors[5]  # initial_route arc
+    assert all(0 not in allowed for allowed in successors)
+
+
+def test_greedy_route_waits_for_windows_and_skips_unreachable():
+    windows = [None] * 5
+    windows[1] = TimeWindow(earliest=3000, latest=4000)  # nearest, but opens late
+    windows[4] = TimeWindow(earliest=0, latest=100)      # closes before anyone gets there
+    request = _line_request(5, time_windows=windows, service_times=[0] * 5)
+
+    assert _greedy_route(_build_data_model(request)) == [2, 3, 1]
+
+
+def test_sparse_mode_solves_to_the_dense_route():
+    dense = solve(_line_request(12, adaptive_stopping=False), exact_max_nodes=0)
+    sparse = solve(_line_request(12, neighbors=3, adaptive_stopping=False), exact_max_nodes=0)
+
+    assert sparse.visit_order == dense.visit_order == list(range(1, 12))
+    assert sparse.dropped_visits == []
+
+
+def test_data_model_is_the_same_for_lists_and_arrays():
+    windows = [None] * 5 + [TimeWindow(earliest=0, latest=5000)]
+    request = _line_request(6, service_times=[0, 30, 30, 30, 30, 30], time_windows=windows)
+    binary = request.model_copy(update={
+        "distance_matrix": np.asarray(request.distance_matrix, dtype=np.int32),
+        "time_matrix": np.asarray(request.time_matrix, dtype=np.int32),
+    })
+    from_lists, from_arrays = _build_data_model(request), _build_data_model(binary)
+
+    assert from_lists["horizon"] == from_arrays["horizon"] == 5000 + 1440 + 150 + 3600
+    assert np.array_equal(from_lists["time_matrix"], from_arrays["time_matrix"])
+    assert _routing_matrices(from_lists, True) == _routing_matrices(from_arrays, True)
+
+
+def test_open_route_matrices_pad_a_dummy_end_node():
+    request = _line_request(3, service_times=[0, 30, 30])
+    dist, transit, dummy = _routing_matrices(_build_data_model(request), open_route=True)
+
+    assert dummy == 3
+    assert dist == [[0, 100, 200, 0], [100, 0, 100, 0], [200, 100, 0, 0], [0, 0, 0, 0]]
+    # Leaving a stop, even for the dummy end, takes its service time
+    assert transit == [[0, 60, 120, 0], [90, 30, 90, 30], [150, 90, 30, 30], [0, 0, 0, 0]]
+    assert request.distance_matrix == [[0, 100, 200], [100, 0, 100], [200, 100, 0]]